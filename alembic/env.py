@@ -15,6 +15,7 @@ from models.user import Users
 from models.auth import Sessions
 from models.subscription import Subscriptions
 from models.plan import Plans
+from models.webhook_event import WebhookEvents
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
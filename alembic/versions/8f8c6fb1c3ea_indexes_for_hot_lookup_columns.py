@@ -0,0 +1,83 @@
+"""indexes for hot lookup columns
+
+Revision ID: 8f8c6fb1c3ea
+Revises: 41d5a57d8545
+Create Date: 2026-10-18 10:02:11.418337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f8c6fb1c3ea"
+down_revision: Union[str, Sequence[str], None] = "41d5a57d8545"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_subscriptions_stripe_subscription_id", "subscriptions", ["stripe_subscription_id"]),
+    ("ix_subscriptions_user_id_is_active", "subscriptions", ["user_id", "is_active"]),
+    ("ix_plans_name", "plans", ["name"]),
+]
+
+# (constraint name, table, column). Built as a unique index first so the
+# table is not locked, then attached as a constraint.
+UNIQUE_CONSTRAINTS = [
+    ("uq_users_email", "users", "email"),
+    ("uq_users_stripe_customer_id", "users", "stripe_customer_id"),
+    ("uq_plans_stripe_price_id", "plans", "stripe_price_id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    CREATE INDEX CONCURRENTLY can't run inside a transaction, hence the
+    autocommit block. Duplicate emails / customer ids / price ids must be
+    cleaned up before running this migration.
+    """
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        for name, table, column in UNIQUE_CONSTRAINTS:
+            op.create_index(
+                name,
+                table,
+                [column],
+                unique=True,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+    for name, table, _ in UNIQUE_CONSTRAINTS:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(name, table, type_="unique")
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,46 @@
+"""index sessions expires_at
+
+Revision ID: c3d9a1e07b52
+Revises: 8f8c6fb1c3ea
+Create Date: 2026-10-18 14:20:37.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d9a1e07b52"
+down_revision: Union[str, Sequence[str], None] = "8f8c6fb1c3ea"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Index backing the scheduled purge of expired sessions, built without
+    locking the table.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_sessions_expires_at",
+            "sessions",
+            ["expires_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_sessions_expires_at",
+            table_name="sessions",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,89 @@
+"""users effective_tier and entitlement_expires_at
+
+Revision ID: d71f0b2c9e84
+Revises: c3d9a1e07b52
+Create Date: 2026-10-18 16:05:12.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d71f0b2c9e84"
+down_revision: Union[str, Sequence[str], None] = "c3d9a1e07b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    effective_tier takes the same type as subscriptions.tier (VARCHAR or
+    the subscriptiontier enum, depending on the database's history) so
+    values can be copied across as-is.
+    """
+    op.execute("""
+        DO $$
+        DECLARE tier_type text;
+        BEGIN
+            SELECT format_type(atttypid, atttypmod) INTO tier_type
+            FROM pg_attribute
+            WHERE attrelid = 'subscriptions'::regclass AND attname = 'tier';
+
+            EXECUTE format(
+                'ALTER TABLE users ADD COLUMN IF NOT EXISTS effective_tier %s',
+                tier_type
+            );
+        END $$;
+    """)
+    op.add_column(
+        "users", sa.Column("entitlement_expires_at", sa.DateTime(), nullable=True)
+    )
+
+    # Highest active tier per user, as SubscriptionService maintains it
+    op.execute("""
+        UPDATE users
+        SET effective_tier = top.tier,
+            entitlement_expires_at = top.current_period_end
+        FROM (
+            SELECT DISTINCT ON (user_id) user_id, tier, current_period_end
+            FROM subscriptions
+            WHERE is_active
+            ORDER BY
+                user_id,
+                CASE upper(tier::text)
+                    WHEN 'ENTERPRISE' THEN 3
+                    WHEN 'PRO' THEN 1
+                    ELSE 0
+                END DESC,
+                current_period_end DESC
+        ) AS top
+        WHERE top.user_id = users.id
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_effective_tier",
+            "users",
+            ["effective_tier"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_effective_tier",
+            table_name="users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column("users", "entitlement_expires_at")
+    op.drop_column("users", "effective_tier")
@@ -0,0 +1,39 @@
+"""free entitlement never expires
+
+Revision ID: f2b8d6a41c07
+Revises: e4a7c2d91f36
+Create Date: 2026-10-18 21:40:27.318560
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b8d6a41c07"
+down_revision: Union[str, Sequence[str], None] = "e4a7c2d91f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Free trials are created with the grant time as current_period_end, so
+    users whose top tier is FREE were backfilled with an expiry in the
+    past. REFRESH_ENTITLEMENT now stores NULL for them; do the same here.
+    """
+    op.execute("""
+        UPDATE users
+        SET entitlement_expires_at = NULL
+        WHERE upper(effective_tier::text) = 'FREE'
+            AND entitlement_expires_at IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Nothing to restore: the old expiry was the trial's grant time.
+    """
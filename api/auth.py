@@ -9,6 +9,14 @@ import os
 from core.logger import logger
 from schemas.exceptions import DatabaseError, InvalidToken
 from schemas.auth_request import Token, RefreshTokenRequest, FormEmail
+from schemas.pagination import PageParams, str_page_params
+from core.rate_limit import (
+    LOGIN_LIMIT,
+    LOGOUT_LIMIT,
+    REFRESH_LIMIT,
+    limit_by_ip,
+    limit_by_subject,
+)
 
 router = APIRouter(tags=["Login"])
 
@@ -28,12 +36,13 @@ oauth2 = OAuth2PasswordBearer(tokenUrl="token", scheme_name="Bearer")
 @router.post(
     "/login",
     description="Login path. You need a username and password. First need to create a user",
+    dependencies=[Depends(limit_by_ip("login", LOGIN_LIMIT))],
 )
-# @limiter.limit("10/minute")
 async def login(
     email_form: FormEmail,
     auth_serv: AuthService = Depends(get_auth_serv),
 ):
+    await limit_by_subject("login", email_form.email, LOGIN_LIMIT)
     try:
         return await auth_serv.login(email_form.email)
     except DatabaseError:
@@ -44,15 +53,15 @@ async def login(
 @router.post(
     "/refresh",
     description="Refresh path for obtain a new token. You need a refresh token.",
+    dependencies=[Depends(limit_by_ip("refresh", REFRESH_LIMIT))],
 )
-# @limiter.limit("10/minute")
 async def refresh(
     refresh: RefreshTokenRequest,
     request: Request,
     auth_serv: AuthService = Depends(get_auth_serv),
 ) -> Token:
     try:
-        return auth_serv.refresh(refresh)
+        return await auth_serv.refresh(refresh)
     except JWTError as e:
         logger.error(f"[refresh] Invalid Token during refresh | Error :{str(e)}")
         if hasattr(e, "claims"):
@@ -67,24 +76,30 @@ async def refresh(
 @router.post(
     "/logout",
     description="Logout path to close session. Close all user sessions ",
+    dependencies=[Depends(limit_by_ip("logout", LOGOUT_LIMIT))],
 )
-# @limiter.limit("10/minute")
 async def logout(
     request: Request,
     user: ReadUser = Depends(get_current_user),
     auth_serv: AuthService = Depends(get_auth_serv),
 ):
+    await limit_by_subject("logout", user.email, LOGOUT_LIMIT)
     try:
-        return auth_serv.logout(user.email)
+        return await auth_serv.logout(user.email)
     except DatabaseError:
         logger.error("[logout] Database Error")
         raise
 
 
 @router.get("/expired")
-def get_expired_sessions(auth_serv: AuthService = Depends(get_auth_serv)):
+async def get_expired_sessions(
+    page: PageParams = Depends(str_page_params),
+    auth_serv: AuthService = Depends(get_auth_serv),
+):
     try:
-        return auth_serv.get_expired_sessions()
+        return await auth_serv.get_expired_sessions(
+            limit=page.limit, cursor=page.cursor
+        )
     except SQLAlchemyError as e:
         logger.error(f"[get_expired_sessions] Database Error | Error: {str(e)}")
         raise DatabaseError(e, func="get_expired_sessions")
@@ -8,8 +8,16 @@ import redis
 import os
 from dotenv import load_dotenv
 
-from db.session import engine, get_session
+from db.session import engine, async_engine, get_session
+from db.pool import pool_status
 from core.logger import logger
+from core.loop_monitor import loop_monitor
+from core.webhook_dedup import event_dedup
+from repositories.webhook_event_repositories import (
+    AsyncWebhookEventRepository,
+    get_async_webhook_event_repo,
+)
+from services.webhook_outbox_service import WEBHOOK_OUTBOX_MAX_ATTEMPTS
 
 load_dotenv()
 
@@ -139,12 +147,53 @@ async def liveness_check() -> Dict[str, str]:
 
 
 @router.get("/health/database")
-async def database_health() -> Dict[str, str]:
-    """Database-specific health check."""
-    return await check_database()
+async def database_health() -> Dict[str, Any]:
+    """Database-specific health check.
+
+    Includes live pool stats so pool exhaustion (waiters, checkout wait)
+    can be told apart from slow queries.
+    """
+    db_check = await check_database()
+    return {
+        **db_check,
+        "pool": {
+            "sync": pool_status(engine),
+            "async": pool_status(async_engine),
+        },
+    }
 
 
 @router.get("/health/celery")
 async def celery_health() -> Dict[str, Any]:
     """Celery workers health check."""
-    return await check_celery_workers()
\ No newline at end of file
+    return await check_celery_workers()
+
+
+@router.get("/health/loop")
+async def loop_health() -> Dict[str, Any]:
+    """Event-loop lag, as seen by the heartbeat task.
+
+    Sustained lag means sync work is running on the loop and every other
+    request on this worker is waiting behind it.
+    """
+    return loop_monitor.snapshot()
+
+
+@router.get("/health/webhooks")
+async def webhooks_health(
+    event_repo: AsyncWebhookEventRepository = Depends(get_async_webhook_event_repo),
+) -> Dict[str, Any]:
+    """Webhook outbox backlog and deduplication counters.
+
+    Dedup runs in the outbox dispatchers, so its counters are read from
+    Redis; dead_letter events ran out of attempts and need a replay.
+    """
+    try:
+        dedup = await event_dedup.metrics.shared()
+    except redis.RedisError as e:
+        logger.warning(f"[webhooks_health] Redis error: {e}")
+        dedup = {"status": "unavailable"}
+    return {
+        "outbox": await event_repo.backlog(WEBHOOK_OUTBOX_MAX_ATTEMPTS),
+        "dedup": dedup,
+    }
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends
-from services.plan_service import PlanService, get_plan_serv
+from services.plan_service import PlanService, get_plan_serv, get_read_plan_serv
 from schemas.request import PlanCreate, PlanUpdate, PlanID
+from schemas.pagination import PageParams, page_params
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
 
 @router.get("/")
-def get_plans(serv: PlanService = Depends(get_plan_serv)):
-    return serv.get_all_plans()
+def get_plans(
+    page: PageParams = Depends(page_params),
+    serv: PlanService = Depends(get_read_plan_serv),
+):
+    return serv.get_all_plans(limit=page.limit, cursor=page.cursor)
 
 
 @router.post("/")
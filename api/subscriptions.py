@@ -1,25 +1,63 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from schemas.request import SubID, SubscriptionCreate
-from services.subscription_service import SubscriptionService, get_subs_service
+from services.subscription_service import (
+    SubscriptionService,
+    get_subs_service,
+    get_read_subs_service,
+)
 from models.user import ReadUser
 from dependencies.auth import get_current_user
+from schemas.pagination import PageParams, page_params
+from schemas.enums import ExportFormat, SubscriptionStatus, SubscriptionTier
+from services.export_service import ExportService, get_export_service, MEDIA_TYPES
 
 router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
 
 @router.get("/all")
-def get_all(serv: SubscriptionService = Depends(get_subs_service)):
-    return serv.get_all_subscription()
+def get_all(
+    page: PageParams = Depends(page_params),
+    serv: SubscriptionService = Depends(get_read_subs_service),
+):
+    return serv.get_all_subscription(limit=page.limit, cursor=page.cursor)
 
 
 @router.get("/me")
 def get_all_by_user(
     user: ReadUser = Depends(get_current_user),
-    serv: SubscriptionService = Depends(get_subs_service),
+    serv: SubscriptionService = Depends(get_read_subs_service),
 ):
     return serv.get_all_subscription_by_user(user.id)
 
 
+@router.get("/export")
+def export(
+    format: ExportFormat = ExportFormat.ndjson,
+    status: Optional[SubscriptionStatus] = None,
+    tier: Optional[SubscriptionTier] = None,
+    period_end_from: Optional[datetime] = None,
+    period_end_to: Optional[datetime] = None,
+    serv: ExportService = Depends(get_export_service),
+):
+    rows = serv.export_subscriptions(
+        format,
+        status=status,
+        tier=tier,
+        period_end_from=period_end_from,
+        period_end_to=period_end_to,
+    )
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=subscriptions.{format.value}"
+        },
+    )
+
+
 @router.get("/{id}")
 def get_by_id(id: str, serv: SubscriptionService = Depends(get_subs_service)):
     return serv.get_by_id(id)
@@ -1,15 +1,35 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from core.token_cache import token_cache
 from dependencies.auth import get_current_user
 from schemas.exceptions import CustomerIdError
-from services.user_service import get_user_service, UserService
+from services.user_service import get_user_service, get_read_user_service, UserService
 from models.user import CreateUser, ReadUser
+from schemas.pagination import PageParams, page_params
+from schemas.enums import ExportFormat
+from services.export_service import ExportService, get_export_service, MEDIA_TYPES
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/")
-def get_users(serv: UserService = Depends(get_user_service)):
-    return serv.get_users()
+def get_users(
+    page: PageParams = Depends(page_params),
+    serv: UserService = Depends(get_read_user_service),
+):
+    return serv.get_users(limit=page.limit, cursor=page.cursor)
+
+
+@router.get("/export")
+def export(
+    format: ExportFormat = ExportFormat.ndjson,
+    serv: ExportService = Depends(get_export_service),
+):
+    return StreamingResponse(
+        serv.export_users(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format.value}"},
+    )
 
 
 @router.get("/me")
@@ -34,4 +54,6 @@ def delete_user(
     if not user.stripe_customer_id:
         raise CustomerIdError(user_id=user.id)
 
-    return serv.delete(user.stripe_customer_id)
+    response = serv.delete(user.stripe_customer_id)
+    token_cache.invalidate_user(user.email)
+    return response
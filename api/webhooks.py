@@ -1,13 +1,22 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from core.logger import logger
-from core.stripe_test import parse_webhook_event
-from services.webhook_handler_service import WebhooksHandlerService
+from core.rate_limit import WEBHOOK_LIMIT, limit_by_ip
+from core.stripe_webhook import decode_event, verify_signature
+from repositories.webhook_event_repositories import (
+    AsyncWebhookEventRepository,
+    get_async_webhook_event_repo,
+)
 
 router = APIRouter()
 
 
-@router.post("/webhooks/")
-async def handle_webhooks(request: Request):
+@router.post(
+    "/webhooks/", dependencies=[Depends(limit_by_ip("webhooks", WEBHOOK_LIMIT))]
+)
+async def handle_webhooks(
+    request: Request,
+    event_repo: AsyncWebhookEventRepository = Depends(get_async_webhook_event_repo),
+):
     sig_header = request.headers.get("stripe-signature")
 
     if not sig_header:
@@ -17,12 +26,14 @@ async def handle_webhooks(request: Request):
         # Obtiene el request
         body = await request.body()
 
-        # Parsea el evento
-        event = parse_webhook_event(body, sig_header)
+        # Verifica la firma y extrae solo lo que usan los handlers
+        verify_signature(body, sig_header)
+        event_id, event_type, obj = decode_event(body)
 
-        # Interactua el service con el evento
-        handler = WebhooksHandlerService()
-        handler.handle(event)
+        # Guarda el evento en el outbox; el dispatcher lo publica a Celery
+        event = {"id": event_id, "type": event_type, "data": {"object": obj}}
+        if not await event_repo.add(event_id, event_type, event):
+            return {"status": "duplicate"}
 
         return {"status": "success"}
 
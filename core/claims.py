@@ -0,0 +1,46 @@
+"""Claim versions for stateless access tokens.
+
+With STATELESS_TOKENS on, access tokens carry uid/cid/tier claims plus the
+user's claim version ("tv"). Anything that changes what those claims say
+bumps the version in Redis, and tokens minted with an older version are
+rejected so the client refreshes and gets the new claims.
+"""
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from core.logger import logger
+from core.redis_client import get_async_redis, get_redis
+
+load_dotenv()
+
+STATELESS_TOKENS = os.getenv("STATELESS_TOKENS", "false").lower() in ("1", "true", "yes")
+# Stateless tokens are not looked up per request, so keep them short lived
+STATELESS_ACCESS_TOKEN_DURATION = int(
+    os.getenv("STATELESS_ACCESS_TOKEN_DURATION", "5")
+)
+
+CLAIM_VERSION_KEY = "claims:v:{user_id}"
+
+
+async def get_claim_version(user_id: int) -> Optional[int]:
+    """Current claim version, or None if Redis can't be reached."""
+    try:
+        value = await get_async_redis().get(CLAIM_VERSION_KEY.format(user_id=user_id))
+    except RedisError as e:
+        logger.warning(f"[claims.get_claim_version] Redis error: {e}")
+        return None
+    return int(value) if value is not None else 0
+
+
+def bump_claim_version(user_id: int) -> None:
+    """Invalidate the user's stateless tokens. No-op when the mode is off."""
+    if not STATELESS_TOKENS:
+        return
+    try:
+        get_redis().incr(CLAIM_VERSION_KEY.format(user_id=user_id))
+    except RedisError as e:
+        # Tokens still expire after STATELESS_ACCESS_TOKEN_DURATION
+        logger.error(f"[claims.bump_claim_version] Redis error: {e}")
@@ -0,0 +1,179 @@
+"""Event-loop lag monitor.
+
+A heartbeat task sleeps for LOOP_MONITOR_INTERVAL seconds and records how
+late it woke up: that delay is time the loop spent running some callback
+that never yielded (sync DB/Redis/Stripe calls inside an `async def`).
+Lag is exposed on /health/loop.
+
+With LOOP_BLOCK_DEBUG on, a watchdog thread also notices a heartbeat that is
+overdue by more than LOOP_BLOCK_THRESHOLD while the loop is still blocked,
+and logs the route being served and the loop thread's current stack.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+from core.logger import logger
+
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+LOOP_MONITOR_ENABLED = _env_bool("LOOP_MONITOR", True)
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL", "0.5"))
+LOOP_BLOCK_THRESHOLD = float(os.environ.get("LOOP_BLOCK_THRESHOLD", "0.1"))
+LOOP_BLOCK_DEBUG = _env_bool("LOOP_BLOCK_DEBUG", False)
+
+# "METHOD /path" of the request a task is serving; read by the watchdog
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+
+class LoopLagMetrics:
+    """Heartbeat lag counters; written by the loop, read by health checks."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.blocked = 0
+        self.total_lag = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def observe(self, lag: float, blocked: bool) -> None:
+        with self._lock:
+            self.samples += 1
+            self.total_lag += lag
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if blocked:
+                self.blocked += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.total_lag / self.samples if self.samples else 0.0
+            return {
+                "samples": self.samples,
+                "blocked": self.blocked,
+                "last_lag_ms": round(self.last_lag * 1000, 3),
+                "avg_lag_ms": round(avg * 1000, 3),
+                "max_lag_ms": round(self.max_lag * 1000, 3),
+            }
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, debug: bool) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.metrics = LoopLagMetrics()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._beat = 0.0
+        self._reported_beat = 0.0
+
+    def start(self) -> None:
+        """Start monitoring the running loop. Call from inside the loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+
+        if self.debug:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_ms": round(self.interval * 1000, 3),
+            "threshold_ms": round(self.threshold * 1000, 3),
+            **self.metrics.snapshot(),
+        }
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.metrics.observe(lag, lag >= self.threshold)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue >= self.threshold and beat != self._reported_beat:
+                # Report once per missed heartbeat
+                self._reported_beat = beat
+                self._report(overdue)
+
+    def _report(self, overdue: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else None
+        logger.warning(
+            "event_loop_blocked",
+            blocked_ms=round(overdue * 1000, 3),
+            route=self._blocking_route(),
+            stack=stack,
+        )
+
+    def _blocking_route(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            return None
+        if task is None or not hasattr(task, "get_context"):
+            return None
+        return task.get_context().get(current_route)
+
+
+loop_monitor = LoopMonitor(
+    LOOP_MONITOR_INTERVAL, LOOP_BLOCK_THRESHOLD, LOOP_BLOCK_DEBUG
+)
+
+
+def register_loop_monitor(app):
+    @app.middleware("http")
+    async def tag_route(request: Request, call_next):
+        # Tasks spawned for this request inherit the value
+        token = current_route.set(f"{request.method} {request.url.path}")
+        try:
+            return await call_next(request)
+        finally:
+            current_route.reset(token)
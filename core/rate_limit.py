@@ -0,0 +1,197 @@
+"""Redis token-bucket rate limiting.
+
+Each key ("login:ip:1.2.3.4", "login:sub:a@b.c") is a bucket in Redis,
+refilled and spent atomically by TOKEN_BUCKET_SCRIPT, so every API process
+shares the same budget. Two local shortcuts keep most requests off Redis:
+
+- a denied key is remembered until its Retry-After, so a flood from one
+  client is rejected in-process;
+- a bucket with room hands out a small lease of tokens, spent locally
+  until used up or RATE_LIMIT_LEASE_SECONDS pass.
+
+When Redis is unreachable requests are let through: the limiter protects
+DB capacity, it should not take auth down with it.
+"""
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from core.logger import logger
+from core.redis_client import get_async_redis
+from schemas.exceptions import RateLimitExceeded
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+RATE_LIMIT_LEASE_SECONDS = float(os.getenv("RATE_LIMIT_LEASE_SECONDS", "1"))
+RATE_LIMIT_LOCAL_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", "10000"))
+
+KEY_PREFIX = "ratelimit:"
+
+# KEYS[1] bucket; ARGV capacity, refill rate (tokens/s), now (s), wanted.
+# Grants up to `wanted` whole tokens (at least 1 or nothing) and returns
+# {granted, retry_after}. Floats go back as strings, Redis truncates numbers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local wanted = tonumber(ARGV[4])
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local granted = math.min(math.floor(tokens), wanted)
+local retry_after = 0
+if granted >= 1 then
+    tokens = tokens - granted
+else
+    granted = 0
+    retry_after = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {granted, tostring(retry_after)}
+"""
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: int
+    per_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+    @property
+    def lease(self) -> int:
+        # Tokens a process may hold locally; 1 (no lease) for tight limits
+        return max(1, self.capacity // 10)
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse "10/minute" style limits."""
+        amount, _, period = value.partition("/")
+        return cls(int(amount), PERIODS[period.strip().rstrip("s")])
+
+
+LOGIN_LIMIT = RateLimit.parse(os.getenv("RATE_LIMIT_LOGIN", "10/minute"))
+REFRESH_LIMIT = RateLimit.parse(os.getenv("RATE_LIMIT_REFRESH", "10/minute"))
+LOGOUT_LIMIT = RateLimit.parse(os.getenv("RATE_LIMIT_LOGOUT", "10/minute"))
+WEBHOOK_LIMIT = RateLimit.parse(os.getenv("RATE_LIMIT_WEBHOOKS", "100/second"))
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        client=None,
+        enabled: bool = True,
+        lease_seconds: float = RATE_LIMIT_LEASE_SECONDS,
+        max_local_keys: int = RATE_LIMIT_LOCAL_KEYS,
+    ) -> None:
+        self._client = client
+        self._script = None
+        self.enabled = enabled
+        self.lease_seconds = lease_seconds
+        self.max_local_keys = max_local_keys
+        # key -> monotonic time the denial ends
+        self._denied: Dict[str, float] = {}
+        # key -> (tokens left, monotonic expiry)
+        self._leases: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def script(self):
+        if self._script is None:
+            client = self._client or get_async_redis()
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    async def hit(self, key: str, limit: RateLimit) -> None:
+        """Spend one token of key's bucket or raise RateLimitExceeded."""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+
+        denied_until = self._denied.get(key)
+        if denied_until is not None:
+            if denied_until > now:
+                raise RateLimitExceeded(denied_until - now)
+            del self._denied[key]
+
+        left, expires = self._leases.get(key, (0, 0.0))
+        if left > 0 and expires > now:
+            self._leases[key] = (left - 1, expires)
+            return
+
+        try:
+            granted, retry_after = await self.script(
+                keys=[KEY_PREFIX + key],
+                args=[limit.capacity, limit.rate, time.time(), limit.lease],
+            )
+        except RedisError as e:
+            logger.warning("rate_limit_unavailable", key=key, error=str(e))
+            return
+
+        self._trim(now)
+        granted = int(granted)
+        if not granted:
+            retry_after = float(retry_after)
+            self._denied[key] = now + retry_after
+            self._leases.pop(key, None)
+            raise RateLimitExceeded(retry_after)
+
+        if granted > 1:
+            self._leases[key] = (granted - 1, now + self.lease_seconds)
+        else:
+            self._leases.pop(key, None)
+
+    def clear(self) -> None:
+        self._denied.clear()
+        self._leases.clear()
+
+    def _trim(self, now: float) -> None:
+        if len(self._denied) + len(self._leases) < self.max_local_keys:
+            return
+        self._denied = {k: t for k, t in self._denied.items() if t > now}
+        self._leases = {k: v for k, v in self._leases.items() if v[1] > now}
+        if len(self._denied) + len(self._leases) >= self.max_local_keys:
+            self.clear()
+
+
+rate_limiter = RateLimiter(enabled=RATE_LIMIT_ENABLED)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def limit_by_ip(name: str, limit: RateLimit):
+    """Route dependency: one token per request from the client's IP."""
+
+    async def dependency(request: Request) -> None:
+        ip = client_ip(request)
+        if ip:
+            await rate_limiter.hit(f"{name}:ip:{ip}", limit)
+
+    return dependency
+
+
+async def limit_by_subject(name: str, sub: str, limit: RateLimit) -> None:
+    """One token from the subject's (user email) bucket."""
+    await rate_limiter.hit(f"{name}:sub:{sub.lower()}", limit)
@@ -0,0 +1,40 @@
+"""Shared Redis clients for application state (not the Celery broker)."""
+import os
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Keep hot-path calls bounded when Redis is slow or unreachable
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Process-wide sync client (Celery handlers, scripts)."""
+    global _client
+    if _client is None:
+        _client = redis.from_url(
+            REDIS_URL,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Process-wide asyncio client (request path)."""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.from_url(
+            REDIS_URL,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+    return _async_client
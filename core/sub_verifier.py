@@ -1,25 +1,29 @@
 from schemas.enums import SubscriptionTier
 from fastapi import Depends
 from models.user import ReadUser
-from dependencies.auth import get_current_user
+from dependencies.auth import get_current_user_with_tier
 from schemas.exceptions import InsufficientSubscriptionError
-from services.subscription_service import SubscriptionService, get_subs_service
+from services.auth_services import entitlement_lapsed
 
 
 def require_subscription_tier(min_tier: SubscriptionTier):
-    def dependency(
-        user: ReadUser = Depends(get_current_user),
-        sub_serv: SubscriptionService = Depends(get_subs_service),
-    ):
-        user_subs = sub_serv.get_all_subscription_by_user(id=user.id)
+    async def dependency(user: ReadUser = Depends(get_current_user_with_tier)):
+        # The tier comes with the user: the users row (effective_tier) or
+        # the stateless claims. None means no active subscription.
+        tier = getattr(user, "effective_tier", None)
 
-        if not user_subs:
+        if entitlement_lapsed(user):
+            # auth_user(with_tier) swaps a lapsed entitlement for the next
+            # unlapsed one; anything still lapsed grants nothing
+            tier = None
+
+        if tier is None:
             raise InsufficientSubscriptionError(
                 user_tier=SubscriptionTier.free,
                 expected_tier=min_tier,
             )
 
-        user_tier = SubscriptionTier(value=user_subs[0].tier)
+        user_tier = SubscriptionTier(tier)
 
         if not user_tier.has_access_to(min_tier):
             raise InsufficientSubscriptionError(
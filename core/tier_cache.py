@@ -0,0 +1,180 @@
+"""Cache of each user's entitlement: effective tier and when it lapses.
+
+Tier-gated requests whose token is already in the token cache take the
+entitlement from here instead of the database. It is looked up in-process
+first (TIER_CACHE_LOCAL_TTL, short because other processes can't reach
+it), then in Redis (TIER_CACHE_TTL), and only then in the database.
+Webhook handlers delete the Redis entry after committing a subscription
+change.
+
+Entries are kept past their freshness, up to TIER_CACHE_STALE_TTL, and are
+served if the database can't be reached: a slightly old tier beats failing
+every entitlement check.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Tuple
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.logger import logger
+from core.redis_client import get_async_redis, get_redis
+from schemas.exceptions import DatabaseError
+
+load_dotenv()
+
+TIER_CACHE_ENABLED = os.getenv("TIER_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+TIER_CACHE_TTL = float(os.getenv("TIER_CACHE_TTL", "300"))
+TIER_CACHE_LOCAL_TTL = float(os.getenv("TIER_CACHE_LOCAL_TTL", "5"))
+TIER_CACHE_STALE_TTL = float(os.getenv("TIER_CACHE_STALE_TTL", "3600"))
+TIER_CACHE_SIZE = int(os.getenv("TIER_CACHE_SIZE", "10000"))
+
+TIER_KEY = "tier:{user_id}"
+
+# Errors meaning "the database is unreachable", as opposed to bad input
+UNAVAILABLE = (DatabaseError, SQLAlchemyError, OSError)
+
+# Tier value (None when the user has no active subscription) and the end
+# of the period it was paid for (None when it doesn't lapse)
+Entitlement = Tuple[Optional[str], Optional[datetime]]
+
+
+class TierCache:
+    def __init__(
+        self,
+        ttl: float = TIER_CACHE_TTL,
+        local_ttl: float = TIER_CACHE_LOCAL_TTL,
+        stale_ttl: float = TIER_CACHE_STALE_TTL,
+        max_entries: int = TIER_CACHE_SIZE,
+        enabled: bool = True,
+    ) -> None:
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # user_id -> (loaded_at wall time, entitlement)
+        self._entries: "OrderedDict[int, Tuple[float, Entitlement]]" = OrderedDict()
+
+    async def get(
+        self, user_id: int, load: Callable[[], Awaitable[Entitlement]]
+    ) -> Entitlement:
+        """Entitlement of user_id, calling load() on a miss."""
+        if not self.enabled:
+            return await load()
+
+        now = time.time()
+        local = self._get_local(user_id)
+        if local is not None and now - local[0] < self.local_ttl:
+            return local[1]
+
+        shared = await self._get_shared(user_id)
+        if shared is not None and now - shared[0] < self.ttl:
+            self._put_local(user_id, shared)
+            return shared[1]
+
+        try:
+            entitlement = await load()
+        except UNAVAILABLE as e:
+            stale = max(
+                (entry for entry in (local, shared) if entry is not None),
+                key=lambda entry: entry[0],
+                default=None,
+            )
+            if stale is None or now - stale[0] >= self.stale_ttl:
+                raise
+            logger.warning(
+                "tier_cache_serving_stale",
+                user_id=user_id,
+                age=round(now - stale[0], 3),
+                error=str(e),
+            )
+            return stale[1]
+
+        entry = (now, entitlement)
+        self._put_local(user_id, entry)
+        await self._put_shared(user_id, entry)
+        return entitlement
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the user's entry here and in Redis (sync, for workers)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if not self.enabled:
+            return
+        try:
+            get_redis().delete(TIER_KEY.format(user_id=user_id))
+        except RedisError as e:
+            # Entries still expire after TIER_CACHE_TTL
+            logger.error(f"[TierCache.invalidate] Redis error: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, user_id: int) -> Optional[Tuple[float, Entitlement]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+            return entry
+
+    def _put_local(self, user_id: int, entry: Tuple[float, Entitlement]) -> None:
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _get_shared(self, user_id: int) -> Optional[Tuple[float, Entitlement]]:
+        try:
+            raw = await get_async_redis().get(TIER_KEY.format(user_id=user_id))
+        except RedisError as e:
+            logger.warning(f"[TierCache.get] Redis error: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        expires_at = data.get("expires_at")
+        return data["at"], (
+            data["tier"],
+            datetime.fromisoformat(expires_at) if expires_at else None,
+        )
+
+    async def _put_shared(
+        self, user_id: int, entry: Tuple[float, Entitlement]
+    ) -> None:
+        tier, expires_at = entry[1]
+        try:
+            await get_async_redis().set(
+                TIER_KEY.format(user_id=user_id),
+                json.dumps(
+                    {
+                        "at": entry[0],
+                        "tier": tier,
+                        "expires_at": expires_at.isoformat() if expires_at else None,
+                    }
+                ),
+                ex=int(self.stale_ttl),
+            )
+        except RedisError as e:
+            logger.warning(f"[TierCache.put] Redis error: {e}")
+
+
+tier_cache = TierCache(enabled=TIER_CACHE_ENABLED)
+
+
+def invalidate_tier(user_id: int) -> None:
+    tier_cache.invalidate(user_id)
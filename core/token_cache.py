@@ -0,0 +1,79 @@
+"""In-process cache of verified access tokens.
+
+get_current_user runs on every authenticated request. A token that was
+already verified maps to its user here, so repeat requests skip both the JWT
+signature check and the user SELECT. Entries are keyed by sha256(token) and
+live until the token's exp, capped at TOKEN_CACHE_TTL seconds. The cap bounds
+how long a change made by another process (e.g. a customer.deleted
+webhook in a worker) can go unseen. Logout and user deletion invalidate
+the user's entries in this process.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = float(os.environ.get("TOKEN_CACHE_TTL", "60"))
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Bounded LRU of token hash -> (expires_at, sub, user)."""
+
+    def __init__(self, max_entries: int, max_ttl: float) -> None:
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Any]:
+        key = token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, user = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, token: str, sub: str, user: Any, exp: float) -> None:
+        now = time.time()
+        expires_at = min(exp, now + self.max_ttl)
+        if expires_at <= now or self.max_entries <= 0:
+            return
+
+        key = token_key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, sub, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, sub: str) -> None:
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] == sub]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
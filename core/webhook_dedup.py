@@ -0,0 +1,107 @@
+"""Stripe event deduplication.
+
+Stripe delivers each event at least once and redelivers on timeouts. The
+first delivery claims "webhook:event:{id}" with SET NX EX; later deliveries
+of the same id find the key taken and are acknowledged without enqueueing
+anything. If dispatching fails the claim is released, so Stripe's retry
+is processed. When Redis is unreachable events are let through.
+
+Claims happen in the outbox dispatcher, not the API, so the counters are
+kept in the "webhook:dedup:metrics" hash too: /health/webhooks reads the
+totals of every dispatcher from there.
+"""
+import os
+import threading
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from core.logger import logger
+from core.redis_client import get_async_redis, get_redis
+
+load_dotenv()
+
+WEBHOOK_DEDUP_ENABLED = os.getenv("WEBHOOK_DEDUP_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+# Stripe retries for up to three days
+WEBHOOK_DEDUP_TTL = int(os.getenv("WEBHOOK_DEDUP_TTL", str(3 * 24 * 3600)))
+
+EVENT_KEY = "webhook:event:{event_id}"
+METRICS_KEY = "webhook:dedup:metrics"
+COUNTERS = ("claimed", "duplicates", "released", "errors")
+
+
+class DedupMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.claimed = 0
+        self.duplicates = 0
+        self.released = 0
+        self.errors = 0
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        if counter == "errors":
+            # Redis is what failed; the count stays in this process
+            return
+        try:
+            get_redis().hincrby(METRICS_KEY, counter, 1)
+        except RedisError as e:
+            logger.warning(f"[DedupMetrics.incr] Redis error: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters of this process."""
+        with self._lock:
+            return {counter: getattr(self, counter) for counter in COUNTERS}
+
+    async def shared(self) -> Dict[str, Any]:
+        """Counters summed over every process, without Redis errors."""
+        totals = await get_async_redis().hgetall(METRICS_KEY)
+        return {
+            counter: int(totals.get(counter.encode(), 0))
+            for counter in COUNTERS
+            if counter != "errors"
+        }
+
+
+class EventDeduplicator:
+    def __init__(self, ttl: int = WEBHOOK_DEDUP_TTL, enabled: bool = True) -> None:
+        self.ttl = ttl
+        self.enabled = enabled
+        self.metrics = DedupMetrics()
+
+    def claim(self, event_id: str) -> bool:
+        """True for the first delivery of event_id, False for a duplicate."""
+        if not self.enabled:
+            return True
+        try:
+            claimed = get_redis().set(
+                EVENT_KEY.format(event_id=event_id), 1, nx=True, ex=self.ttl
+            )
+        except RedisError as e:
+            self.metrics.incr("errors")
+            logger.warning(f"[EventDeduplicator.claim] Redis error: {e}")
+            return True
+
+        self.metrics.incr("claimed" if claimed else "duplicates")
+        return bool(claimed)
+
+    def release(self, event_id: str) -> None:
+        """Forget event_id so a redelivery is processed again."""
+        if not self.enabled:
+            return
+        try:
+            get_redis().delete(EVENT_KEY.format(event_id=event_id))
+            self.metrics.incr("released")
+        except RedisError as e:
+            self.metrics.incr("errors")
+            logger.error(f"[EventDeduplicator.release] Redis error: {e}")
+
+
+event_dedup = EventDeduplicator(enabled=WEBHOOK_DEDUP_ENABLED)
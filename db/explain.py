@@ -0,0 +1,107 @@
+"""EXPLAIN-based check that the hot repository queries use an index.
+
+Runs the real repository methods against a recording session to capture
+their statements, then EXPLAINs each one on PostgreSQL with sequential
+scans disabled. A query that still plans a Seq Scan has no usable index.
+
+Usage:
+    python -m db.explain
+"""
+import sys
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from core.logger import logger
+
+
+class _EmptyResult:
+    def first(self):
+        return None
+
+    def all(self):
+        return []
+
+
+class RecordingSession:
+    """Session stand-in that keeps every statement passed to exec()."""
+
+    def __init__(self) -> None:
+        self.statements: List[Any] = []
+
+    def exec(self, statement, *args, params=None, **kwargs):
+        # Prebuilt statements take their values as params; bind them so the
+        # statement can be compiled on its own.
+        self.statements.append(statement.params(params) if params else statement)
+        return _EmptyResult()
+
+
+def hot_queries() -> Dict[str, Any]:
+    """Statements issued by the repository lookups on the hot paths."""
+    from repositories.auth_repositories import AuthRepository
+    from repositories.plan_repositories import PlanRepository
+    from repositories.subscription_repositories import SubscriptionRepository
+    from repositories.user_repositories import UserRepository
+    from schemas.enums import SubscriptionTier
+
+    calls = [
+        (UserRepository, "get_user_by_email", ("a@b.c",)),
+        (UserRepository, "get_user_by_customer_id", ("cus_x",)),
+        (AuthRepository, "get_user_whit_email", ("a@b.c",)),
+        (AuthRepository, "get_session_with_jti", ("jti",)),
+        (AuthRepository, "get_active_sessions", ("a@b.c",)),
+        (SubscriptionRepository, "get_subscription_by_id", ("sub_x",)),
+        (SubscriptionRepository, "get_all_subscription_by_user", (1,)),
+        (SubscriptionRepository, "get_subscription_for_user", ("sub_x", "cus_x")),
+        (PlanRepository, "get_plan_by_id", ("price_x",)),
+        (PlanRepository, "get_plan_by_tier", (SubscriptionTier.pro,)),
+    ]
+
+    queries = {}
+    for repo_cls, method, args in calls:
+        session = RecordingSession()
+        getattr(repo_cls(session), method)(*args)
+        queries[f"{repo_cls.__name__}.{method}"] = session.statements[0]
+    return queries
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """Relations read with a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def check_index_usage(engine) -> Dict[str, List[str]]:
+    """Map each hot query to the tables it still seq-scans (empty = indexed)."""
+    results = {}
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        for name, stmt in hot_queries().items():
+            compiled = stmt.compile(dialect=conn.dialect)
+            row = conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+            results[name] = seq_scans(row[0]["Plan"])
+        conn.rollback()
+    return results
+
+
+def main() -> int:
+    from db.session import engine
+
+    failed = False
+    for name, tables in check_index_usage(engine).items():
+        if tables:
+            failed = True
+            logger.error("explain_seq_scan", query=name, tables=tables)
+        else:
+            logger.info("explain_index_scan", query=name)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
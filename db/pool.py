@@ -0,0 +1,119 @@
+"""Connection pool settings and checkout metrics."""
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def pool_settings() -> Dict[str, Any]:
+    """Pool keyword arguments for create_engine, read from the environment."""
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+class PoolMetrics:
+    """Counters for connection checkouts.
+
+    Thread-safe: the sync pool is used from FastAPI's threadpool and Celery.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def start(self) -> float:
+        with self._lock:
+            self.waiters += 1
+        return time.perf_counter()
+
+    def finish(self, started: float, timed_out: bool = False) -> None:
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.waiters -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "waiters": self.waiters,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_checkout_wait_ms": round(avg * 1000, 3),
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout; waiters are callers still waiting for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = self.metrics.start()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.finish(started, timed_out=True)
+            raise
+        except Exception:
+            self.metrics.finish(started)
+            raise
+        self.metrics.finish(started)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """Live pool stats for health checks."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        )
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+
+    return status
@@ -0,0 +1,87 @@
+"""Read-your-writes tracking for replica routing.
+
+After a client performs a write, its reads go to the primary for
+READ_YOUR_WRITES_SECONDS so it never sees replica lag on its own changes.
+Clients are identified by their bearer token (hashed) or, without one, by IP.
+The window is tracked per process.
+"""
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+load_dotenv()
+
+READ_YOUR_WRITES_SECONDS = float(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_MAX_KEYS = int(os.environ.get("READ_YOUR_WRITES_MAX_KEYS", "10000"))
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWrites:
+    def __init__(self, window: float, max_keys: int) -> None:
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._writes: Dict[str, float] = {}
+
+    def mark_write(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._writes) >= self.max_keys:
+                self._purge(now)
+            self._writes[key] = now + self.window
+
+    def recently_wrote(self, key: str) -> bool:
+        with self._lock:
+            until = self._writes.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._writes[key]
+                return False
+            return True
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, until in self._writes.items() if until < now]
+        for key in expired:
+            del self._writes[key]
+        # Still full: drop the oldest windows
+        overflow = len(self._writes) - self.max_keys + 1
+        if overflow > 0:
+            for key in sorted(self._writes, key=self._writes.get)[:overflow]:
+                del self._writes[key]
+
+
+read_your_writes = ReadYourWrites(READ_YOUR_WRITES_SECONDS, READ_YOUR_WRITES_MAX_KEYS)
+
+
+def client_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    if request.client:
+        return f"ip:{request.client.host}"
+    return None
+
+
+def should_read_primary(request: Request) -> bool:
+    key = client_key(request)
+    return key is not None and read_your_writes.recently_wrote(key)
+
+
+def register_read_your_writes(app):
+    @app.middleware("http")
+    async def mark_writes(request: Request, call_next):
+        response = await call_next(request)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            key = client_key(request)
+            if key:
+                read_your_writes.mark_write(key)
+
+        return response
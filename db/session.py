@@ -1,16 +1,98 @@
 from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.exc import SQLAlchemyError
+from db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_settings
 from models import plan, user, subscription
 from dotenv import load_dotenv
+from fastapi import Request
+from db.routing import should_read_primary
+from db.unit_of_work import (
+    UnitOfWork,
+    commit,
+    async_commit,
+    rollback,
+    async_rollback,
+)
 import os
 
 load_dotenv()
 
 url = os.environ.get("DATABASE_URL")
 
-engine = create_engine(url)
+
+def _to_async_url(sync_url: str) -> str:
+    """Rewrite a psycopg2 DATABASE_URL to use the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if sync_url.startswith(prefix):
+            return "postgresql+asyncpg://" + sync_url[len(prefix) :]
+    return sync_url
+
+
+def _with_statement_cache(async_url: str):
+    """Size asyncpg's per-connection prepared statement cache.
+
+    DB_PREPARED_STATEMENT_CACHE_SIZE=0 disables it (needed behind pgbouncer in
+    transaction mode). A value already in the URL wins.
+    """
+    parsed = make_url(async_url)
+    if parsed.drivername != "postgresql+asyncpg":
+        return async_url
+    if "prepared_statement_cache_size" in parsed.query:
+        return async_url
+    size = os.environ.get("DB_PREPARED_STATEMENT_CACHE_SIZE", "500")
+    return parsed.update_query_dict({"prepared_statement_cache_size": size})
+
+
+# Compiled SQL cache per engine; the prebuilt repository statements always hit it
+query_cache_size = int(os.environ.get("DB_QUERY_CACHE_SIZE", 1200))
+
+async_url = os.environ.get("ASYNC_DATABASE_URL") or _to_async_url(url)
+
+# Optional read replica. Without it reads go to the primary.
+replica_url = os.environ.get("DATABASE_REPLICA_URL")
+async_replica_url = os.environ.get("ASYNC_DATABASE_REPLICA_URL") or (
+    _to_async_url(replica_url) if replica_url else None
+)
+
+engine = create_engine(
+    url,
+    poolclass=InstrumentedQueuePool,
+    query_cache_size=query_cache_size,
+    **pool_settings(),
+)
+
+async_engine = create_async_engine(
+    _with_statement_cache(async_url),
+    poolclass=InstrumentedAsyncQueuePool,
+    query_cache_size=query_cache_size,
+    **pool_settings(),
+)
+
+read_engine = (
+    create_engine(
+        replica_url,
+        poolclass=InstrumentedQueuePool,
+        query_cache_size=query_cache_size,
+        **pool_settings(),
+    )
+    if replica_url
+    else engine
+)
+
+async_read_engine = (
+    create_async_engine(
+        _with_statement_cache(async_replica_url),
+        poolclass=InstrumentedAsyncQueuePool,
+        query_cache_size=query_cache_size,
+        **pool_settings(),
+    )
+    if async_replica_url
+    else async_engine
+)
 
 
 def create_db_and_tables():
@@ -24,8 +106,50 @@ def create_db_and_tables():
 
 
 def get_session():
+    """Write session on the primary, committed once when the request ends."""
     session = Session(engine)
+    try:
+        with UnitOfWork(session):
+            yield session
+    finally:
+        session.close()
+
+
+def get_read_session(request: Request):
+    """Read session on the replica, or the primary inside a read-your-writes window."""
+    bind = engine if should_read_primary(request) else read_engine
+    session = Session(bind)
     try:
         yield session
     finally:
         session.close()
+
+
+async def get_async_session():
+    # expire_on_commit=False: attributes can't be lazy-loaded after commit
+    # on an AsyncSession, so keep the loaded state around.
+    session = AsyncSession(async_engine, expire_on_commit=False)
+    try:
+        async with UnitOfWork(session):
+            yield session
+    finally:
+        await session.close()
+
+
+def get_read_session_factory(request: Request):
+    """Session factory for streaming responses.
+
+    Dependencies with yield are closed before a StreamingResponse body runs,
+    so streaming endpoints open (and close) their own session from this.
+    """
+    bind = engine if should_read_primary(request) else read_engine
+    return lambda: Session(bind)
+
+
+async def get_async_read_session(request: Request):
+    bind = async_engine if should_read_primary(request) else async_read_engine
+    session = AsyncSession(bind, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
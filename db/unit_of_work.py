@@ -0,0 +1,123 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from schemas.exceptions import DatabaseError
+
+# session.info key set while a UnitOfWork owns the transaction
+UNIT_OF_WORK = "unit_of_work"
+AFTER_COMMIT = "after_commit"
+
+
+def in_unit_of_work(session) -> bool:
+    return session.info.get(UNIT_OF_WORK) is True
+
+
+def commit(session: Session):
+    """Repository-side commit.
+
+    Inside a UnitOfWork only flushes (ids and constraints are still checked
+    at this point); the unit of work commits once when it exits.
+    """
+    if in_unit_of_work(session):
+        session.flush()
+    else:
+        session.commit()
+
+
+async def async_commit(session: AsyncSession):
+    if in_unit_of_work(session):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+def rollback(session: Session):
+    """Repository-side rollback after a failed write.
+
+    Inside a UnitOfWork it does nothing: rolling back here would also drop
+    what earlier steps of the unit flushed. The error propagates and the
+    unit of work rolls everything back when it exits.
+    """
+    if not in_unit_of_work(session):
+        session.rollback()
+
+
+async def async_rollback(session: AsyncSession):
+    if not in_unit_of_work(session):
+        await session.rollback()
+
+
+def after_commit(session, callback) -> None:
+    """Run callback once the data it depends on is committed.
+
+    Inside a UnitOfWork it is deferred until the final commit (and dropped on
+    rollback); otherwise the repository already committed, so it runs now.
+    """
+    if in_unit_of_work(session):
+        session.info.setdefault(AFTER_COMMIT, []).append(callback)
+    else:
+        callback()
+
+
+def _run_after_commit(session) -> None:
+    for callback in session.info.pop(AFTER_COMMIT, []):
+        callback()
+
+
+class UnitOfWork:
+    """One transaction and one commit for everything done on a session.
+
+    Usage:
+        with UnitOfWork(session):
+            repo.create(...)
+            other_repo.update(...)
+
+    Rolls back if the block raises, so a service call is never half applied.
+    Also usable with ``async with`` on an AsyncSession.
+    """
+
+    def __init__(self, session) -> None:
+        self.session = session
+
+    def __enter__(self):
+        self.session.info[UNIT_OF_WORK] = True
+        return self.session
+
+    def __exit__(self, exc_type, exc, tb):
+        self.session.info.pop(UNIT_OF_WORK, None)
+
+        if exc_type is not None:
+            self.session.info.pop(AFTER_COMMIT, None)
+            self.session.rollback()
+            return False
+
+        try:
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.info.pop(AFTER_COMMIT, None)
+            self.session.rollback()
+            raise DatabaseError(e, "UnitOfWork.commit")
+        _run_after_commit(self.session)
+        return False
+
+    async def __aenter__(self):
+        self.session.info[UNIT_OF_WORK] = True
+        return self.session
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.session.info.pop(UNIT_OF_WORK, None)
+
+        if exc_type is not None:
+            self.session.info.pop(AFTER_COMMIT, None)
+            await self.session.rollback()
+            return False
+
+        try:
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.info.pop(AFTER_COMMIT, None)
+            await self.session.rollback()
+            raise DatabaseError(e, "UnitOfWork.commit")
+        _run_after_commit(self.session)
+        return False
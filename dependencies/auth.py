@@ -6,13 +6,22 @@ from schemas.exceptions import UserNotFoundError, InvalidToken
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     auth_serv: AuthService = Depends(get_auth_serv),
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
     try:
-        return auth_serv.auth_user(credentials.credentials)
+        return await auth_serv.auth_user(credentials.credentials)
     except UserNotFoundError:
         raise
     except InvalidToken:
         raise
+
+
+async def get_current_user_with_tier(
+    auth_serv: AuthService = Depends(get_auth_serv),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """get_current_user with the user's current entitlement, in one query."""
+    return await auth_serv.auth_user(credentials.credentials, with_tier=True)
+
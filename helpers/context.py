@@ -1,6 +1,7 @@
 from contextlib import contextmanager
 
-from db.session import get_session
+from db.session import Session, engine
+from db.unit_of_work import UnitOfWork
 from repositories.plan_repositories import PlanRepository
 from repositories.subscription_repositories import SubscriptionRepository
 from repositories.user_repositories import UserRepository
@@ -8,35 +9,67 @@ from services.customer_service import CustomerService
 from services.subscription_service import SubscriptionService
 
 
+@contextmanager
+def unit_of_work():
+    """Session whose repository writes are committed once, on exit.
+
+    Usage:
+        with unit_of_work() as session:
+            UserRepository(session).create(...)
+            SubscriptionRepository(session).create(...)
+    """
+    session = Session(engine)
+    try:
+        with UnitOfWork(session):
+            yield session
+    finally:
+        session.close()
+
+
 @contextmanager
 def get_subscription_service():
-    """Get SubscriptionService with proper session cleanup.
+    """Get SubscriptionService running in a single unit of work.
 
     Usage:
         with get_subscription_service() as service:
             service.handle_invoice_paid(info)
     """
-    session = next(get_session())
-    try:
+    with unit_of_work() as session:
         yield SubscriptionService(
             SubscriptionRepository(session),
             UserRepository(session),
             PlanRepository(session),
         )
-    finally:
-        session.close()
 
 
 @contextmanager
 def get_customer_service():
-    """Get CustomerService with proper session cleanup.
+    """Get CustomerService running in a single unit of work.
 
     Usage:
         with get_customer_service() as service:
             service.handle_customer_created(info)
     """
-    session = next(get_session())
-    try:
+    with unit_of_work() as session:
         yield CustomerService(UserRepository(session))
-    finally:
-        session.close()
\ No newline at end of file
+
+
+@contextmanager
+def get_customer_onboarding():
+    """Get CustomerService and SubscriptionService sharing one unit of work.
+
+    Usage:
+        with get_customer_onboarding() as (customers, subscriptions):
+            user = customers.handle_customer_created(info)
+            subscriptions.handle_customer_sub_basic(info.stripe_id, user=user)
+    """
+    with unit_of_work() as session:
+        user_repo = UserRepository(session)
+        yield (
+            CustomerService(user_repo),
+            SubscriptionService(
+                SubscriptionRepository(session),
+                user_repo,
+                PlanRepository(session),
+            ),
+        )
@@ -3,17 +3,28 @@ from db.session import create_db_and_tables
 from contextlib import asynccontextmanager
 from api import users, subscriptions, plans, auth, webhooks, products, health
 from core.logger import register_exceptions_handlers
+from db.routing import register_read_your_writes
+from core.loop_monitor import (
+    LOOP_MONITOR_ENABLED,
+    loop_monitor,
+    register_loop_monitor,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # create_db_and_tables()
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
     yield
+    await loop_monitor.stop()
 
 
 app = FastAPI(lifespan=lifespan)
 
 register_exceptions_handlers(app)
+register_read_your_writes(app)
+register_loop_monitor(app)
 
 app.include_router(users.router)
 app.include_router(subscriptions.router)
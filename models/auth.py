@@ -1,5 +1,8 @@
+from pydantic import BaseModel
 from sqlmodel import SQLModel, Field
-from datetime import datetime as dt, timezone
+from datetime import datetime as dt
+
+from db.types import UTCDateTime, utcnow
 
 
 class Sessions(SQLModel, table=True):
@@ -9,5 +12,12 @@ class Sessions(SQLModel, table=True):
     is_active: bool = Field(default=True)
     use_count: int = Field(default=0, ge=0)
 
-    created_at: dt = Field(default_factory=lambda: dt.now(timezone.utc))
+    created_at: dt = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    expires_at: dt = Field(index=True, sa_type=UTCDateTime)
+
+
+class ReadExpiredSession(BaseModel):
+    # No jti: it identifies the refresh token
+    sub: str
+    is_active: bool
     expires_at: dt
@@ -1,11 +1,16 @@
 from typing import Optional
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field
 
 
 class Plans(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("stripe_price_id", name="uq_plans_stripe_price_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     stripe_price_id: str
-    name: str
+    name: str = Field(index=True)
     description: Optional[str]
     price_cents: int
     interval: str
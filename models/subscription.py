@@ -1,23 +1,33 @@
-from datetime import datetime as dt, timezone
+from datetime import datetime as dt
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from schemas.enums import SubscriptionTier, SubscriptionStatus
 from .user import Users
 from .plan import Plans
+from db.types import UTCDateTime, utcnow
+
+# stripe_subscription_id shared by every free trial
+FREE_TRIAL_SUBSCRIPTION_ID = "sub_free"
 
 
 class Subscriptions(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_subscriptions_user_id_is_active", "user_id", "is_active"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
     plan_id: int = Field(foreign_key="plans.id")
-    stripe_subscription_id: str
+    # Not unique: every free trial uses FREE_TRIAL_SUBSCRIPTION_ID
+    stripe_subscription_id: str = Field(index=True)
     tier: SubscriptionTier = Field(default=SubscriptionTier.free)
     status: SubscriptionStatus
-    current_period_end: dt
+    current_period_end: dt = Field(sa_type=UTCDateTime)
 
-    created_at: dt = Field(default_factory=lambda: dt.now(timezone.utc))
-    updated_at: dt = Field(default_factory=lambda: dt.now(timezone.utc))
-    canceled_at: Optional[dt] = None
+    created_at: dt = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    updated_at: dt = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    canceled_at: Optional[dt] = Field(default=None, sa_type=UTCDateTime)
 
     is_active: bool = Field(default=False)
     user: Users = Relationship(back_populates="subscriptions")
@@ -1,16 +1,30 @@
+from datetime import datetime as dt
 from typing import List, Optional, TYPE_CHECKING
 from pydantic import BaseModel, EmailStr
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
+from schemas.enums import SubscriptionTier
+from db.types import UTCDateTime
 
 if TYPE_CHECKING:
     from .subscription import Subscriptions
 
 
 class Users(SQLModel, table=True):
+    __table_args__ = (
+        UniqueConstraint("email", name="uq_users_email"),
+        UniqueConstraint("stripe_customer_id", name="uq_users_stripe_customer_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     email: EmailStr
     stripe_customer_id: Optional[str]
 
+    # Denormalized from the active subscriptions by SubscriptionService
+    # handlers, in the same transaction as the subscription change
+    effective_tier: Optional[SubscriptionTier] = Field(default=None, index=True)
+    entitlement_expires_at: Optional[dt] = Field(default=None, sa_type=UTCDateTime)
+
     subscriptions: List["Subscriptions"] = Relationship(back_populates="user")
 
 
@@ -21,4 +35,7 @@ class CreateUser(BaseModel):
 class ReadUser(BaseModel):
     id: int
     email: str
-    stripe_customer_id: str
+    stripe_customer_id: Optional[str] = None
+    # None when the user has no active subscription
+    effective_tier: Optional[SubscriptionTier] = None
+    entitlement_expires_at: Optional[dt] = None
@@ -0,0 +1,35 @@
+from datetime import datetime as dt
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+from db.types import UTCDateTime, utcnow
+
+
+class WebhookEvents(SQLModel, table=True):
+    """Outbox of verified Stripe events waiting to be published to Celery."""
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Dispatcher scan: pending rows only, oldest first
+        Index(
+            "ix_webhook_events_pending",
+            "created_at",
+            postgresql_where=text("sent_at IS NULL"),
+            sqlite_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    # Stripe event id: a redelivery hits the primary key and is dropped
+    id: str = Field(primary_key=True, max_length=255)
+    type: str
+    payload: Dict[str, Any] = Field(
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    )
+
+    created_at: dt = Field(default_factory=utcnow, sa_type=UTCDateTime)
+    sent_at: Optional[dt] = Field(default=None, sa_type=UTCDateTime)
+    attempts: int = Field(default=0)
+    last_error: Optional[str] = None
@@ -1,11 +1,56 @@
 from fastapi import Depends
 from core.logger import logger
-from db.session import Session, get_session, select, SQLAlchemyError
+from db.session import (
+    Session,
+    AsyncSession,
+    get_session,
+    get_async_session,
+    select,
+    SQLAlchemyError,
+    commit,
+    async_commit,
+    rollback,
+    async_rollback,
+)
 from sqlmodel import or_
-from models.user import Users
 from models.auth import Sessions
+from repositories.statements import (
+    ACTIVE_SESSIONS_BY_SUB,
+    DELETE_SESSIONS_BY_SUB,
+    PURGE_SESSIONS_BATCH,
+    ROTATE_SESSION,
+    SESSION_BY_JTI,
+    UNLAPSED_ENTITLEMENT_BY_USER,
+    USER_BY_EMAIL,
+    USER_BY_ID,
+    USER_ENTITLEMENT_BY_ID,
+)
 from datetime import datetime, timezone
 from schemas.exceptions import DatabaseError
+from schemas.pagination import DEFAULT_PAGE_LIMIT
+from typing import Optional
+
+
+def _expired_sessions_stmt(limit: int, cursor: Optional[str]):
+    """Keyset page of expired/inactive sessions ordered by jti (primary key).
+
+    Fetches limit + 1 rows so the caller can tell if there is a next page.
+    jti is only selected for the cursor, it is not part of the response.
+    """
+    stmt = (
+        select(Sessions.jti, Sessions.sub, Sessions.is_active, Sessions.expires_at)
+        .where(
+            or_(
+                Sessions.is_active == False,
+                Sessions.expires_at < datetime.now(timezone.utc),
+            )
+        )
+        .order_by(Sessions.jti)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(Sessions.jti > cursor)
+    return stmt
 
 
 class AuthRepository:
@@ -13,57 +58,198 @@ class AuthRepository:
         self.session = session
 
     def get_user_by_id(self, user_id: int):
-        stmt = select(Users).where(Users.id == user_id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(USER_BY_ID, params={"user_id": user_id}).first()
 
     def get_user_whit_email(self, email: str):
-        stmt = select(Users).where(Users.email == email)
-        return self.session.exec(stmt).first()
+        return self.session.exec(USER_BY_EMAIL, params={"email": email}).first()
 
     def new_session(self, jti: str, sub: str, expires_at: datetime):
         try:
             new_session = Sessions(jti=jti, sub=sub, expires_at=expires_at)
             self.session.add(new_session)
-            self.session.commit()
+            commit(self.session)
             self.session.refresh(new_session)
             return new_session
 
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             logger.error(f"[AuthRepository.new_session] Database error: {e}")
             raise DatabaseError(e, "[AuthRepository.new_session]")
 
     def delete_session(self, actual_session: Sessions):
         try:
             self.session.delete(actual_session)
-            self.session.commit()
+            commit(self.session)
 
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             logger.error(f"[AuthRepository.delete_session] Database error: {e}")
             raise DatabaseError(e, "[AuthRepository.delete_session]")
 
     def get_session_with_jti(self, jti: str):
-        stmt = select(Sessions).where(Sessions.jti == jti)
-        return self.session.exec(stmt).first()
+        return self.session.exec(SESSION_BY_JTI, params={"jti": jti}).first()
 
     def get_active_sessions(self, sub: str):
-        stmt = select(Sessions).where(Sessions.sub == sub, Sessions.is_active == True)
-        return self.session.exec(stmt).all()
-
-    def get_expired_sessions(self):
-        stmt = select(
-            Sessions.sub,
-            Sessions.is_active,
-            Sessions.expires_at,
-        ).where(
-            or_(
-                Sessions.is_active == False,
-                Sessions.expires_at < datetime.now(timezone.utc),
+        return self.session.exec(ACTIVE_SESSIONS_BY_SUB, params={"sub": sub}).all()
+
+    def get_expired_sessions(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None
+    ):
+        return self.session.exec(_expired_sessions_stmt(limit, cursor)).all()
+
+    def purge_expired_sessions(self, batch_size: int) -> int:
+        """Delete up to batch_size expired/inactive sessions; returns the count."""
+        try:
+            result = self.session.exec(
+                PURGE_SESSIONS_BATCH,
+                params={"now": datetime.now(timezone.utc), "batch_size": batch_size},
             )
+            commit(self.session)
+            return result.rowcount
+
+        except SQLAlchemyError as e:
+            rollback(self.session)
+            logger.error(
+                f"[AuthRepository.purge_expired_sessions] Database error: {e}"
+            )
+            raise DatabaseError(e, "[AuthRepository.purge_expired_sessions]")
+
+
+class AsyncAuthRepository:
+    """AuthRepository over an AsyncSession, used by the async auth routes."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_user_by_id(self, user_id: int):
+        return (
+            await self.session.exec(USER_BY_ID, params={"user_id": user_id})
+        ).first()
+
+    async def get_user_whit_email(self, email: str):
+        return (
+            await self.session.exec(USER_BY_EMAIL, params={"email": email})
+        ).first()
+
+    async def get_entitlement(self, user_id: int):
+        """(effective_tier, entitlement_expires_at) of the user, or None."""
+        return (
+            await self.session.exec(
+                USER_ENTITLEMENT_BY_ID, params={"user_id": user_id}
+            )
+        ).first()
+
+    async def get_unlapsed_entitlement(self, user_id: int):
+        """(highest unlapsed active tier, its expiry) or None."""
+        return (
+            await self.session.exec(
+                UNLAPSED_ENTITLEMENT_BY_USER,
+                params={"user_id": user_id, "now": datetime.now(timezone.utc)},
+            )
+        ).first()
+
+    async def new_session(self, jti: str, sub: str, expires_at: datetime):
+        try:
+            new_session = Sessions(jti=jti, sub=sub, expires_at=expires_at)
+            self.session.add(new_session)
+            await async_commit(self.session)
+            await self.session.refresh(new_session)
+            return new_session
+
+        except SQLAlchemyError as e:
+            await async_rollback(self.session)
+            logger.error(f"[AsyncAuthRepository.new_session] Database error: {e}")
+            raise DatabaseError(e, "[AsyncAuthRepository.new_session]")
+
+    async def delete_session(self, actual_session: Sessions):
+        try:
+            await self.session.delete(actual_session)
+            await async_commit(self.session)
+
+        except SQLAlchemyError as e:
+            await async_rollback(self.session)
+            logger.error(f"[AsyncAuthRepository.delete_session] Database error: {e}")
+            raise DatabaseError(e, "[AsyncAuthRepository.delete_session]")
+
+    async def rotate_session(
+        self, old_jti: str, sub: str, new_jti: str, expires_at: datetime
+    ):
+        """Replace old_jti with new_jti atomically; None if old_jti is gone."""
+        try:
+            row = (
+                await self.session.exec(
+                    ROTATE_SESSION,
+                    params={
+                        "old_jti": old_jti,
+                        "sub": sub,
+                        "new_jti": new_jti,
+                        "created_at": datetime.now(timezone.utc),
+                        "expires_at": expires_at,
+                    },
+                )
+            ).first()
+            await async_commit(self.session)
+
+        except SQLAlchemyError as e:
+            await async_rollback(self.session)
+            logger.error(f"[AsyncAuthRepository.rotate_session] Database error: {e}")
+            raise DatabaseError(e, "[AsyncAuthRepository.rotate_session]")
+
+        if row is None:
+            return None
+        return Sessions(
+            jti=row.jti,
+            sub=row.sub,
+            created_at=row.created_at,
+            expires_at=row.expires_at,
         )
-        return self.session.exec(stmt).all()
+
+    async def delete_sessions_for_sub(self, sub: str) -> int:
+        """Single DELETE of every session of sub; returns how many were live.
+
+        Revoked and expired rows are deleted too but not counted, so 0 means
+        sub had nothing left to log out of.
+        """
+        try:
+            result = await self.session.exec(
+                DELETE_SESSIONS_BY_SUB, params={"sub": sub}
+            )
+            now = datetime.now(timezone.utc)
+            live = sum(
+                1
+                for is_active, expires_at in result.all()
+                if is_active and expires_at > now
+            )
+            await async_commit(self.session)
+            return live
+
+        except SQLAlchemyError as e:
+            await async_rollback(self.session)
+            logger.error(
+                f"[AsyncAuthRepository.delete_sessions_for_sub] Database error: {e}"
+            )
+            raise DatabaseError(e, "[AsyncAuthRepository.delete_sessions_for_sub]")
+
+    async def get_session_with_jti(self, jti: str):
+        return (
+            await self.session.exec(SESSION_BY_JTI, params={"jti": jti})
+        ).first()
+
+    async def get_active_sessions(self, sub: str):
+        return (
+            await self.session.exec(ACTIVE_SESSIONS_BY_SUB, params={"sub": sub})
+        ).all()
+
+    async def get_expired_sessions(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None
+    ):
+        stmt = _expired_sessions_stmt(limit, cursor)
+        return (await self.session.exec(stmt)).all()
 
 
 def get_auth_repo(session: Session = Depends(get_session)):
     return AuthRepository(session)
+
+
+def get_async_auth_repo(session: AsyncSession = Depends(get_async_session)):
+    return AsyncAuthRepository(session)
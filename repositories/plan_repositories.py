@@ -2,30 +2,49 @@ from typing import Optional
 from fastapi import Depends
 from core.logger import logger
 from models.plan import Plans
-from db.session import SQLAlchemyError, get_session, Session, select
+from repositories.statements import PLAN_BY_ID, PLAN_BY_NAME, PLAN_BY_PRICE_ID
+from db.session import (
+    SQLAlchemyError,
+    commit,
+    rollback,
+    get_session,
+    get_async_session,
+    get_read_session,
+    get_async_read_session,
+    Session,
+    AsyncSession,
+    select,
+)
 from schemas.enums import SubscriptionTier
 from schemas.exceptions import DatabaseError, PlanNotFound
+from schemas.pagination import DEFAULT_PAGE_LIMIT
+
+
+def _plans_page_stmt(limit: int, cursor: Optional[int]):
+    """Keyset page ordered by id; fetches limit + 1 to detect a next page."""
+    stmt = select(Plans).order_by(Plans.id).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(Plans.id > cursor)
+    return stmt
 
 
 class PlanRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def get_all_plans(self):
-        stmt = select(Plans)
-        return self.session.exec(stmt).all()
+    def get_all_plans(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        return self.session.exec(_plans_page_stmt(limit, cursor)).all()
 
     def get_plan_by_id(self, id: str) -> Plans | None:
-        stmt = select(Plans).where(Plans.stripe_price_id == id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(PLAN_BY_PRICE_ID, params={"price_id": id}).first()
 
     def get_plan_by_plan_id(self, id: int) -> Plans | None:
-        stmt = select(Plans).where(Plans.id == id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(PLAN_BY_ID, params={"plan_id": id}).first()
 
     def get_plan_by_tier(self, tier: SubscriptionTier) -> Plans | None:
-        stmt = select(Plans).where(Plans.name == tier.lower())
-        return self.session.exec(stmt).first()
+        return self.session.exec(PLAN_BY_NAME, params={"name": tier.lower()}).first()
 
     def create(
         self,
@@ -44,9 +63,9 @@ class PlanRepository:
                 interval=interval,
             )
             self.session.add(plan)
-            self.session.commit()
+            commit(self.session)
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "PlanRepository.create")
 
     def update(
@@ -75,12 +94,12 @@ class PlanRepository:
             if description:
                 old_product.description = description
 
-            self.session.commit()
+            commit(self.session)
             self.session.refresh(old_product)
             return old_product
 
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "PlanRepository.update")
 
     def delete(self, price_id: str):
@@ -91,13 +110,48 @@ class PlanRepository:
             if plans:
                 for plan in plans:
                     self.session.delete(plan)
-                self.session.commit()
+                commit(self.session)
                 return
             raise PlanNotFound(price_id)
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "PlanRepository.delete")
 
 
+class AsyncPlanRepository:
+    """Read side of PlanRepository over an AsyncSession."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_all_plans(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        return (await self.session.exec(_plans_page_stmt(limit, cursor))).all()
+
+    async def get_plan_by_id(self, id: str) -> Plans | None:
+        return (
+            await self.session.exec(PLAN_BY_PRICE_ID, params={"price_id": id})
+        ).first()
+
+    async def get_plan_by_plan_id(self, id: int) -> Plans | None:
+        return (
+            await self.session.exec(PLAN_BY_ID, params={"plan_id": id})
+        ).first()
+
+    async def get_plan_by_tier(self, tier: SubscriptionTier) -> Plans | None:
+        return (
+            await self.session.exec(PLAN_BY_NAME, params={"name": tier.lower()})
+        ).first()
+
+
 def get_plan_repo(session: Session = Depends(get_session)):
     return PlanRepository(session)
+
+
+def get_read_plan_repo(session: Session = Depends(get_read_session)):
+    return PlanRepository(session)
+
+
+def get_async_plan_repo(session: AsyncSession = Depends(get_async_session)):
+    return AsyncPlanRepository(session)
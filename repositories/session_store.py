@@ -0,0 +1,204 @@
+"""Refresh-session storage behind one interface.
+
+SESSION_STORE=postgres (default) keeps sessions in the Sessions table through
+AsyncAuthRepository. SESSION_STORE=redis keeps one key per jti with a native
+TTL, plus a per-sub set of jtis for logout-all, so login/refresh/logout don't
+touch Postgres and expired sessions disappear on their own.
+"""
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Union
+
+from dotenv import load_dotenv
+from fastapi import Depends
+from redis.exceptions import RedisError
+
+from core.logger import logger
+from core.redis_client import get_async_redis
+from models.auth import Sessions
+from repositories.auth_repositories import AsyncAuthRepository, get_async_auth_repo
+from schemas.exceptions import DatabaseError
+
+load_dotenv()
+
+SESSION_STORE = os.getenv("SESSION_STORE", "postgres").lower()
+
+SESSION_KEY = "session:{jti}"
+USER_SESSIONS_KEY = "sessions:{sub}"
+
+
+class PostgresSessionStore:
+    """Sessions table, through the auth repository."""
+
+    def __init__(self, auth_repo: AsyncAuthRepository) -> None:
+        self.auth_repo = auth_repo
+
+    async def new_session(self, jti: str, sub: str, expires_at: datetime) -> Sessions:
+        return await self.auth_repo.new_session(jti=jti, sub=sub, expires_at=expires_at)
+
+    async def get_session_with_jti(self, jti: str) -> Optional[Sessions]:
+        return await self.auth_repo.get_session_with_jti(jti)
+
+    async def rotate_session(
+        self, old_jti: str, sub: str, new_jti: str, expires_at: datetime
+    ) -> Optional[Sessions]:
+        return await self.auth_repo.rotate_session(
+            old_jti=old_jti, sub=sub, new_jti=new_jti, expires_at=expires_at
+        )
+
+    async def get_active_sessions(self, sub: str) -> List[Sessions]:
+        return await self.auth_repo.get_active_sessions(sub)
+
+    async def delete_session(self, actual_session: Sessions) -> None:
+        await self.auth_repo.delete_session(actual_session)
+
+    async def delete_all_sessions(self, sub: str) -> int:
+        return await self.auth_repo.delete_sessions_for_sub(sub)
+
+
+def _dump(session: Sessions) -> str:
+    return json.dumps(
+        {
+            "sub": session.sub,
+            "created_at": session.created_at.isoformat(),
+            "expires_at": session.expires_at.isoformat(),
+        }
+    )
+
+
+def _load(jti: str, raw) -> Sessions:
+    data = json.loads(raw)
+    return Sessions(
+        jti=jti,
+        sub=data["sub"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        expires_at=datetime.fromisoformat(data["expires_at"]),
+    )
+
+
+# KEYS: old session, new session, user set
+# ARGV: sub, old jti, new jti, new session JSON, expire-at (unix seconds)
+ROTATE_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 0 end
+if cjson.decode(raw)['sub'] ~= ARGV[1] then return 0 end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[3], ARGV[2])
+redis.call('SET', KEYS[2], ARGV[4], 'EXAT', ARGV[5])
+redis.call('SADD', KEYS[3], ARGV[3])
+redis.call('EXPIREAT', KEYS[3], ARGV[5])
+return 1
+"""
+
+
+class RedisSessionStore:
+    """session:<jti> -> JSON with EXPIREAT, sessions:<sub> -> set of jtis."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        # EVALSHA after the first call; redis-py reloads the script if needed
+        self._rotate = client.register_script(ROTATE_SCRIPT)
+
+    async def new_session(self, jti: str, sub: str, expires_at: datetime) -> Sessions:
+        session = Sessions(jti=jti, sub=sub, expires_at=expires_at)
+        expire_at = int(expires_at.timestamp())
+        user_key = USER_SESSIONS_KEY.format(sub=sub)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.set(SESSION_KEY.format(jti=jti), _dump(session), exat=expire_at)
+                pipe.sadd(user_key, jti)
+                # Refresh lifetimes are fixed, so the newest session expires last
+                pipe.expireat(user_key, expire_at)
+                await pipe.execute()
+            return session
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.new_session] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.new_session]")
+
+    async def get_session_with_jti(self, jti: str) -> Optional[Sessions]:
+        try:
+            raw = await self.client.get(SESSION_KEY.format(jti=jti))
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.get_session_with_jti] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.get_session_with_jti]")
+        return _load(jti, raw) if raw is not None else None
+
+    async def rotate_session(
+        self, old_jti: str, sub: str, new_jti: str, expires_at: datetime
+    ) -> Optional[Sessions]:
+        session = Sessions(jti=new_jti, sub=sub, expires_at=expires_at)
+        try:
+            rotated = await self._rotate(
+                keys=[
+                    SESSION_KEY.format(jti=old_jti),
+                    SESSION_KEY.format(jti=new_jti),
+                    USER_SESSIONS_KEY.format(sub=sub),
+                ],
+                args=[sub, old_jti, new_jti, _dump(session), int(expires_at.timestamp())],
+            )
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.rotate_session] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.rotate_session]")
+        return session if rotated else None
+
+    async def get_active_sessions(self, sub: str) -> List[Sessions]:
+        user_key = USER_SESSIONS_KEY.format(sub=sub)
+        try:
+            jtis = [
+                jti.decode() if isinstance(jti, bytes) else jti
+                for jti in await self.client.smembers(user_key)
+            ]
+            if not jtis:
+                return []
+
+            raws = await self.client.mget([SESSION_KEY.format(jti=jti) for jti in jtis])
+
+            expired = [jti for jti, raw in zip(jtis, raws) if raw is None]
+            if expired:
+                await self.client.srem(user_key, *expired)
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.get_active_sessions] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.get_active_sessions]")
+
+        return [_load(jti, raw) for jti, raw in zip(jtis, raws) if raw is not None]
+
+    async def delete_session(self, actual_session: Sessions) -> None:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(SESSION_KEY.format(jti=actual_session.jti))
+                pipe.srem(USER_SESSIONS_KEY.format(sub=actual_session.sub), actual_session.jti)
+                await pipe.execute()
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.delete_session] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.delete_session]")
+
+    async def delete_all_sessions(self, sub: str) -> int:
+        user_key = USER_SESSIONS_KEY.format(sub=sub)
+        try:
+            jtis = [
+                jti.decode() if isinstance(jti, bytes) else jti
+                for jti in await self.client.smembers(user_key)
+            ]
+            if not jtis:
+                return 0
+            # Keys that already expired just count as 0 in the DEL
+            deleted = await self.client.delete(
+                *(SESSION_KEY.format(jti=jti) for jti in jtis), user_key
+            )
+        except RedisError as e:
+            logger.error(f"[RedisSessionStore.delete_all_sessions] Redis error: {e}")
+            raise DatabaseError(e, "[RedisSessionStore.delete_all_sessions]")
+        # Minus the set itself
+        return max(deleted - 1, 0)
+
+
+SessionStore = Union[PostgresSessionStore, RedisSessionStore]
+
+
+def get_session_store(
+    auth_repo: AsyncAuthRepository = Depends(get_async_auth_repo),
+):
+    if SESSION_STORE == "redis":
+        return RedisSessionStore(get_async_redis())
+    return PostgresSessionStore(auth_repo)
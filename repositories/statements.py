@@ -0,0 +1,252 @@
+"""Prebuilt statements for the hot repository lookups.
+
+Built once at import time with bindparam() placeholders and executed with
+session.exec(STMT, params={...}). A Select memoizes its cache key, so reusing
+the same object skips rebuilding the construct and the cache key on every
+call, and the compiled form is always found in the engine's compiled cache.
+"""
+from sqlalchemy import (
+    and_,
+    bindparam,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    null,
+    or_,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import select
+
+from db.types import UTCDateTime
+from models.auth import Sessions
+from models.plan import Plans
+from models.subscription import FREE_TRIAL_SUBSCRIPTION_ID, Subscriptions
+from models.user import Users
+from models.webhook_event import WebhookEvents
+from schemas.enums import SubscriptionTier
+
+USER_BY_ID = select(Users).where(Users.id == bindparam("user_id"))
+
+# Primary-key read of the entitlement REFRESH_ENTITLEMENT keeps on the user
+USER_ENTITLEMENT_BY_ID = select(
+    Users.effective_tier, Users.entitlement_expires_at
+).where(Users.id == bindparam("user_id"))
+
+USER_BY_EMAIL = select(Users).where(Users.email == bindparam("email"))
+
+USER_BY_CUSTOMER_ID = select(Users).where(
+    Users.stripe_customer_id == bindparam("customer_id")
+)
+
+PLAN_BY_PRICE_ID = select(Plans).where(Plans.stripe_price_id == bindparam("price_id"))
+
+PLAN_BY_ID = select(Plans).where(Plans.id == bindparam("plan_id"))
+
+PLAN_BY_NAME = select(Plans).where(Plans.name == bindparam("name"))
+
+SUBSCRIPTION_BY_STRIPE_ID = select(Subscriptions).where(
+    Subscriptions.stripe_subscription_id == bindparam("sub_id")
+)
+
+ACTIVE_SUBSCRIPTIONS_BY_USER = select(Subscriptions).where(
+    Subscriptions.is_active == True,
+    Subscriptions.user_id == bindparam("user_id"),
+)
+
+# Free trial already granted to the user (customer.created replayed)
+FREE_TRIAL_BY_USER = (
+    select(Subscriptions.id)
+    .where(
+        Subscriptions.user_id == bindparam("user_id"),
+        or_(
+            Subscriptions.tier == SubscriptionTier.free,
+            Subscriptions.stripe_subscription_id == FREE_TRIAL_SUBSCRIPTION_ID,
+        ),
+    )
+    .limit(1)
+)
+
+ACTIVE_TIERS_BY_USER = select(Subscriptions.tier).where(
+    Subscriptions.is_active == True,
+    Subscriptions.user_id == bindparam("user_id"),
+)
+
+# Tier level in SQL, so "highest active tier" can be an ORDER BY ... LIMIT 1
+TIER_LEVEL = case(
+    *((Subscriptions.tier == tier, tier.level) for tier in SubscriptionTier),
+    else_=0,
+)
+
+# The free trial has no billing period (its current_period_end is the day
+# it was granted), so a FREE entitlement never lapses.
+ENTITLEMENT_EXPIRES_AT = case(
+    (Subscriptions.tier == SubscriptionTier.free, null()),
+    else_=Subscriptions.current_period_end,
+)
+
+_TOP_ACTIVE_SUBSCRIPTION = (
+    select(Subscriptions.tier, Subscriptions.current_period_end)
+    .where(Subscriptions.user_id == Users.id, Subscriptions.is_active == True)
+    .order_by(TIER_LEVEL.desc(), Subscriptions.current_period_end.desc())
+    .limit(1)
+)
+
+# Recompute the user's denormalized entitlement from their active
+# subscriptions; both become NULL when none is active.
+REFRESH_ENTITLEMENT = (
+    update(Users)
+    .where(Users.id == bindparam("user_id"))
+    .values(
+        effective_tier=_TOP_ACTIVE_SUBSCRIPTION.with_only_columns(
+            Subscriptions.tier
+        ).scalar_subquery(),
+        entitlement_expires_at=_TOP_ACTIVE_SUBSCRIPTION.with_only_columns(
+            ENTITLEMENT_EXPIRES_AT
+        ).scalar_subquery(),
+    )
+    .execution_options(synchronize_session=False)
+)
+
+# Highest active, unlapsed entitlement of a user, for when the one stored
+# on the user row is past its period end and no renewal webhook came yet:
+# a lapsed paid subscription doesn't count, so this falls back to the next
+# tier (e.g. the free trial) or to no row at all.
+UNLAPSED_ENTITLEMENT_BY_USER = (
+    select(Subscriptions.tier, ENTITLEMENT_EXPIRES_AT)
+    .where(
+        Subscriptions.user_id == bindparam("user_id"),
+        Subscriptions.is_active == True,
+        or_(
+            Subscriptions.tier == SubscriptionTier.free,
+            Subscriptions.current_period_end > bindparam("now", type_=UTCDateTime),
+        ),
+    )
+    .order_by(TIER_LEVEL.desc(), Subscriptions.current_period_end.desc())
+    .limit(1)
+)
+
+SUBSCRIPTION_FOR_USER = (
+    select(Subscriptions)
+    .join(Users)
+    .where(
+        Subscriptions.stripe_subscription_id == bindparam("sub_id"),
+        Subscriptions.user_id == Users.id,
+        Users.stripe_customer_id == bindparam("customer_id"),
+    )
+)
+
+SUBSCRIPTION_BY_CUSTOMER_ID = (
+    select(Subscriptions)
+    .join(Users)
+    .where(
+        Subscriptions.user_id == Users.id,
+        Users.stripe_customer_id == bindparam("customer_id"),
+    )
+)
+
+SESSION_BY_JTI = select(Sessions).where(Sessions.jti == bindparam("jti"))
+
+ACTIVE_SESSIONS_BY_SUB = select(Sessions).where(
+    Sessions.sub == bindparam("sub"), Sessions.is_active == True
+)
+
+# Every session of sub goes, but only the live ones count as closed
+DELETE_SESSIONS_BY_SUB = (
+    delete(Sessions)
+    .where(Sessions.sub == bindparam("sub"))
+    .returning(Sessions.is_active, Sessions.expires_at)
+)
+
+# One bounded batch of dead sessions. SKIP LOCKED lets concurrent purges (or
+# a logout holding a row) proceed without waiting on each other.
+PURGE_SESSIONS_BATCH = delete(Sessions).where(
+    Sessions.jti.in_(
+        select(Sessions.jti)
+        .where(
+            or_(
+                Sessions.is_active == False,
+                Sessions.expires_at < bindparam("now"),
+            )
+        )
+        .limit(bindparam("batch_size"))
+        .with_for_update(skip_locked=True)
+    )
+)
+
+# Refresh rotation in one statement: the old session is deleted and the new
+# one inserted only if the delete found it (and its user still exists). A
+# concurrent replay of the same jti blocks on the row lock, then deletes
+# nothing and inserts nothing.
+_rotated_session = (
+    delete(Sessions)
+    .where(Sessions.jti == bindparam("old_jti"), Sessions.sub == bindparam("sub"))
+    .returning(Sessions.sub)
+    .cte("rotated_session")
+)
+
+ROTATE_SESSION = (
+    insert(Sessions)
+    .from_select(
+        ["jti", "sub", "is_active", "use_count", "created_at", "expires_at"],
+        select(
+            bindparam("new_jti", type_=Sessions.__table__.c.jti.type),
+            _rotated_session.c.sub,
+            true(),
+            literal(0),
+            bindparam("created_at", type_=Sessions.__table__.c.created_at.type),
+            bindparam("expires_at", type_=Sessions.__table__.c.expires_at.type),
+        ).select_from(
+            _rotated_session.join(Users, Users.email == _rotated_session.c.sub)
+        ),
+    )
+    .add_cte(_rotated_session)
+    .returning(Sessions.jti, Sessions.sub, Sessions.created_at, Sessions.expires_at)
+)
+
+# Outbox write: a redelivered event id inserts (and returns) nothing
+INSERT_WEBHOOK_EVENT = (
+    pg_insert(WebhookEvents)
+    .values(
+        id=bindparam("event_id"),
+        type=bindparam("type"),
+        payload=bindparam("payload"),
+        created_at=bindparam("created_at"),
+        attempts=0,
+    )
+    .on_conflict_do_nothing(index_elements=["id"])
+    .returning(WebhookEvents.id)
+)
+
+# Which of the given event ids were already published by the dispatcher
+SENT_WEBHOOK_EVENT_IDS = select(WebhookEvents.id).where(
+    WebhookEvents.id.in_(bindparam("event_ids", expanding=True)),
+    WebhookEvents.sent_at.is_not(None),
+)
+
+# Unsent events: still pending, or dead letters that ran out of attempts.
+# Both sides read the ix_webhook_events_pending partial index.
+WEBHOOK_OUTBOX_BACKLOG = select(
+    func.count()
+    .filter(WebhookEvents.attempts < bindparam("max_attempts"))
+    .label("pending"),
+    func.count()
+    .filter(WebhookEvents.attempts >= bindparam("max_attempts"))
+    .label("dead_letter"),
+).where(WebhookEvents.sent_at.is_(None))
+
+# Oldest pending events; rows held by another dispatcher are skipped
+CLAIM_WEBHOOK_EVENTS = (
+    select(WebhookEvents)
+    .where(
+        WebhookEvents.sent_at.is_(None),
+        WebhookEvents.attempts < bindparam("max_attempts"),
+    )
+    .order_by(WebhookEvents.created_at)
+    .limit(bindparam("batch_size"))
+    .with_for_update(skip_locked=True)
+)
+
@@ -1,9 +1,30 @@
 from fastapi import Depends
-from db.session import Session, get_session, select, SQLAlchemyError
+from db.session import (
+    Session,
+    AsyncSession,
+    get_session,
+    get_async_session,
+    get_read_session,
+    get_async_read_session,
+    select,
+    SQLAlchemyError,
+    commit,
+    rollback,
+)
+from sqlalchemy import update
 from models.subscription import Subscriptions
 from models.user import Users
+from repositories.statements import (
+    ACTIVE_SUBSCRIPTIONS_BY_USER,
+    ACTIVE_TIERS_BY_USER,
+    FREE_TRIAL_BY_USER,
+    SUBSCRIPTION_BY_CUSTOMER_ID,
+    SUBSCRIPTION_BY_STRIPE_ID,
+    SUBSCRIPTION_FOR_USER,
+)
 from schemas.enums import SubscriptionTier, SubscriptionStatus
 from schemas.exceptions import DatabaseError, SubscriptionNotFound
+from schemas.pagination import DEFAULT_PAGE_LIMIT
 from core.logger import logger
 from typing import Optional, Union
 from datetime import datetime, timezone
@@ -16,47 +37,46 @@ def _normalize_status(status: Union[str, SubscriptionStatus]) -> SubscriptionSta
     return SubscriptionStatus.from_stripe(status)
 
 
+def _subscriptions_page_stmt(limit: int, cursor: Optional[int]):
+    """Keyset page ordered by id; fetches limit + 1 to detect a next page."""
+    stmt = select(Subscriptions).order_by(Subscriptions.id).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(Subscriptions.id > cursor)
+    return stmt
+
+
 class SubscriptionRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
     def get_subscription_by_id(self, id: str):
-        stmt = select(Subscriptions).where(Subscriptions.stripe_subscription_id == id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(SUBSCRIPTION_BY_STRIPE_ID, params={"sub_id": id}).first()
 
-    def get_all_subscription(self):
-        stmt = select(Subscriptions)
-        return self.session.exec(stmt).all()
+    def get_all_subscription(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        return self.session.exec(_subscriptions_page_stmt(limit, cursor)).all()
 
     def get_all_subscription_by_user(self, user_id: int):
-        stmt = select(Subscriptions).where(
-            Subscriptions.is_active == True,
-            Subscriptions.user_id == user_id,
+        return self.session.exec(
+            ACTIVE_SUBSCRIPTIONS_BY_USER, params={"user_id": user_id}
+        ).all()
+
+    def has_free_trial(self, user_id: int) -> bool:
+        return (
+            self.session.exec(FREE_TRIAL_BY_USER, params={"user_id": user_id}).first()
+            is not None
         )
-        return self.session.exec(stmt).all()
 
     def get_subscription_for_user(self, sub_id: str, customer_id: str):
-        stmt = (
-            select(Subscriptions)
-            .join(Users)
-            .where(
-                Subscriptions.stripe_subscription_id == sub_id,
-                Subscriptions.user_id == Users.id,
-                Users.stripe_customer_id == customer_id,
-            )
-        )
-        return self.session.exec(stmt).first()
+        return self.session.exec(
+            SUBSCRIPTION_FOR_USER, params={"sub_id": sub_id, "customer_id": customer_id}
+        ).first()
 
     def get_sub_with_customer_id(self, customer_id: str):
-        stmt = (
-            select(Subscriptions)
-            .join(Users)
-            .where(
-                Subscriptions.user_id == Users.id,
-                Users.stripe_customer_id == customer_id,
-            )
-        )
-        return self.session.exec(stmt).first()
+        return self.session.exec(
+            SUBSCRIPTION_BY_CUSTOMER_ID, params={"customer_id": customer_id}
+        ).first()
 
     def create(
         self,
@@ -66,6 +86,7 @@ class SubscriptionRepository:
         status: Union[str, SubscriptionStatus],
         current_period_end: datetime,
         tier: SubscriptionTier,
+        is_active: bool = False,
     ):
         try:
             status = _normalize_status(status)
@@ -76,11 +97,12 @@ class SubscriptionRepository:
                 status=status,
                 current_period_end=current_period_end,
                 tier=tier,
+                is_active=is_active,
             )
             self.session.add(new_susc)
-            self.session.commit()
+            commit(self.session)
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "SubscriptionRepository.create")
 
     def update(
@@ -99,11 +121,42 @@ class SubscriptionRepository:
             if current_period_end:
                 sub_found.current_period_end = current_period_end
 
-            self.session.commit()
+            commit(self.session)
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "SubscriptionRepository.update")
 
+    def _update_for_user(self, sub_id: str, customer_id: str, values: dict, *guards):
+        """Single UPDATE ... FROM users ... RETURNING; not-found comes from the
+        returned rows instead of a prior SELECT.
+
+        guards are extra conditions on the row: a subscription that exists
+        but fails them is left alone and None is returned.
+        """
+        stmt = (
+            update(Subscriptions)
+            .where(
+                Subscriptions.stripe_subscription_id == sub_id,
+                Subscriptions.user_id == Users.id,
+                Users.stripe_customer_id == customer_id,
+                *guards,
+            )
+            .values(**values)
+            .returning(Subscriptions.id, Subscriptions.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = self.session.exec(stmt).all()
+
+        if not rows and guards and self.get_subscription_for_user(sub_id, customer_id):
+            return None
+
+        if not rows:
+            logger.warning(f"Subscription {sub_id} not found")
+            raise SubscriptionNotFound(sub_id)
+
+        commit(self.session)
+        return rows[0]
+
     def update_for_user(
         self,
         sub_id: str,
@@ -113,52 +166,128 @@ class SubscriptionRepository:
         is_active: bool,
     ):
         try:
-            status = _normalize_status(status)
-            sub_found = self.get_subscription_for_user(sub_id, customer_id)
-
-            if not sub_found:
-                logger.warning(f"Subscription {sub_id} not found")
-                raise SubscriptionNotFound(sub_id)
+            values = {
+                "is_active": is_active,
+                "updated_at": datetime.now(timezone.utc),
+            }
 
             if status:
-                sub_found.status = status
+                values["status"] = _normalize_status(status)
 
             if current_period_end:
-                sub_found.current_period_end = current_period_end
-
-            sub_found.is_active = is_active
-
-            sub_found.updated_at = datetime.now(timezone.utc)
+                values["current_period_end"] = current_period_end
 
-            self.session.commit()
+            # Events can arrive out of order (e.g. an updated queued behind
+            # the deleted): a cancelled subscription stays cancelled
+            row = self._update_for_user(
+                sub_id, customer_id, values, Subscriptions.canceled_at.is_(None)
+            )
+            if row is None:
+                logger.info(f"Subscription {sub_id} is cancelled, update ignored")
+            return row
         except SQLAlchemyError as e:
-            self.session.rollback()
+            rollback(self.session)
             raise DatabaseError(e, "SubscriptionRepository.update_for_user")
 
     def cancel(
         self, sub_id: str, customer_id: str, status: Union[str, SubscriptionStatus], current_period_end: datetime
     ):
         try:
-            status = _normalize_status(status)
-            sub_found = self.get_subscription_for_user(sub_id, customer_id)
+            values = {
+                "status": _normalize_status(status),
+                "current_period_end": current_period_end,
+                "is_active": False,
+                "canceled_at": datetime.now(timezone.utc),
+            }
 
-            if not sub_found:
-                logger.warning(f"Subscription {sub_id} not found")
-                raise SubscriptionNotFound(sub_id)
+            return self._update_for_user(sub_id, customer_id, values)
+        except SQLAlchemyError as e:
+            rollback(self.session)
+            raise DatabaseError(e, "SubscriptionRepository.cancel")
 
-            sub_found.status = status
 
-            sub_found.current_period_end = current_period_end
+class AsyncSubscriptionRepository:
+    """Read side of SubscriptionRepository over an AsyncSession."""
 
-            sub_found.is_active = False
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
 
-            sub_found.canceled_at = datetime.now(timezone.utc)
+    async def get_subscription_by_id(self, id: str):
+        return (
+            await self.session.exec(SUBSCRIPTION_BY_STRIPE_ID, params={"sub_id": id})
+        ).first()
 
-            self.session.commit()
-        except SQLAlchemyError as e:
-            self.session.rollback()
-            raise DatabaseError(e, "SubscriptionRepository.update_for_user")
+    async def get_all_subscription(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        stmt = _subscriptions_page_stmt(limit, cursor)
+        return (await self.session.exec(stmt)).all()
+
+    async def get_all_subscription_by_user(self, user_id: int):
+        return (
+            await self.session.exec(
+                ACTIVE_SUBSCRIPTIONS_BY_USER, params={"user_id": user_id}
+            )
+        ).all()
+
+    async def get_active_tiers(self, user_id: int):
+        return (
+            await self.session.exec(ACTIVE_TIERS_BY_USER, params={"user_id": user_id})
+        ).all()
+
+    async def get_subscription_for_user(self, sub_id: str, customer_id: str):
+        return (
+            await self.session.exec(
+                SUBSCRIPTION_FOR_USER,
+                params={"sub_id": sub_id, "customer_id": customer_id},
+            )
+        ).first()
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def stream_subscriptions(
+    session: Session,
+    status: Optional[SubscriptionStatus] = None,
+    tier: Optional[SubscriptionTier] = None,
+    period_end_from: Optional[datetime] = None,
+    period_end_to: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+):
+    """Yield subscription rows through a server-side cursor.
+
+    Only batch_size rows are held in memory at a time.
+    """
+    stmt = select(*Subscriptions.__table__.columns).order_by(Subscriptions.id)
+
+    if status:
+        stmt = stmt.where(Subscriptions.status == status)
+    if tier:
+        stmt = stmt.where(Subscriptions.tier == tier)
+    if period_end_from:
+        stmt = stmt.where(Subscriptions.current_period_end >= period_end_from)
+    if period_end_to:
+        stmt = stmt.where(Subscriptions.current_period_end < period_end_to)
+
+    stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+    for row in session.exec(stmt):
+        yield row._mapping
 
 
 def get_subs_repo(session: Session = Depends(get_session)):
     return SubscriptionRepository(session)
+
+
+def get_read_subs_repo(session: Session = Depends(get_read_session)):
+    return SubscriptionRepository(session)
+
+
+def get_async_subs_repo(session: AsyncSession = Depends(get_async_session)):
+    return AsyncSubscriptionRepository(session)
+
+
+def get_async_read_subs_repo(
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    return AsyncSubscriptionRepository(session)
@@ -1,7 +1,33 @@
 from fastapi import Depends
-from db.session import Session, get_session, select, SQLAlchemyError
+from db.session import (
+    Session,
+    AsyncSession,
+    get_session,
+    get_async_session,
+    get_read_session,
+    get_async_read_session,
+    select,
+    SQLAlchemyError,
+    commit,
+)
 from models.user import Users
+from repositories.statements import (
+    REFRESH_ENTITLEMENT,
+    USER_BY_CUSTOMER_ID,
+    USER_BY_EMAIL,
+    USER_BY_ID,
+)
 from schemas.exceptions import DatabaseError
+from schemas.pagination import DEFAULT_PAGE_LIMIT
+from typing import Optional
+
+
+def _users_page_stmt(limit: int, cursor: Optional[int]):
+    """Keyset page ordered by id; fetches limit + 1 to detect a next page."""
+    stmt = select(Users).order_by(Users.id).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(Users.id > cursor)
+    return stmt
 
 
 class UserRepository:
@@ -9,26 +35,24 @@ class UserRepository:
         self.session = session
 
     def get_user_by_email(self, email: str):
-        stmt = select(Users).where(Users.email == email)
-        return self.session.exec(stmt).first()
+        return self.session.exec(USER_BY_EMAIL, params={"email": email}).first()
 
     def get_user_by_id(self, id: int):
-        stmt = select(Users).where(Users.id == id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(USER_BY_ID, params={"user_id": id}).first()
 
     def get_user_by_customer_id(self, customer_id: str):
-        stmt = select(Users).where(Users.stripe_customer_id == customer_id)
-        return self.session.exec(stmt).first()
+        return self.session.exec(USER_BY_CUSTOMER_ID, params={"customer_id": customer_id}).first()
 
-    def get_users(self):
-        stmt = select(Users)
-        return self.session.exec(stmt).all()
+    def get_users(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        return self.session.exec(_users_page_stmt(limit, cursor)).all()
 
-    def create(self, email: str):
+    def create(self, email: str, stripe_customer_id: Optional[str] = None):
         try:
-            user = Users(email=email, stripe_customer_id=None)
+            user = Users(email=email, stripe_customer_id=stripe_customer_id)
             self.session.add(user)
-            self.session.commit()
+            commit(self.session)
             self.session.refresh(user)
             return user
         except SQLAlchemyError as e:
@@ -40,18 +64,79 @@ class UserRepository:
 
             user.stripe_customer_id = stripe_id
 
-            self.session.commit()
+            commit(self.session)
         except SQLAlchemyError as e:
             raise DatabaseError(e, "UserRepository.update")
 
+    def refresh_entitlement(self, user_id: int):
+        """Recompute effective_tier/entitlement_expires_at from active subscriptions."""
+        try:
+            self.session.exec(REFRESH_ENTITLEMENT, params={"user_id": user_id})
+            commit(self.session)
+        except SQLAlchemyError as e:
+            raise DatabaseError(e, "UserRepository.refresh_entitlement")
+
     def delete(self, customer_id: str):
         try:
             user = self.get_user_by_customer_id(customer_id)
             self.session.delete(user)
-            self.session.commit()
+            commit(self.session)
         except SQLAlchemyError as e:
             raise DatabaseError(e, "UserRepository.delete")
 
 
+class AsyncUserRepository:
+    """Read side of UserRepository over an AsyncSession."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_user_by_email(self, email: str):
+        return (
+            await self.session.exec(USER_BY_EMAIL, params={"email": email})
+        ).first()
+
+    async def get_user_by_id(self, id: int):
+        return (
+            await self.session.exec(USER_BY_ID, params={"user_id": id})
+        ).first()
+
+    async def get_user_by_customer_id(self, customer_id: str):
+        return (
+            await self.session.exec(USER_BY_CUSTOMER_ID, params={"customer_id": customer_id})
+        ).first()
+
+    async def get_users(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        return (await self.session.exec(_users_page_stmt(limit, cursor))).all()
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def stream_users(session: Session, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield user rows through a server-side cursor."""
+    stmt = (
+        select(*Users.__table__.columns)
+        .order_by(Users.id)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for row in session.exec(stmt):
+        yield row._mapping
+
+
 def get_user_repository(session: Session = Depends(get_session)) -> UserRepository:
     return UserRepository(session)
+
+
+def get_read_user_repository(
+    session: Session = Depends(get_read_session),
+) -> UserRepository:
+    return UserRepository(session)
+
+
+def get_async_user_repository(
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncUserRepository:
+    return AsyncUserRepository(session)
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from fastapi import Depends
+from core.logger import logger
+from models.webhook_event import WebhookEvents
+from repositories.statements import (
+    CLAIM_WEBHOOK_EVENTS,
+    INSERT_WEBHOOK_EVENT,
+    SENT_WEBHOOK_EVENT_IDS,
+    WEBHOOK_OUTBOX_BACKLOG,
+)
+from db.session import (
+    SQLAlchemyError,
+    commit,
+    async_commit,
+    rollback,
+    async_rollback,
+    get_async_session,
+    Session,
+    AsyncSession,
+)
+from schemas.exceptions import DatabaseError
+
+
+class WebhookEventRepository:
+    """Dispatcher side of the webhook outbox."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def claim_pending(self, batch_size: int, max_attempts: int) -> List[WebhookEvents]:
+        """Lock up to batch_size pending events until the transaction ends."""
+        return self.session.exec(
+            CLAIM_WEBHOOK_EVENTS,
+            params={"batch_size": batch_size, "max_attempts": max_attempts},
+        ).all()
+
+    def sent_ids(self, event_ids: List[str]) -> Set[str]:
+        """The subset of event_ids already published from the outbox."""
+        if not event_ids:
+            return set()
+        return set(
+            self.session.exec(
+                SENT_WEBHOOK_EVENT_IDS, params={"event_ids": event_ids}
+            ).all()
+        )
+
+    def mark_sent(self, events: List[WebhookEvents]) -> None:
+        try:
+            now = datetime.now(timezone.utc)
+            for event in events:
+                event.sent_at = now
+            commit(self.session)
+        except SQLAlchemyError as e:
+            rollback(self.session)
+            logger.error(f"[WebhookEventRepository.mark_sent] Database error: {e}")
+            raise DatabaseError(e, "[WebhookEventRepository.mark_sent]")
+
+    def mark_failed(self, event: WebhookEvents, error: str) -> None:
+        try:
+            event.attempts += 1
+            event.last_error = error[:1000]
+            commit(self.session)
+        except SQLAlchemyError as e:
+            rollback(self.session)
+            logger.error(f"[WebhookEventRepository.mark_failed] Database error: {e}")
+            raise DatabaseError(e, "[WebhookEventRepository.mark_failed]")
+
+
+class AsyncWebhookEventRepository:
+    """Ingest side of the webhook outbox, used by the webhook route."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add(self, event_id: str, type: str, payload: Dict[str, Any]) -> bool:
+        """Store a verified event; False if it was already stored."""
+        try:
+            result = await self.session.exec(
+                INSERT_WEBHOOK_EVENT,
+                params={
+                    "event_id": event_id,
+                    "type": type,
+                    "payload": payload,
+                    "created_at": datetime.now(timezone.utc),
+                },
+            )
+            inserted = result.first() is not None
+            await async_commit(self.session)
+            return inserted
+
+        except SQLAlchemyError as e:
+            await async_rollback(self.session)
+            logger.error(f"[AsyncWebhookEventRepository.add] Database error: {e}")
+            raise DatabaseError(e, "[AsyncWebhookEventRepository.add]")
+
+    async def backlog(self, max_attempts: int) -> Dict[str, int]:
+        """Counts of unsent events: pending and dead-lettered."""
+        try:
+            result = await self.session.exec(
+                WEBHOOK_OUTBOX_BACKLOG, params={"max_attempts": max_attempts}
+            )
+            pending, dead_letter = result.one()
+            return {"pending": pending, "dead_letter": dead_letter}
+
+        except SQLAlchemyError as e:
+            logger.error(f"[AsyncWebhookEventRepository.backlog] Database error: {e}")
+            raise DatabaseError(e, "[AsyncWebhookEventRepository.backlog]")
+
+
+def get_async_webhook_event_repo(session: AsyncSession = Depends(get_async_session)):
+    return AsyncWebhookEventRepository(session)
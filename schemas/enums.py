@@ -14,6 +14,11 @@ class SubscriptionTier(str, Enum):
     def has_access_to(self, required_tier: "SubscriptionTier") -> bool:
         return self.level >= required_tier.level
 
+    @classmethod
+    def highest(cls, tiers) -> "SubscriptionTier":
+        """Highest of the given tiers; FREE when there are none."""
+        return max((cls(tier) for tier in tiers), key=lambda t: t.level, default=cls.free)
+
 
 class SubscriptionStatus(str, Enum):
     incomplete = "incomplete"
@@ -47,3 +52,8 @@ class SubscriptionStatus(str, Enum):
             "paid": cls.paid,  # paid -> subscription activa
         }
         return mapping.get(stripe_status, cls.incomplete)
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
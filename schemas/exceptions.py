@@ -1,3 +1,5 @@
+import math
+
 from fastapi import HTTPException, status
 from sqlalchemy.sql.coercions import expect_col_expression_collection
 
@@ -142,3 +144,23 @@ class InsufficientSubscriptionError(HTTPException):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"User with tier {user_tier.value} is not sufficient. Need for minimun {expected_tier.value} to access",
         )
+
+
+class InvalidCursor(HTTPException):
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid pagination cursor {cursor}",
+        )
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
@@ -0,0 +1,75 @@
+import base64
+import json
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import Query
+from pydantic import BaseModel
+
+from schemas.exceptions import InvalidCursor
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams(BaseModel):
+    limit: int = DEFAULT_PAGE_LIMIT
+    cursor: Any = None
+
+
+def encode_cursor(value: Any) -> str:
+    """Opaque cursor holding the last ordering key of a page."""
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_type: type = int) -> Any:
+    """Ordering key inside cursor; InvalidCursor unless it is a key_type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    # Exact type: bool is an int and must not reach an id comparison
+    if type(value) is not key_type:
+        raise InvalidCursor(cursor)
+    return value
+
+
+def cursor_page_params(key_type: type = int):
+    """page_params for an endpoint ordered by a key_type key."""
+
+    def dependency(
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+        cursor: Optional[str] = Query(None),
+    ) -> PageParams:
+        return PageParams(
+            limit=limit,
+            cursor=decode_cursor(cursor, key_type) if cursor else None,
+        )
+
+    return dependency
+
+
+# Integer primary keys (users, plans, subscriptions)
+page_params = cursor_page_params(int)
+# String primary keys (sessions by jti)
+str_page_params = cursor_page_params(str)
+
+
+def paginate(rows: Sequence[T], limit: int, key: Callable[[T], Any]) -> Page[T]:
+    """Build a Page from up to limit + 1 rows fetched by a keyset query.
+
+    The extra row only tells whether there is a next page.
+    """
+    rows = list(rows or [])
+    if len(rows) > limit:
+        items = rows[:limit]
+        return Page(items=items, next_cursor=encode_cursor(key(items[-1])))
+    return Page(items=rows, next_cursor=None)
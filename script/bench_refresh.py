@@ -0,0 +1,95 @@
+"""Refresh-token rotation throughput against the configured backend.
+
+Uses the real AuthService with one AsyncSession + UnitOfWork per call, like
+a request, so it measures whatever DATABASE_URL / SESSION_STORE point at.
+Each client logs in once and then chains refreshes; at the end the same
+token is replayed concurrently to check that exactly one rotation wins.
+
+Usage:
+    python -m script.bench_refresh [clients] [rounds]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlmodel import select
+
+from db.session import AsyncSession, async_engine
+from db.unit_of_work import UnitOfWork
+from models.user import Users
+from repositories.auth_repositories import AsyncAuthRepository
+from repositories.session_store import (
+    SESSION_STORE,
+    PostgresSessionStore,
+    RedisSessionStore,
+)
+from core.redis_client import get_async_redis
+from schemas.auth_request import RefreshTokenRequest
+from schemas.exceptions import InvalidToken
+from services.auth_services import AuthService
+
+BENCH_EMAIL = "bench-refresh@example.com"
+
+
+async def _call(method: str, *args):
+    session = AsyncSession(async_engine, expire_on_commit=False)
+    try:
+        async with UnitOfWork(session):
+            repo = AsyncAuthRepository(session)
+            store = (
+                RedisSessionStore(get_async_redis())
+                if SESSION_STORE == "redis"
+                else PostgresSessionStore(repo)
+            )
+            return await getattr(AuthService(repo, store), method)(*args)
+    finally:
+        await session.close()
+
+
+async def _ensure_user() -> None:
+    async with AsyncSession(async_engine) as session:
+        stmt = select(Users).where(Users.email == BENCH_EMAIL)
+        if not (await session.exec(stmt)).first():
+            session.add(Users(email=BENCH_EMAIL, stripe_customer_id=None))
+            await session.commit()
+
+
+async def _client(rounds: int, latencies: list) -> None:
+    token = (await _call("login", BENCH_EMAIL))["refresh_token"]
+    for _ in range(rounds):
+        start = time.perf_counter()
+        token = (await _call("refresh", RefreshTokenRequest(refresh=token))).refresh_token
+        latencies.append(time.perf_counter() - start)
+
+
+async def _replay() -> int:
+    token = (await _call("login", BENCH_EMAIL))["refresh_token"]
+    request = RefreshTokenRequest(refresh=token)
+    results = await asyncio.gather(
+        *(_call("refresh", request) for _ in range(2)), return_exceptions=True
+    )
+    return sum(1 for result in results if not isinstance(result, InvalidToken))
+
+
+async def main(clients: int = 10, rounds: int = 50) -> None:
+    await _ensure_user()
+
+    latencies: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(rounds, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"store: {SESSION_STORE}  clients: {clients}  rounds: {rounds}")
+    print(f"throughput: {len(latencies) / elapsed:8.1f} refresh/s")
+    print(f"p50:        {statistics.median(latencies) * 1000:8.2f} ms")
+    print(f"p99:        {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.2f} ms")
+    print(f"concurrent replay winners: {await _replay()} (expected 1)")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,59 @@
+"""Per-call overhead of rebuilt vs prebuilt repository statements.
+
+Runs the same user lookup against an in-memory SQLite database, once building
+select(...).where(...) on every call (the old repository code) and once
+executing the prebuilt statement from repositories.statements.
+
+Usage:
+    python -m script.bench_statements [iterations]
+"""
+import sys
+import time
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from models import auth, plan, subscription, user  # noqa: F401 (table metadata)
+from models.user import Users
+from repositories.statements import USER_BY_CUSTOMER_ID
+
+
+def _rebuilt(session: Session, customer_id: str):
+    stmt = select(Users).where(Users.stripe_customer_id == customer_id)
+    return session.exec(stmt).first()
+
+
+def _prebuilt(session: Session, customer_id: str):
+    return session.exec(USER_BY_CUSTOMER_ID, params={"customer_id": customer_id}).first()
+
+
+def _timeit(fn, session: Session, iterations: int) -> float:
+    for _ in range(100):
+        fn(session, "cus_bench")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(session, "cus_bench")
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int = 20000) -> None:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.add(Users(email="bench@example.com", stripe_customer_id="cus_bench"))
+        session.commit()
+
+        rebuilt = _timeit(_rebuilt, session, iterations)
+        prebuilt = _timeit(_prebuilt, session, iterations)
+
+    print(f"iterations: {iterations}")
+    print(f"rebuilt statement:  {rebuilt:8.1f} us/call")
+    print(f"prebuilt statement: {prebuilt:8.1f} us/call")
+    print(f"saved:              {rebuilt - prebuilt:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,78 @@
+"""Per-request CPU cost of verifying and decoding a Stripe webhook.
+
+Compares the old path (stripe.Webhook.construct_event, then pulling
+data.object back into a dict) with core.stripe_webhook on a synthetic
+signed invoice.paid event of roughly the given size. No database or
+broker is involved: this is the work done on the event loop.
+
+Usage:
+    python -m script.bench_webhooks [payload_kb] [iterations]
+"""
+import hashlib
+import hmac
+import json
+import sys
+import time
+
+import stripe
+
+from core.stripe_webhook import decode_event, verify_signature
+
+SECRET = "whsec_bench"
+
+
+def _payload(size_kb: int) -> bytes:
+    lines = [
+        {"id": f"il_{i}", "amount": 1000 + i, "description": "x" * 40}
+        for i in range(max(1, size_kb * 1024 // 90))
+    ]
+    event = {
+        "id": "evt_bench",
+        "object": "event",
+        "type": "invoice.paid",
+        "data": {"object": {"id": "in_bench", "lines": {"data": lines}}},
+    }
+    return json.dumps(event).encode()
+
+
+def _sign(payload: bytes) -> str:
+    timestamp = int(time.time())
+    sig = hmac.new(
+        SECRET.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={sig}"
+
+
+def stripe_path(payload: bytes, header: str) -> dict:
+    event = stripe.Webhook.construct_event(payload, header, SECRET)
+    return event["data"]["object"]
+
+
+def fast_path(payload: bytes, header: str) -> dict:
+    verify_signature(payload, header, secret=SECRET)
+    return decode_event(payload)[2]
+
+
+def _run(fn, payload: bytes, header: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload, header)
+    return iterations / (time.perf_counter() - start)
+
+
+def main(size_kb: int = 20, iterations: int = 2000) -> None:
+    payload = _payload(size_kb)
+    header = _sign(payload)
+    assert stripe_path(payload, header) == fast_path(payload, header)
+
+    old = _run(stripe_path, payload, header, iterations)
+    new = _run(fast_path, payload, header, iterations)
+
+    print(f"payload: {len(payload) / 1024:.1f} KB  iterations: {iterations}")
+    print(f"construct_event: {old:10.1f} events/s")
+    print(f"fast path:       {new:10.1f} events/s  ({new / old:.1f}x)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,271 @@
+"""Replay exported Stripe events straight through the webhook handlers.
+
+Reads a JSONL file with one Stripe event per line (e.g. the output of
+`stripe events list`), and runs each event synchronously through the same
+Celery task the webhook would enqueue: payload parser + service, in its
+own unit of work. No HTTP endpoint, outbox or broker is involved.
+
+Events are split into partitions by customer id and each partition is
+processed by one worker process, oldest event first, so the order is kept
+per customer while different customers are replayed in parallel.
+
+Every payload goes through its parsers/* model and parse function first;
+events that fail are reported instead of reaching the task, and --dry-run
+stops there, without touching the database. Events the outbox dispatcher
+already published (sent_at set) are skipped unless --include-sent is given. Replay skips the Redis dedup,
+so the handlers it reaches must be idempotent: the customer.created trial
+is granted once, subscription and invoice handlers overwrite state.
+
+Usage:
+    python -m script.replay_webhooks events.jsonl [--workers N] [--dry-run]
+        [--include-sent]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from db.session import engine
+from parsers.customer import (
+    CustomerPayload,
+    parse_customer_created,
+    parse_customer_deleted,
+)
+from parsers.invoice import (
+    InvoicePayload,
+    parse_invoice_paid,
+    parse_invoice_payment_failed,
+)
+from parsers.subscription import (
+    SubscriptionPayload,
+    parse_customer_subscription_created,
+    parse_customer_subscription_deleted,
+    parse_customer_subscription_paused,
+    parse_customer_subscription_updated,
+)
+from repositories.webhook_event_repositories import WebhookEventRepository
+from services.webhook_handler_service import EVENT_TASKS
+
+# Payload model and parser the task for each event type runs
+EVENT_PARSERS: Dict[str, Tuple[Type[BaseModel], Callable]] = {
+    "invoice.paid": (InvoicePayload, parse_invoice_paid),
+    "invoice.payment_failed": (InvoicePayload, parse_invoice_payment_failed),
+    "customer.created": (CustomerPayload, parse_customer_created),
+    "customer.deleted": (CustomerPayload, parse_customer_deleted),
+    "customer.subscription.created": (
+        SubscriptionPayload,
+        parse_customer_subscription_created,
+    ),
+    "customer.subscription.updated": (
+        SubscriptionPayload,
+        parse_customer_subscription_updated,
+    ),
+    "customer.subscription.paused": (
+        SubscriptionPayload,
+        parse_customer_subscription_paused,
+    ),
+    "customer.subscription.deleted": (
+        SubscriptionPayload,
+        parse_customer_subscription_deleted,
+    ),
+}
+
+# Ids per outbox lookup
+SENT_LOOKUP_CHUNK = 1000
+
+
+@dataclass
+class ReplayReport:
+    processed: int = 0
+    skipped: int = 0
+    invalid: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    by_type: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "ReplayReport") -> None:
+        self.processed += other.processed
+        self.skipped += other.skipped
+        self.invalid.extend(other.invalid)
+        self.failed.extend(other.failed)
+        self.by_type.update(other.by_type)
+
+
+CUSTOMER_EVENTS = ("customer.created", "customer.updated", "customer.deleted")
+
+
+def customer_id(event: Dict[str, Any]) -> Optional[str]:
+    """Stripe customer the event belongs to."""
+    obj = event["data"]["object"]
+    if event["type"] in CUSTOMER_EVENTS:
+        return obj.get("id")
+    customer = obj.get("customer")
+    # Expanded objects carry the customer inline
+    if isinstance(customer, dict):
+        return customer.get("id")
+    return customer
+
+
+def read_events(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Valid events, oldest first (exports usually list newest first)."""
+    events = []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+            event["type"], event["data"]["object"]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"line {number}: not a Stripe event ({e})", file=sys.stderr)
+            continue
+        events.append(event)
+
+    events.sort(key=lambda event: event.get("created", 0))
+    return events
+
+
+def validate(event: Dict[str, Any]) -> Optional[str]:
+    """Why the task would reject event's payload, or None if it is valid."""
+    model, parse = EVENT_PARSERS[event["type"]]
+    try:
+        parse(model(**event["data"]["object"]))
+    except Exception as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def drop_sent(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Events the outbox dispatcher hasn't published yet."""
+    ids = [event["id"] for event in events if event.get("id")]
+    sent = set()
+    with Session(engine) as session:
+        repo = WebhookEventRepository(session)
+        for start in range(0, len(ids), SENT_LOOKUP_CHUNK):
+            sent |= repo.sent_ids(ids[start : start + SENT_LOOKUP_CHUNK])
+    return [event for event in events if event.get("id") not in sent]
+
+
+def partition(
+    events: List[Dict[str, Any]], workers: int
+) -> List[List[Dict[str, Any]]]:
+    """Split events so that all events of a customer land together, in order."""
+    partitions: List[List[Dict[str, Any]]] = [[] for _ in range(workers)]
+    for event in events:
+        key = customer_id(event) or ""
+        partitions[zlib.crc32(key.encode()) % workers].append(event)
+    return [events for events in partitions if events]
+
+
+def replay_partition(
+    events: List[Dict[str, Any]], dry_run: bool = False
+) -> ReplayReport:
+    report = ReplayReport()
+    for event in events:
+        task = EVENT_TASKS.get(event["type"])
+        if task is None:
+            report.skipped += 1
+            continue
+
+        report.by_type[event["type"]] += 1
+        error = validate(event)
+        if error is not None:
+            report.invalid.append(f"{event.get('id')} ({event['type']}): {error}")
+            continue
+        if dry_run:
+            report.processed += 1
+            continue
+
+        try:
+            # Runs the task body in this process; failures are not retried
+            task(
+                event["data"]["object"], correlation_id=f"replay-{event.get('id')}"
+            )
+            report.processed += 1
+        except Exception as e:
+            report.failed.append(f"{event.get('id')} ({event['type']}): {e}")
+    return report
+
+
+def _init_worker() -> None:
+    # Connections inherited from the parent can't be shared across processes
+    engine.dispose(close=False)
+
+
+def replay(
+    events: List[Dict[str, Any]], workers: int, dry_run: bool = False
+) -> ReplayReport:
+    report = ReplayReport()
+    partitions = partition(events, workers)
+    if workers == 1 or len(partitions) <= 1:
+        for events in partitions:
+            report.merge(replay_partition(events, dry_run))
+        return report
+
+    with ProcessPoolExecutor(
+        max_workers=len(partitions), initializer=_init_worker
+    ) as pool:
+        dry_runs = [dry_run] * len(partitions)
+        for result in pool.map(replay_partition, partitions, dry_runs):
+            report.merge(result)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL file with one Stripe event per line")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="read, order and validate the events without running handlers",
+    )
+    parser.add_argument(
+        "--include-sent",
+        action="store_true",
+        help="also replay events the outbox dispatcher already published",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.path) as f:
+        events = read_events(f)
+    total = len(events)
+    if not (args.dry_run or args.include_sent):
+        events = drop_sent(events)
+    # Per event, not per id: an export can repeat an event
+    already_sent = total - len(events)
+
+    start = time.perf_counter()
+    report = replay(events, max(1, args.workers), args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    print(f"events:    {total}{'  (dry run)' if args.dry_run else ''}")
+    print(f"sent:      {already_sent} (already published, not replayed)")
+    print(f"processed: {report.processed}")
+    print(f"skipped:   {report.skipped} (no handler for the type)")
+    print(f"invalid:   {len(report.invalid)}")
+    print(f"failed:    {len(report.failed)}")
+    for type, count in report.by_type.most_common():
+        print(f"  {type:<32} {count}")
+    rate = report.processed / elapsed if elapsed else 0
+    print(f"elapsed:   {elapsed:.2f} s  ({rate:.1f} events/s)")
+    for invalid in report.invalid:
+        print(f"INVALID {invalid}", file=sys.stderr)
+    for failure in report.failed:
+        print(f"FAILED {failure}", file=sys.stderr)
+
+    return 1 if report.failed or report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Webhook outbox dispatcher.
+
+Polls the webhook_events outbox, publishes pending events to Celery and
+marks them sent. Several dispatchers can run side by side: each batch is
+claimed with FOR UPDATE SKIP LOCKED.
+
+Usage:
+    python -m script.webhook_dispatcher
+"""
+import os
+import time
+
+from core.logger import logger
+from helpers.context import unit_of_work
+from repositories.webhook_event_repositories import WebhookEventRepository
+from services.webhook_outbox_service import (
+    WEBHOOK_OUTBOX_BATCH_SIZE,
+    WebhookOutboxService,
+)
+
+WEBHOOK_OUTBOX_POLL_INTERVAL = float(os.getenv("WEBHOOK_OUTBOX_POLL_INTERVAL", "0.5"))
+
+
+def run_once(batch_size: int = WEBHOOK_OUTBOX_BATCH_SIZE) -> int:
+    with unit_of_work() as session:
+        return WebhookOutboxService(WebhookEventRepository(session)).dispatch_batch(
+            batch_size
+        )
+
+
+def main() -> None:
+    logger.info("[webhook_dispatcher] Started")
+    while True:
+        try:
+            sent = run_once()
+        except Exception as e:
+            logger.error(f"[webhook_dispatcher] Batch failed: {e}")
+            sent = 0
+        # A full batch means there is probably more waiting
+        if sent < WEBHOOK_OUTBOX_BATCH_SIZE:
+            time.sleep(WEBHOOK_OUTBOX_POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
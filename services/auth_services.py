@@ -1,11 +1,28 @@
 from fastapi import Depends
 from pydantic import EmailStr
-from repositories.auth_repositories import AuthRepository, get_auth_repo
+from repositories.auth_repositories import AsyncAuthRepository, get_async_auth_repo
+from repositories.session_store import (
+    PostgresSessionStore,
+    SessionStore,
+    get_session_store,
+)
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from core.logger import logger
+from core.claims import (
+    STATELESS_ACCESS_TOKEN_DURATION,
+    STATELESS_TOKENS,
+    get_claim_version,
+)
+from core.tier_cache import tier_cache
+from core.token_cache import token_cache
+from models.auth import ReadExpiredSession
+from models.user import ReadUser, Users
+from schemas.enums import SubscriptionTier
 from schemas.auth_request import RefreshTokenRequest, Token
+from schemas.pagination import DEFAULT_PAGE_LIMIT, Page, paginate
+from typing import Optional
 from schemas.exceptions import (
     InvalidToken,
     UserNotFoundError,
@@ -25,24 +42,173 @@ SECRET = os.environ.get("SECRET_KEY")
 crypt = CryptContext(schemes=["bcrypt"])
 
 
+def entitlement_lapsed(user) -> bool:
+    """True once the user's stored entitlement is past its period end."""
+    expires_at = getattr(user, "entitlement_expires_at", None)
+    if expires_at is None:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _detached_user(user: Users, **overrides) -> Users:
+    """Copy of user not bound to any session."""
+    values = {
+        "id": user.id,
+        "email": user.email,
+        "stripe_customer_id": user.stripe_customer_id,
+        "effective_tier": user.effective_tier,
+        "entitlement_expires_at": user.entitlement_expires_at,
+    }
+    values.update(overrides)
+    return Users(**values)
+
+
 class AuthService:
-    def __init__(self, auth_repo: AuthRepository):
+    def __init__(
+        self,
+        auth_repo: AsyncAuthRepository,
+        session_store: Optional[SessionStore] = None,
+    ):
         self.auth_repo = auth_repo
+        self.sessions = session_store or PostgresSessionStore(auth_repo)
+
+    async def _access_token(self, user) -> str:
+        """Encode an access token for user.
+
+        With STATELESS_TOKENS the token also carries uid/cid/tier and the
+        claim version, so auth_user can rebuild the user without a query.
+        tier is null when the user has no active subscription.
+        """
+        if STATELESS_TOKENS:
+            version = await get_claim_version(user.id)
+            # Without Redis the claims can't be revoked: issue a regular token
+            if version is not None:
+                # Maintained by the webhook handlers; None: no active subscription
+                tier = getattr(user, "effective_tier", None)
+                expires = datetime.now(timezone.utc) + timedelta(
+                    minutes=STATELESS_ACCESS_TOKEN_DURATION
+                )
+                claims = {
+                    "sub": str(user.email),
+                    "exp": int(expires.timestamp()),
+                    "scope": "api_access",
+                    "uid": user.id,
+                    "cid": user.stripe_customer_id,
+                    "tier": SubscriptionTier(tier).value if tier is not None else None,
+                    "tv": version,
+                }
+                return jwt.encode(claims, SECRET, algorithm=ALGORITHM)
+
+        return self._basic_access_token(user.email)
+
+    def _basic_access_token(self, email: str) -> str:
+        expires = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_DURATION)
+        claims = {
+            "sub": str(email),
+            "exp": int(expires.timestamp()),
+            "scope": "api_access",
+        }
+        return jwt.encode(claims, SECRET, algorithm=ALGORITHM)
+
+    async def _user_from_claims(self, payload: dict) -> Optional[ReadUser]:
+        """ReadUser from a stateless token, or None to fall back to the DB.
+
+        Raises InvalidToken when the claims are outdated so the client
+        refreshes them.
+        """
+        uid = payload.get("uid")
+        if not STATELESS_TOKENS or uid is None:
+            return None
+
+        version = await get_claim_version(uid)
+        if version is None:
+            return None
+
+        if version != payload.get("tv"):
+            logger.info("[AuthService.auth_user] Token Error | Outdated claims")
+            raise InvalidToken
 
-    def get_expired_sessions(self):
+        return ReadUser(
+            id=uid,
+            email=payload["sub"],
+            stripe_customer_id=payload.get("cid"),
+            effective_tier=payload.get("tier"),
+        )
+
+    async def _cached_entitlement(self, user) -> Users:
+        """Copy of user with its entitlement from the tier cache."""
+
+        async def load():
+            row = await self.auth_repo.get_entitlement(user.id)
+            if row is None or row[0] is None:
+                return None, None
+            return SubscriptionTier(row[0]).value, row[1]
+
+        tier, expires_at = await tier_cache.get(user.id, load)
+        return _detached_user(
+            user, effective_tier=tier, entitlement_expires_at=expires_at
+        )
+
+    async def _unlapsed_entitlement(self, user) -> Users:
+        """Copy of user with its highest entitlement that hasn't lapsed."""
+        row = await self.auth_repo.get_unlapsed_entitlement(user.id)
+        tier, expires_at = row if row else (None, None)
+        return _detached_user(
+            user, effective_tier=tier, entitlement_expires_at=expires_at
+        )
+
+    async def get_expired_sessions(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[str] = None
+    ):
         try:
-            exp_sessions = self.auth_repo.get_expired_sessions()
+            exp_sessions = await self.auth_repo.get_expired_sessions(
+                limit=limit, cursor=cursor
+            )
             if exp_sessions:
                 logger.info("[AuthService.get_expired_sessions] Expired Sessions Found")
-                return exp_sessions
+            else:
+                logger.info(
+                    "[AuthService.get_expired_sessions]Expired Sessions not Found"
+                )
 
-            logger.info("[AuthService.get_expired_sessions]Expired Sessions not Found")
-            return {"detail": "No expired sessions"}
+            page = paginate(exp_sessions, limit, key=lambda session: session.jti)
+            return Page(
+                items=[
+                    ReadExpiredSession(
+                        sub=session.sub,
+                        is_active=session.is_active,
+                        expires_at=session.expires_at,
+                    )
+                    for session in page.items
+                ],
+                next_cursor=page.next_cursor,
+            )
         except Exception as e:
             logger.error(f"[AuthService.get_expired_sessions] Unknown error: {e}")
             raise
 
-    def auth_user(self, token: str):
+    async def auth_user(self, token: str, with_tier: bool = False):
+        """User behind an access token.
+
+        with_tier returns the user's current entitlement: effective_tier and
+        entitlement_expires_at as the webhook handlers keep them on the user
+        row. A fresh lookup reads them with the user; a token cache hit, whose
+        user can be up to TOKEN_CACHE_TTL old, takes them from the tier cache,
+        which the handlers invalidate. Only a lapsed entitlement costs another
+        query.
+        """
+        # Already verified: skip the signature check and the user lookup
+        cached = token_cache.get(token)
+        if cached is not None:
+            if not with_tier:
+                return cached
+            user = await self._cached_entitlement(cached)
+            if entitlement_lapsed(user):
+                return await self._unlapsed_entitlement(user)
+            return user
+
         try:
             # Decodes the token
             payload = jwt.decode(token, SECRET, algorithms=ALGORITHM)
@@ -61,7 +227,12 @@ class AuthService:
                 logger.error("[AuthService.auth_user] Token Error | Missing user data")
                 raise InvalidToken
 
-            user = self.auth_repo.get_user_whit_email(email)
+            # jwt.decode already rejected an expired exp
+            claims_user = await self._user_from_claims(payload)
+            if claims_user is not None:
+                return claims_user
+
+            user = await self.auth_repo.get_user_whit_email(email)
             if not user:
                 logger.error("[AuthService.auth_user] Error | User not found")
                 raise UserNotFoundError(email)
@@ -76,6 +247,11 @@ class AuthService:
                 logger.error("[AuthService.auth_user] Token Error | Token expired")
                 raise InvalidToken
 
+            # Detached copy: the cached user outlives this request's session
+            token_cache.put(token, email, _detached_user(user), exp)
+
+            if with_tier and entitlement_lapsed(user):
+                return await self._unlapsed_entitlement(user)
             return user
         except JWTError as e:
             logger.error(f"[AuthService.auth_user] Token error | Error: {e}")
@@ -83,25 +259,14 @@ class AuthService:
 
     async def login(self, email: EmailStr):
         try:
-            user = self.auth_repo.get_user_whit_email(email)
+            user = await self.auth_repo.get_user_whit_email(email)
             if not user:
                 logger.error("[AuthService.login] Login Error | User not found")
                 raise UserNotFoundInLogin
 
-            # Create access token
-            access_expires = datetime.now(timezone.utc) + timedelta(
-                minutes=ACCESS_TOKEN_DURATION
-            )
-
-            access_token = {
-                "sub": str(user.email),
-                "exp": int(access_expires.timestamp()),
-                "scope": "api_access",
-            }
-
-            encoded_access_token = jwt.encode(access_token, SECRET, algorithm=ALGORITHM)
+            encoded_access_token = await self._access_token(user)
 
-            info = self.auth_repo.new_session(
+            info = await self.sessions.new_session(
                 jti=str(uuid.uuid4()),
                 sub=str(user.email),
                 expires_at=(
@@ -130,20 +295,10 @@ class AuthService:
             logger.error(f"[AuthService.login] DatabaseError Error: {e}")
             raise e
 
-    def refresh(self, refresh: RefreshTokenRequest):
+    async def refresh(self, refresh: RefreshTokenRequest):
         try:
-            # Desencrypt the token
-            unverified_token = jwt.get_unverified_claims(refresh)
-            jti = unverified_token.get("jti")
-
-            actual_session = self.auth_repo.get_session_with_jti(jti)
-            if not actual_session:
-                logger.error(
-                    "[AuthService.refresh] Token error | Not found active session for jti: {jti}"
-                )
-                raise InvalidToken
-
-            payload = jwt.decode(refresh)
+            # Verify the token first: a bad token never reaches the store
+            payload = jwt.decode(refresh.refresh, SECRET, algorithms=ALGORITHM)
 
             scope = payload.get("scope")
             if not scope:
@@ -159,10 +314,10 @@ class AuthService:
                 logger.error("[AuthService.refresh] Token error | Not have sub")
                 raise InvalidToken
 
-            user = self.auth_repo.get_user_whit_email(email)
-            if not user:
-                logger.error("[AuthService.refresh] Token error | User not found")
-                raise UserNotFoundError(email)
+            jti = payload.get("jti")
+            if not jti:
+                logger.error("[AuthService.refresh] Token error | Not have jti")
+                raise InvalidToken
 
             exp = payload.get("exp")
             if exp is None:
@@ -174,32 +329,35 @@ class AuthService:
                 logger.error("[AuthService.refresh] Token error | Token expired")
                 raise InvalidToken
 
-            self.auth_repo.delete_session(actual_session)
-
-            # Create a new token
-            access_expires = datetime.now(timezone.utc) + timedelta(
-                minutes=ACCESS_TOKEN_DURATION
-            )
-
-            access_token = {
-                "sub": str(email),
-                "exp": access_expires.timestamp(),
-                "scope": "api_access",
-            }
-            encoded_access_token = jwt.encode(access_token, SECRET, algorithm=ALGORITHM)
-
-            # Create a new session
-            new_session = self.auth_repo.new_session(
-                jti=str(uuid.uuid4()),
+            # Delete the old session and create the new one in one step. A
+            # replayed token finds nothing to delete and loses.
+            new_session = await self.sessions.rotate_session(
+                old_jti=jti,
                 sub=str(email),
+                new_jti=str(uuid.uuid4()),
                 expires_at=datetime.now(timezone.utc)
                 + timedelta(days=REFRESH_TOKEN_DURATION),
             )
+            if not new_session:
+                logger.error(
+                    f"[AuthService.refresh] Token error | Not found active session for jti: {jti}"
+                )
+                raise InvalidToken
+
+            if STATELESS_TOKENS:
+                # The claims need id, customer id and tier
+                user = await self.auth_repo.get_user_whit_email(email)
+                if not user:
+                    logger.error("[AuthService.refresh] Token error | User not found")
+                    raise UserNotFoundError(email)
+                encoded_access_token = await self._access_token(user)
+            else:
+                encoded_access_token = self._basic_access_token(email)
 
             refresh_token = {
                 "jti": new_session.jti,
                 "sub": new_session.sub,
-                "exp": new_session.expires_at.timestamp(),
+                "exp": int(new_session.expires_at.timestamp()),
                 "scope": "token_refresh",
             }
 
@@ -219,23 +377,21 @@ class AuthService:
             logger.error("[AuthService.refresh] Database Error")
             raise e
 
-    def logout(self, sub: str):
+    async def logout(self, sub: str):
         try:
-            active_sessions = self.auth_repo.get_active_sessions(sub)
-
-            user = self.auth_repo.get_user_whit_email(sub)
+            closed = await self.sessions.delete_all_sessions(sub)
 
-            if not active_sessions:
+            if not closed:
+                user = await self.auth_repo.get_user_whit_email(sub)
                 logger.error(
                     f"[AuthService.logout] Not found active sessions for User {user.id}"
                 )
                 raise SessionNotFound(user.id)
 
-            for individual_session in active_sessions:
-                self.auth_repo.delete_session(individual_session)
+            token_cache.invalidate_user(sub)
 
             logger.info(
-                f"[AuthService.logout] All sessions are closed - User {user.id} closed {len(active_sessions)} sessions"
+                f"[AuthService.logout] All sessions are closed - User {sub} closed {closed} sessions"
             )
 
             return {"detail": "Closed all sessions"}
@@ -247,5 +403,8 @@ class AuthService:
             raise e
 
 
-def get_auth_serv(auth_repo: AuthRepository = Depends(get_auth_repo)) -> AuthService:
-    return AuthService(auth_repo)
+def get_auth_serv(
+    auth_repo: AsyncAuthRepository = Depends(get_async_auth_repo),
+    session_store: SessionStore = Depends(get_session_store),
+) -> AuthService:
+    return AuthService(auth_repo, session_store)
@@ -29,12 +29,15 @@ class CustomerService:
         user = self.user_repo.get_user_by_customer_id(data.stripe_id)
 
         if not user:
-            user = self.user_repo.create(email=data.email)
-            self.user_repo.update(id=user.id, stripe_id=data.stripe_id)
+            user = self.user_repo.create(
+                email=data.email, stripe_customer_id=data.stripe_id
+            )
             logger.info(f"Created new user {user.id} for customer {data.stripe_id}")
         else:
             logger.info(f"User {user.id} already exists for customer {data.stripe_id}")
 
+        return user
+
     def handle_customer_deleted(self, data: CustomerDeletedInfo):
         """Handle customer.deleted webhook - deletes user."""
         logger.info(f"Processing customer.deleted - stripe_id: {data.stripe_id}")
@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional
+
+from fastapi import Depends
+from sqlmodel import Session
+
+from core.logger import logger
+from db.session import get_read_session_factory
+from repositories.subscription_repositories import stream_subscriptions
+from repositories.user_repositories import stream_users
+from schemas.enums import ExportFormat, SubscriptionStatus, SubscriptionTier
+
+# Rows buffered per chunk written to the response
+CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _to_primitive(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunks(rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps({k: _to_primitive(v) for k, v in row.items()}))
+        if len(buffer) >= CHUNK_ROWS:
+            yield "\n".join(buffer) + "\n"
+            buffer.clear()
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def _csv_chunks(rows: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow({k: _to_primitive(v) for k, v in row.items()})
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class ExportService:
+    """Streams table exports with constant memory.
+
+    Opens its own session from session_factory because the response body is
+    produced after request dependencies have been closed.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def _encode(self, rows, fmt: ExportFormat) -> Iterator[str]:
+        if fmt == ExportFormat.csv:
+            return _csv_chunks(rows)
+        return _ndjson_chunks(rows)
+
+    def export_subscriptions(
+        self,
+        fmt: ExportFormat,
+        status: Optional[SubscriptionStatus] = None,
+        tier: Optional[SubscriptionTier] = None,
+        period_end_from: Optional[datetime] = None,
+        period_end_to: Optional[datetime] = None,
+    ) -> Iterator[str]:
+        session = self.session_factory()
+        try:
+            rows = stream_subscriptions(
+                session,
+                status=status,
+                tier=tier,
+                period_end_from=period_end_from,
+                period_end_to=period_end_to,
+            )
+            yield from self._encode(rows, fmt)
+        except Exception as e:
+            logger.error(f"[ExportService.export_subscriptions] Error: {e}")
+            raise
+        finally:
+            session.close()
+
+    def export_users(self, fmt: ExportFormat) -> Iterator[str]:
+        session = self.session_factory()
+        try:
+            yield from self._encode(stream_users(session), fmt)
+        except Exception as e:
+            logger.error(f"[ExportService.export_users] Error: {e}")
+            raise
+        finally:
+            session.close()
+
+
+def get_export_service(session_factory=Depends(get_read_session_factory)):
+    return ExportService(session_factory)
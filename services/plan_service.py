@@ -1,5 +1,9 @@
 from fastapi import Depends, HTTPException
-from repositories.plan_repositories import PlanRepository, get_plan_repo
+from repositories.plan_repositories import (
+    PlanRepository,
+    get_plan_repo,
+    get_read_plan_repo,
+)
 from core.stripe_test import (
     create_product,
     create_price,
@@ -10,14 +14,19 @@ from core.stripe_test import (
 )
 from core.logger import logger
 from schemas.exceptions import DatabaseError, PriceNotFound, ProductNotFound
+from schemas.pagination import DEFAULT_PAGE_LIMIT, paginate
+from typing import Optional
 
 
 class PlanService:
     def __init__(self, repo: PlanRepository) -> None:
         self.repo = repo
 
-    def get_all_plans(self):
-        return self.repo.get_all_plans()
+    def get_all_plans(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        plans = self.repo.get_all_plans(limit=limit, cursor=cursor)
+        return paginate(plans, limit, key=lambda plan: plan.id)
 
     def create(self, name: str, description: str, amount: int, money: str):
         try:
@@ -114,3 +123,7 @@ class PlanService:
 
 def get_plan_serv(repo: PlanRepository = Depends(get_plan_repo)):
     return PlanService(repo)
+
+
+def get_read_plan_serv(repo: PlanRepository = Depends(get_read_plan_repo)):
+    return PlanService(repo)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import partial
 from typing import Optional
 
 from fastapi import Depends, HTTPException
@@ -7,8 +8,11 @@ from sqlalchemy import select
 
 from core.stripe_test import cancelSubscription, createSubscription
 from core.logger import logger
+from core.claims import bump_claim_version
+from core.tier_cache import invalidate_tier
 from core.correlation import get_correlation_id
 from db.session import Session, get_session, SQLAlchemyError, select
+from db.unit_of_work import after_commit
 
 
 def _get_logger_with_correlation():
@@ -19,12 +23,21 @@ def _get_logger_with_correlation():
     return logger
 from models.user import Users
 from models.plan import Plans
-from models.subscription import Subscriptions
-from repositories.plan_repositories import PlanRepository, get_plan_repo
-from repositories.user_repositories import UserRepository, get_user_repository
+from models.subscription import FREE_TRIAL_SUBSCRIPTION_ID, Subscriptions
+from repositories.plan_repositories import (
+    PlanRepository,
+    get_plan_repo,
+    get_read_plan_repo,
+)
+from repositories.user_repositories import (
+    UserRepository,
+    get_user_repository,
+    get_read_user_repository,
+)
 from repositories.subscription_repositories import (
     SubscriptionRepository,
     get_subs_repo,
+    get_read_subs_repo,
 )
 from schemas.enums import SubscriptionTier, SubscriptionStatus
 from schemas.exceptions import (
@@ -35,6 +48,7 @@ from schemas.exceptions import (
     UserSubscriptedError,
 )
 from schemas.request import SubID, SubscriptionCreate
+from schemas.pagination import DEFAULT_PAGE_LIMIT, paginate
 
 
 # Info classes for task handlers
@@ -87,8 +101,11 @@ class SubscriptionService:
     def get_by_id(self, id: str):
         return self.repo.get_subscription_by_id(id)
 
-    def get_all_subscription(self):
-        return self.repo.get_all_subscription()
+    def get_all_subscription(
+        self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None
+    ):
+        subs = self.repo.get_all_subscription(limit=limit, cursor=cursor)
+        return paginate(subs, limit, key=lambda sub: sub.id)
 
     def get_all_subscription_by_user(self, id: int):
         return self.repo.get_all_subscription_by_user(id)
@@ -164,24 +181,33 @@ class SubscriptionService:
         """Get logger with correlation ID if available."""
         return _get_logger_with_correlation()
 
-    def _get_existing_subscription(self, sub_id: str, customer_id: str):
-        """Get existing subscription or raise exception.
+    def _entitlement_changed(self, user_id: int):
+        """The user's tier may have changed: recompute it on the user row in
+        this transaction, then drop their cached tier and revoke their
+        stateless tokens once the write is committed."""
+        self.user_repo.refresh_entitlement(user_id)
+        after_commit(self.repo.session, partial(invalidate_tier, user_id))
+        after_commit(self.repo.session, partial(bump_claim_version, user_id))
 
-        Helper to avoid code duplication in handlers.
-        """
-        sub = self.repo.get_subscription_for_user(sub_id=sub_id, customer_id=customer_id)
-        if not sub:
-            raise Exception(f"Subscription {sub_id} not found")
-        return sub
+    def handle_customer_sub_basic(
+        self, customer_id: str, user: Optional[Users] = None
+    ):
+        """Create free trial subscription for user.
 
-    def handle_customer_sub_basic(self, customer_id: str):
-        """Create free trial subscription for user."""
+        user skips the lookup when the caller already has it.
+        """
         logger.info(f"Processing customer_sub_basic - customer_id: {customer_id}")
 
-        user = self.user_repo.get_user_by_customer_id(customer_id)
+        if user is None:
+            user = self.user_repo.get_user_by_customer_id(customer_id)
         if not user:
             raise Exception(f"User with stripe_id {customer_id}")
 
+        # customer.created can be replayed: grant the trial only once
+        if self.repo.has_free_trial(user.id):
+            logger.info(f"User {user.id} already has a free trial, skipping")
+            return
+
         plan = self.plan_repo.get_plan_by_tier(tier=SubscriptionTier.free)
         if not plan:
             raise Exception('Plan with tier FREE not found')
@@ -189,19 +215,13 @@ class SubscriptionService:
         self.repo.create(
             user_id=user.id,
             plan_id=plan.id,
-            subscription_id="sub_free",
+            subscription_id=FREE_TRIAL_SUBSCRIPTION_ID,
             status=SubscriptionStatus.trialing,
             current_period_end=datetime.now(),
             tier=SubscriptionTier.free,
-        )
-
-        self.repo.update_for_user(
-            sub_id="sub_free",
-            customer_id=customer_id,
-            status=SubscriptionStatus.trialing,
-            current_period_end=None,
             is_active=True,
         )
+        self._entitlement_changed(user.id)
 
         logger.info(f"User {user.id} subscribed to trial free successfully")
 
@@ -211,18 +231,18 @@ class SubscriptionService:
             f"Processing invoice.paid - sub_id: {data.subscription_id}, customer_id: {data.customer_id}"
         )
 
-        # Uses helper to avoid repetition
-        self._get_existing_subscription(data.subscription_id, data.customer_id)
-
         status = SubscriptionStatus.from_stripe(data.status)
 
-        self.repo.update_for_user(
+        row = self.repo.update_for_user(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=status,
             current_period_end=data.current_period_end,
             is_active=True,
         )
+        if row is None:
+            return
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} updated successfully")
 
@@ -232,16 +252,16 @@ class SubscriptionService:
             f"Processing invoice.payment_failed - sub_id: {data.subscription_id}, customer_id: {data.customer_id}"
         )
 
-        # Uses helper to avoid repetition
-        self._get_existing_subscription(data.subscription_id, data.customer_id)
-
-        self.repo.update_for_user(
+        row = self.repo.update_for_user(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=SubscriptionStatus.past_due,
             current_period_end=data.current_period_end,
             is_active=False,
         )
+        if row is None:
+            return
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} marked as past_due")
 
@@ -253,13 +273,16 @@ class SubscriptionService:
 
         status = SubscriptionStatus.from_stripe(data.status)
 
-        self.repo.update_for_user(
+        row = self.repo.update_for_user(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=status,
             current_period_end=data.current_period_end,
             is_active=True,
         )
+        if row is None:
+            return
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} created successfully")
 
@@ -271,13 +294,17 @@ class SubscriptionService:
 
         status = SubscriptionStatus.from_stripe(data.status)
 
-        self.repo.update_for_user(
+        row = self.repo.update_for_user(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=status,
             current_period_end=data.current_period_end,
             is_active=data.is_active,
         )
+        if row is None:
+            # Stale: the deleted event was processed first
+            return
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} updated successfully")
 
@@ -289,12 +316,13 @@ class SubscriptionService:
 
         status = SubscriptionStatus.from_stripe(data.status)
 
-        self.repo.cancel(
+        row = self.repo.cancel(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=status,
             current_period_end=data.current_period_end,
         )
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} cancelled successfully")
 
@@ -306,13 +334,16 @@ class SubscriptionService:
 
         status = SubscriptionStatus.from_stripe(data.status)
 
-        self.repo.update_for_user(
+        row = self.repo.update_for_user(
             sub_id=data.subscription_id,
             customer_id=data.customer_id,
             status=status,
             current_period_end=None,
             is_active=False,
         )
+        if row is None:
+            return
+        self._entitlement_changed(row.user_id)
 
         logger.info(f"Subscription {data.subscription_id} paused successfully")
 
@@ -322,4 +353,12 @@ def get_subs_service(
     user_repo: UserRepository = Depends(get_user_repository),
     plan_repo: PlanRepository = Depends(get_plan_repo),
 ) -> SubscriptionService:
-    return SubscriptionService(repo, user_repo, plan_repo)
\ No newline at end of file
+    return SubscriptionService(repo, user_repo, plan_repo)
+
+
+def get_read_subs_service(
+    repo: SubscriptionRepository = Depends(get_read_subs_repo),
+    user_repo: UserRepository = Depends(get_read_user_repository),
+    plan_repo: PlanRepository = Depends(get_read_plan_repo),
+) -> SubscriptionService:
+    return SubscriptionService(repo, user_repo, plan_repo)
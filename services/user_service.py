@@ -1,8 +1,14 @@
 from fastapi import Depends
 from pydantic import EmailStr
 from models.user import CreateUser
-from repositories.user_repositories import UserRepository, get_user_repository
+from repositories.user_repositories import (
+    UserRepository,
+    get_user_repository,
+    get_read_user_repository,
+)
 from schemas.exceptions import DatabaseError
+from schemas.pagination import DEFAULT_PAGE_LIMIT, paginate
+from typing import Optional
 from core.stripe_test import createCustomer, deleteCustomer
 
 
@@ -13,9 +19,9 @@ class UserService:
     def get_user_me(self, id: int):
         return self.repo.get_user_by_id(id)
 
-    def get_users(self):
-        results = self.repo.get_users()
-        return results
+    def get_users(self, limit: int = DEFAULT_PAGE_LIMIT, cursor: Optional[int] = None):
+        results = self.repo.get_users(limit=limit, cursor=cursor)
+        return paginate(results, limit, key=lambda user: user.id)
 
     def create(self, data: CreateUser):
         try:
@@ -48,3 +54,9 @@ def get_user_service(
     repo: UserRepository = Depends(get_user_repository),
 ) -> UserService:
     return UserService(repo)
+
+
+def get_read_user_service(
+    repo: UserRepository = Depends(get_read_user_repository),
+) -> UserService:
+    return UserService(repo)
@@ -1,46 +1,60 @@
 from logging import log
 from fastapi import HTTPException
 from tasks.customer import (
-    customer_created,
+    customer_created_pipeline,
     customer_deleted,
 )
 from tasks.subscriptions import (
     customer_subscription_created,
     customer_subscription_deleted,
+    customer_subscription_paused,
     customer_subscription_updated,
-    customer_sub_basic,
 )
 from tasks.invoice import invoice_paid, invoice_payment_failed
 from core.logger import logger
+from core.webhook_dedup import EventDeduplicator, event_dedup
+from typing import Optional
 
+# Celery task handling each Stripe event type; other types are ignored
+EVENT_TASKS = {
+    "invoice.paid": invoice_paid,
+    "invoice.payment_failed": invoice_payment_failed,
+    "customer.created": customer_created_pipeline,
+    "customer.deleted": customer_deleted,
+    "customer.subscription.created": customer_subscription_created,
+    "customer.subscription.updated": customer_subscription_updated,
+    "customer.subscription.paused": customer_subscription_paused,
+    "customer.subscription.deleted": customer_subscription_deleted,
+}
 
-class WebhooksHandlerService:
-    def handle(self, event: dict):
-        try:
-            type = event["type"]
-            payload = event["data"]["object"]
 
-            match type:
-                case "invoice.paid":
-                    invoice_paid.delay(payload)
-                case "invoice.payment_failed":
-                    invoice_payment_failed.delay(payload)
+class WebhooksHandlerService:
+    def __init__(self, dedup: Optional[EventDeduplicator] = None) -> None:
+        self.dedup = dedup or event_dedup
 
-                case "customer.created":
-                    customer_created.delay(payload)
-                    customer_sub_basic.delay(payload)
-                case "customer.deleted":
-                    customer_deleted.delay(payload)
+    def handle(self, event: dict) -> bool:
+        """Enqueue the tasks for event. False if it was a duplicate delivery."""
+        event_id = event.get("id")
+        if event_id and not self.dedup.claim(event_id):
+            logger.info(f"Duplicate webhook event {event_id} acknowledged")
+            return False
 
-                case "customer.subscription.created":
-                    customer_subscription_created.delay(payload)
-                case "customer.subscription.updated":
-                    customer_subscription_updated.delay(payload)
-                case "customer.subscription.paused":
-                    customer_subscription_updated.delay(payload)
-                case "customer.subscription.deleted":
-                    customer_subscription_deleted.delay(payload)
+        try:
+            self._dispatch(event)
+        except Exception:
+            if event_id:
+                self.dedup.release(event_id)
+            raise
+        return True
 
+    def _dispatch(self, event: dict):
+        try:
+            type = event["type"]
+            payload = event["data"]["object"]
         except KeyError as e:
             logger.warning(f"Invalid event structure: {e}")
             raise HTTPException(400, detail="Invalid event payload")
+
+        task = EVENT_TASKS.get(type)
+        if task is not None:
+            task.delay(payload)
@@ -0,0 +1,54 @@
+import os
+from typing import Optional
+
+from core.logger import logger
+from repositories.webhook_event_repositories import WebhookEventRepository
+from services.webhook_handler_service import WebhooksHandlerService
+
+WEBHOOK_OUTBOX_BATCH_SIZE = int(os.getenv("WEBHOOK_OUTBOX_BATCH_SIZE", "100"))
+WEBHOOK_OUTBOX_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_OUTBOX_MAX_ATTEMPTS", "10"))
+
+
+class WebhookOutboxService:
+    """Publishes stored webhook events to Celery and marks them sent."""
+
+    def __init__(
+        self,
+        event_repo: WebhookEventRepository,
+        handler: Optional[WebhooksHandlerService] = None,
+        max_attempts: int = WEBHOOK_OUTBOX_MAX_ATTEMPTS,
+    ) -> None:
+        self.event_repo = event_repo
+        self.handler = handler or WebhooksHandlerService()
+        self.max_attempts = max_attempts
+
+    def dispatch_batch(self, batch_size: int = WEBHOOK_OUTBOX_BATCH_SIZE) -> int:
+        """Publish up to batch_size pending events; returns how many were sent.
+
+        Must run in a unit of work: the claimed rows stay locked until it
+        commits, so concurrent dispatchers never publish the same event.
+        """
+        events = self.event_repo.claim_pending(batch_size, self.max_attempts)
+        sent = []
+        for event in events:
+            try:
+                # False means a duplicate delivery already published: done too
+                self.handler.handle(event.payload)
+            except Exception as e:
+                # Keep Stripe's order: the rest of the batch waits for the retry
+                logger.error(
+                    f"[WebhookOutboxService.dispatch_batch] Event {event.id} failed: {e}"
+                )
+                self.event_repo.mark_failed(event, str(e))
+                if event.attempts >= self.max_attempts:
+                    # No longer claimed: needs a manual replay
+                    logger.error(
+                        f"[WebhookOutboxService.dispatch_batch] Event {event.id} "
+                        f"dead-lettered after {event.attempts} attempts"
+                    )
+                break
+            sent.append(event)
+
+        if sent:
+            self.event_repo.mark_sent(sent)
+        return len(sent)
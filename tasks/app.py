@@ -8,6 +8,76 @@ redis_url = os.getenv("REDIS_URL")
 
 celery_app = Celery("tasks", broker=redis_url)
 
+# Queues, most urgent first. Payment events unlock or lock paying users and
+# must not wait behind subscription.updated noise or housekeeping.
+QUEUE_CRITICAL = "critical"
+QUEUE_DEFAULT = "default"
+QUEUE_LOW = "low"
+QUEUE_MAINTENANCE = "maintenance"
+
+# Redis emulates priorities with one list per step; 0 is served first
+PRIORITY_HIGH = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_LOW = 9
+
+celery_app.conf.task_routes = {
+    "tasks.invoice.invoice_paid": {
+        "queue": QUEUE_CRITICAL,
+        "priority": PRIORITY_HIGH,
+    },
+    "tasks.invoice.invoice_payment_failed": {
+        "queue": QUEUE_CRITICAL,
+        "priority": PRIORITY_HIGH,
+    },
+    "tasks.subscriptions.customer_subscription_created": {
+        "queue": QUEUE_CRITICAL,
+        "priority": PRIORITY_HIGH,
+    },
+    "tasks.subscriptions.customer_subscription_deleted": {
+        "queue": QUEUE_CRITICAL,
+        "priority": PRIORITY_HIGH,
+    },
+    # customer.created grants the free trial: the new user has no tier (and
+    # gets 401 on every gated route) until it runs. It is not a payment, so
+    # it stays off the critical pool, but goes ahead of other default work.
+    "tasks.customer.customer_created_pipeline": {
+        "queue": QUEUE_DEFAULT,
+        "priority": PRIORITY_HIGH,
+    },
+    "tasks.subscriptions.customer_subscription_updated": {
+        "queue": QUEUE_LOW,
+        "priority": PRIORITY_LOW,
+    },
+    "tasks.subscriptions.customer_subscription_paused": {
+        "queue": QUEUE_LOW,
+        "priority": PRIORITY_LOW,
+    },
+    "tasks.sessions.*": {"queue": QUEUE_MAINTENANCE, "priority": PRIORITY_LOW},
+}
+celery_app.conf.task_default_queue = QUEUE_DEFAULT
+celery_app.conf.task_default_priority = PRIORITY_DEFAULT
+celery_app.conf.broker_transport_options = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+# A worker holds one message at a time, so a priority-0 message published
+# later isn't stuck behind prefetched low-priority ones
+celery_app.conf.worker_prefetch_multiplier = 1
+
+# Seconds between purges of expired/inactive refresh sessions
+SESSION_PURGE_INTERVAL = float(os.getenv("SESSION_PURGE_INTERVAL", "3600"))
+
+# Imported by workers and beat at startup
+celery_app.conf.include = ["tasks.sessions"]
+
+celery_app.conf.beat_schedule = {
+    "purge-expired-sessions": {
+        "task": "tasks.sessions.purge_expired_sessions",
+        "schedule": SESSION_PURGE_INTERVAL,
+    },
+}
+
 # DEBUG: Forzar importación para ver si el módulo es accesible
 try:
     import tasks.invoice
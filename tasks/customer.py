@@ -9,7 +9,7 @@ from parsers.customer import (
     parse_customer_created,
     parse_customer_deleted,
 )
-from helpers.context import get_customer_service
+from helpers.context import get_customer_onboarding, get_customer_service
 from tasks.app import celery_app
 
 
@@ -53,6 +53,42 @@ def customer_created(self, payload: dict, correlation_id: Optional[str] = None):
         _cleanup_correlation_context()
 
 
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=3,
+    default_retry_delay=1,
+)
+def customer_created_pipeline(
+    self, payload: dict, correlation_id: Optional[str] = None
+):
+    """Handle customer.created: create the user and its free trial.
+
+    Both writes share one transaction, so a retry starts from scratch and
+    the trial can't run before the user exists.
+    """
+    _setup_correlation_context(correlation_id)
+    try:
+        # Validate payload structure
+        try:
+            data = CustomerPayload(**payload)
+        except ValidationError as e:
+            logger.warning(f"Invalid customer.created payload: {e}")
+            return  # No retry for validation errors
+
+        # Parse to extract needed info
+        info = parse_customer_created(data)
+
+        # Execute services
+        with get_customer_onboarding() as (customers, subscriptions):
+            user = customers.handle_customer_created(info)
+            subscriptions.handle_customer_sub_basic(info.stripe_id, user=user)
+    finally:
+        _cleanup_correlation_context()
+
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
@@ -0,0 +1,29 @@
+import os
+
+from core.logger import logger
+from helpers.context import unit_of_work
+from repositories.auth_repositories import AuthRepository
+from tasks.app import celery_app
+
+SESSION_PURGE_BATCH_SIZE = int(os.getenv("SESSION_PURGE_BATCH_SIZE", "1000"))
+SESSION_PURGE_MAX_BATCHES = int(os.getenv("SESSION_PURGE_MAX_BATCHES", "100"))
+
+
+@celery_app.task(bind=True, ignore_result=True)
+def purge_expired_sessions(
+    self,
+    batch_size: int = SESSION_PURGE_BATCH_SIZE,
+    max_batches: int = SESSION_PURGE_MAX_BATCHES,
+):
+    """Delete expired/inactive sessions in short, bounded transactions."""
+    purged = 0
+    for _ in range(max_batches):
+        # One transaction per batch so row locks are held only briefly
+        with unit_of_work() as session:
+            deleted = AuthRepository(session).purge_expired_sessions(batch_size)
+        purged += deleted
+        if deleted < batch_size:
+            break
+
+    logger.info(f"[purge_expired_sessions] Purged {purged} sessions")
+    return purged
@@ -32,7 +32,11 @@ def _cleanup_correlation_context():
 
 @celery_app.task
 def customer_sub_basic(payload: dict, correlation_id: Optional[str] = None):
-    """Create free trial subscription for user."""
+    """Create free trial subscription for user.
+
+    customer.created now goes through customer_created_pipeline; this task
+    only drains messages queued before that.
+    """
     _setup_correlation_context(correlation_id)
     try:
         # Validate payload structure
@@ -0,0 +1,53 @@
+"""Celery worker per queue group, each with its own concurrency.
+
+Usage:
+    python -m tasks.worker critical   # invoice.* and subscription lifecycle
+    python -m tasks.worker default
+    python -m tasks.worker low        # subscription.updated/paused, housekeeping
+    python -m tasks.worker all        # every queue, for local development
+
+Concurrency comes from CELERY_CONCURRENCY_<POOL> (e.g.
+CELERY_CONCURRENCY_CRITICAL=8), falling back to Celery's default.
+"""
+import os
+import sys
+from typing import List
+
+from tasks.app import (
+    QUEUE_CRITICAL,
+    QUEUE_DEFAULT,
+    QUEUE_LOW,
+    QUEUE_MAINTENANCE,
+    celery_app,
+)
+
+WORKER_POOLS = {
+    "critical": [QUEUE_CRITICAL],
+    "default": [QUEUE_DEFAULT],
+    "low": [QUEUE_LOW, QUEUE_MAINTENANCE],
+    "all": [QUEUE_CRITICAL, QUEUE_DEFAULT, QUEUE_LOW, QUEUE_MAINTENANCE],
+}
+
+
+def worker_argv(pool: str, extra: List[str] = ()) -> List[str]:
+    """celery worker arguments for pool."""
+    if pool not in WORKER_POOLS:
+        raise ValueError(
+            f"Unknown worker pool {pool!r}, expected one of {', '.join(WORKER_POOLS)}"
+        )
+
+    argv = [
+        "worker",
+        "--loglevel=info",
+        f"--queues={','.join(WORKER_POOLS[pool])}",
+        f"--hostname={pool}@%h",
+    ]
+    concurrency = os.getenv(f"CELERY_CONCURRENCY_{pool.upper()}")
+    if concurrency:
+        argv.append(f"--concurrency={int(concurrency)}")
+    return argv + list(extra)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:] or ["all"]
+    celery_app.worker_main(worker_argv(args[0], args[1:]))
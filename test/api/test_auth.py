@@ -1,4 +1,4 @@
-from models.auth import Sessions
+from models.auth import ReadExpiredSession, Sessions
 from models.user import Users
 from schemas.exceptions import DatabaseError, InvalidToken
 from jose import JWTError
@@ -8,6 +8,7 @@ from dependencies.auth import get_current_user
 from sqlalchemy.exc import SQLAlchemyError
 from main import app
 from datetime import datetime as dt
+from schemas.pagination import Page, encode_cursor
 
 
 def test_login_db_error(mocker, client):
@@ -133,7 +134,15 @@ def test_get_expired_sessions_success(mocker, client):
         jti="jti_mocked", sub="sub_mocked", is_active=False, expires_at=dt.now()
     )
 
-    mock_serv.get_expired_sessions.side_effect = [mock_session_expired]
+    mock_serv.get_expired_sessions.return_value = Page(
+        items=[
+            ReadExpiredSession(
+                sub=mock_session_expired.sub,
+                is_active=mock_session_expired.is_active,
+                expires_at=mock_session_expired.expires_at,
+            )
+        ]
+    )
 
     mock_user = Users(id=1, email="test@gmail.com", stripe_customer_id=None)
 
@@ -144,9 +153,9 @@ def test_get_expired_sessions_success(mocker, client):
 
     assert response.status_code == 200
 
-    item = response.json()
+    item = response.json()["items"][0]
 
-    assert item["jti"] == mock_session_expired.jti
+    assert "jti" not in item
     assert item["sub"] == mock_session_expired.sub
     assert item["is_active"] == mock_session_expired.is_active
 
@@ -171,3 +180,29 @@ def test_get_expired_sessions_db_error(mocker, client):
     }
 
     app.dependency_overrides.clear()
+
+
+def test_get_expired_sessions_hides_jti(client, test_session):
+    test_session.add(
+        Sessions(
+            jti="jti_expired_page",
+            sub="expired@gmail.com",
+            is_active=False,
+            expires_at=dt(2020, 1, 1),
+        )
+    )
+    test_session.commit()
+
+    response = client.get("/expired", params={"limit": 1})
+
+    assert response.status_code == 200
+    page = response.json()
+    assert page["items"]
+    assert all("jti" not in item for item in page["items"])
+    assert set(page["items"][0]) == {"sub", "is_active", "expires_at"}
+
+
+def test_get_expired_sessions_int_cursor(client):
+    response = client.get("/expired", params={"cursor": encode_cursor(5)})
+
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+from redis.exceptions import RedisError
+from test.conftest import client
+
+
+def test_database_health_reports_pool(mocker, client):
+    mocker.patch(
+        "api.health.check_database",
+        return_value={"status": "healthy", "message": "Database connected"},
+    )
+
+    response = client.get("/health/database")
+
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["status"] == "healthy"
+    for pool in ("sync", "async"):
+        assert body["pool"][pool]["pool_class"].startswith("Instrumented")
+        assert "checked_out" in body["pool"][pool]
+        assert "waiters" in body["pool"][pool]
+        assert "avg_checkout_wait_ms" in body["pool"][pool]
+
+
+def test_webhooks_health_reports_outbox_and_shared_dedup(mocker, client):
+    mocker.patch(
+        "api.health.event_dedup.metrics.shared",
+        return_value={"claimed": 3, "duplicates": 1, "released": 0},
+    )
+    backlog = mocker.patch(
+        "repositories.webhook_event_repositories."
+        "AsyncWebhookEventRepository.backlog",
+        return_value={"pending": 2, "dead_letter": 1},
+    )
+
+    response = client.get("/health/webhooks")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "outbox": {"pending": 2, "dead_letter": 1},
+        "dedup": {"claimed": 3, "duplicates": 1, "released": 0},
+    }
+    backlog.assert_awaited_once()
+
+
+def test_webhooks_health_without_redis(mocker, client):
+    mocker.patch(
+        "api.health.event_dedup.metrics.shared", side_effect=RedisError("down")
+    )
+    mocker.patch(
+        "repositories.webhook_event_repositories."
+        "AsyncWebhookEventRepository.backlog",
+        return_value={"pending": 0, "dead_letter": 0},
+    )
+
+    response = client.get("/health/webhooks")
+
+    assert response.status_code == 200
+    assert response.json()["dedup"] == {"status": "unavailable"}
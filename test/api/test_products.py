@@ -0,0 +1,197 @@
+from datetime import datetime as dt, timedelta
+
+from sqlalchemy import event
+
+from models.plan import Plans
+from models.subscription import Subscriptions
+from models.user import Users
+from repositories.user_repositories import UserRepository
+from schemas.enums import SubscriptionStatus, SubscriptionTier
+from test.conftest import async_engine, client
+
+
+def _login(client, email):
+    response = client.post("/login", json={"email": email})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_tier_gated_route_is_one_query(client, test_session):
+    user = Users(email="pro@gmail.com", stripe_customer_id="cus_pro")
+    plan = Plans(
+        stripe_price_id="price_pro",
+        name="Pro",
+        price_cents=1000,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+    test_session.add(
+        Subscriptions(
+            user_id=user.id,
+            plan_id=plan.id,
+            stripe_subscription_id="sub_pro",
+            tier=SubscriptionTier.pro,
+            status=SubscriptionStatus.paid,
+            current_period_end=dt.now() + timedelta(days=30),
+            is_active=True,
+        )
+    )
+    test_session.commit()
+
+    # What the webhook handlers do after a subscription change
+    UserRepository(test_session).refresh_entitlement(user.id)
+
+    headers = _login(client, "pro@gmail.com")
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/products/pro", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+    response = client.get("/products/enterprise", headers=headers)
+
+    assert response.status_code == 401
+
+
+def test_free_trial_route_is_one_query(client, test_session):
+    user = Users(email="trial@gmail.com", stripe_customer_id="cus_trial")
+    plan = Plans(
+        stripe_price_id="price_trial",
+        name="Free",
+        price_cents=0,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+    test_session.add(
+        Subscriptions(
+            user_id=user.id,
+            plan_id=plan.id,
+            stripe_subscription_id="sub_free",
+            tier=SubscriptionTier.free,
+            status=SubscriptionStatus.trialing,
+            # As granted on customer.created: the period end is already past
+            current_period_end=dt.now() - timedelta(minutes=1),
+            is_active=True,
+        )
+    )
+    test_session.commit()
+
+    # What the webhook handlers do after a subscription change
+    UserRepository(test_session).refresh_entitlement(user.id)
+
+    headers = _login(client, "trial@gmail.com")
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/products/free", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    # No _entitlement_lapsed fallback to the subscriptions
+    assert len(statements) == 1
+
+
+def test_lapsed_subscription_falls_back_to_free_trial(client, test_session):
+    user = Users(email="lapsed@gmail.com", stripe_customer_id="cus_lapsed")
+    plan = Plans(
+        stripe_price_id="price_lapsed",
+        name="Pro lapsed",
+        price_cents=1000,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+    test_session.add_all(
+        [
+            # Past its period end, the renewal webhook hasn't arrived
+            Subscriptions(
+                user_id=user.id,
+                plan_id=plan.id,
+                stripe_subscription_id="sub_lapsed",
+                tier=SubscriptionTier.pro,
+                status=SubscriptionStatus.paid,
+                current_period_end=dt.now() - timedelta(minutes=1),
+                is_active=True,
+            ),
+            Subscriptions(
+                user_id=user.id,
+                plan_id=plan.id,
+                stripe_subscription_id="sub_free",
+                tier=SubscriptionTier.free,
+                status=SubscriptionStatus.trialing,
+                current_period_end=dt.now() - timedelta(days=30),
+                is_active=True,
+            ),
+        ]
+    )
+    test_session.commit()
+
+    # What the webhook handlers do after a subscription change
+    UserRepository(test_session).refresh_entitlement(user.id)
+
+    headers = _login(client, "lapsed@gmail.com")
+
+    assert client.get("/products/pro", headers=headers).status_code == 401
+    assert client.get("/products/free", headers=headers).status_code == 200
+
+
+def test_tier_gated_route_without_subscription(client, test_session):
+    test_session.add(Users(email="nosub@gmail.com", stripe_customer_id=None))
+    test_session.commit()
+
+    response = client.get("/products/free", headers=_login(client, "nosub@gmail.com"))
+
+    assert response.status_code == 401
+
+
+def test_tier_gated_route_sees_tier_change_with_same_token(client, test_session):
+    user = Users(email="downgraded@gmail.com", stripe_customer_id="cus_down")
+    plan = Plans(
+        stripe_price_id="price_down",
+        name="Pro down",
+        price_cents=1000,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+    sub = Subscriptions(
+        user_id=user.id,
+        plan_id=plan.id,
+        stripe_subscription_id="sub_down",
+        tier=SubscriptionTier.pro,
+        status=SubscriptionStatus.paid,
+        current_period_end=dt.now() + timedelta(days=30),
+        is_active=True,
+    )
+    test_session.add(sub)
+    test_session.commit()
+
+    # What the webhook handlers do after a subscription change
+    UserRepository(test_session).refresh_entitlement(user.id)
+
+    headers = _login(client, "downgraded@gmail.com")
+    assert client.get("/products/pro", headers=headers).status_code == 200
+
+    # Cancelled by a webhook; the token and the token cache are unchanged
+    sub.is_active = False
+    test_session.commit()
+    UserRepository(test_session).refresh_entitlement(user.id)
+
+    assert client.get("/products/pro", headers=headers).status_code == 401
@@ -2,10 +2,15 @@ from schemas import request
 from schemas.enums import SubscriptionTier
 from schemas.request import SubID
 from test.conftest import client, auth_headers
-from services.subscription_service import SubscriptionService, get_subs_service
+from services.subscription_service import (
+    SubscriptionService,
+    get_subs_service,
+    get_read_subs_service,
+)
 from models.subscription import Subscriptions
 from datetime import datetime as dt
 from main import app
+from schemas.pagination import Page
 import json
 
 
@@ -21,17 +26,18 @@ def test_get_all_success(client, mocker):
         current_period_end=dt(2024, 12, 12, 0, 0),
     )
 
-    serv_mocked.get_all_subscription.return_value = [sub_mocked]
+    serv_mocked.get_all_subscription.return_value = Page(items=[sub_mocked])
 
-    app.dependency_overrides[get_subs_service] = lambda: serv_mocked
+    app.dependency_overrides[get_read_subs_service] = lambda: serv_mocked
 
     response = client.get("/subscriptions/all")
 
     assert response.status_code == 200
 
-    list = response.json()
+    page = response.json()
 
-    for item in list:
+    assert page["next_cursor"] is None
+    for item in page["items"]:
         assert item["id"] == sub_mocked.id
         assert item["user_id"] == sub_mocked.user_id
         assert item["plan_id"] == sub_mocked.plan_id
@@ -52,7 +58,7 @@ def test_get_all_by_user_success(client, mocker, auth_headers):
 
     serv_mocked.get_all_subscription_by_user.return_value = sub_mocked
 
-    app.dependency_overrides[get_subs_service] = lambda: serv_mocked
+    app.dependency_overrides[get_read_subs_service] = lambda: serv_mocked
 
     response = client.get("/subscriptions/me", headers=auth_headers)
 
@@ -136,3 +142,36 @@ def test_cancel_success(client, mocker, auth_headers):
     assert response.status_code == 200
 
     assert response.json() == response_mocked
+
+
+def test_export_ndjson_filters(client, test_session):
+    for sub_id, status in (("sub_export_paid", "paid"), ("sub_export_unpaid", "unpaid")):
+        test_session.add(
+            Subscriptions(
+                user_id=1,
+                plan_id=1,
+                stripe_subscription_id=sub_id,
+                status=status,
+                current_period_end=dt(2025, 1, 1),
+            )
+        )
+    test_session.commit()
+
+    response = client.get("/subscriptions/export", params={"status": "paid"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows
+    assert all(row["status"] == "paid" for row in rows)
+    assert "sub_export_paid" in [row["stripe_subscription_id"] for row in rows]
+
+    response = client.get(
+        "/subscriptions/export",
+        params={"format": "csv", "period_end_from": "2030-01-01T00:00:00"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text == ""
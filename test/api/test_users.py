@@ -1,3 +1,5 @@
+import pytest
+from schemas.pagination import encode_cursor
 from dependencies.auth import get_current_user
 from test.conftest import client, auth_headers
 from models.user import Users
@@ -16,10 +18,53 @@ def test_get_users(mocker, client):
 
     assert response.status_code == 200
 
-    list = response.json()
+    page = response.json()
 
-    for r in list:
-        assert r == {"id": 1, "email": "test@gmail.com", "stripe_customer_id": None}
+    assert page["next_cursor"] is None
+    for r in page["items"]:
+        assert r == {
+            "id": 1,
+            "email": "test@gmail.com",
+            "stripe_customer_id": None,
+            "effective_tier": None,
+            "entitlement_expires_at": None,
+        }
+
+
+def test_get_users_next_cursor(mocker, client):
+    users_mocked = [
+        Users(id=1, email="one@gmail.com", stripe_customer_id=None),
+        Users(id=2, email="two@gmail.com", stripe_customer_id=None),
+    ]
+
+    get_users = mocker.patch(
+        "repositories.user_repositories.UserRepository.get_users",
+        return_value=users_mocked,
+    )
+
+    response = client.get("/users/", params={"limit": 1})
+
+    assert response.status_code == 200
+
+    page = response.json()
+    assert [r["id"] for r in page["items"]] == [1]
+
+    client.get("/users/", params={"limit": 1, "cursor": page["next_cursor"]})
+
+    get_users.assert_called_with(limit=1, cursor=1)
+
+
+def test_get_users_invalid_cursor(client):
+    response = client.get("/users/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("value", ["1", [1], {"id": 1}, True, 1.5])
+def test_get_users_cursor_wrong_type(client, value):
+    response = client.get("/users/", params={"cursor": encode_cursor(value)})
+
+    assert response.status_code == 400
 
 
 def test_get_me(client, auth_headers):
@@ -30,6 +75,8 @@ def test_get_me(client, auth_headers):
         "id": 1,
         "email": "test@gmail.com",
         "stripe_customer_id": None,
+        "effective_tier": None,
+        "entitlement_expires_at": None,
     }
 
 
@@ -1,25 +1,62 @@
+import json
+
 from fastapi import HTTPException
+from sqlmodel import select
+from models.webhook_event import WebhookEvents
 from test.conftest import client
 
 
-def test_handle_webhooks_success(mocker, client):
-    # Mock del evento
-    mock_event = {"id": "evt_test", "type": "payment_intent.succeeded"}
-    mocker.patch("api.webhooks.parse_webhook_event", return_value=mock_event)
-
-    # Mockea el handler para no ejecutar lógica real
-    mocker.patch("api.webhooks.WebhooksHandlerService")
-
+def _post_event(client, event):
     # Signature de stripe con formato válido
     stripe_signature = "t=123456789,v1=abc123"
-
-    response = client.post(
-        "/webhooks/", content=b"{}", headers={"stripe-signature": stripe_signature}
+    return client.post(
+        "/webhooks/",
+        content=json.dumps(event).encode(),
+        headers={"stripe-signature": stripe_signature},
     )
 
+
+def test_handle_webhooks_success(mocker, client, test_session):
+    # La firma se da por valida
+    mocker.patch("api.webhooks.verify_signature")
+    event = {
+        "id": "evt_test",
+        "type": "payment_intent.succeeded",
+        "data": {"object": {"id": "pi_test"}},
+    }
+
+    response = _post_event(client, event)
+
     assert response.status_code == 200
     assert response.json() == {"status": "success"}
 
+    stored = test_session.exec(
+        select(WebhookEvents).where(WebhookEvents.id == "evt_test")
+    ).one()
+    assert stored.type == "payment_intent.succeeded"
+    assert stored.payload == event
+    assert stored.sent_at is None
+
+
+def test_handle_webhooks_duplicate(mocker, client):
+    mocker.patch("api.webhooks.verify_signature")
+    event = {"id": "evt_dup", "type": "invoice.paid", "data": {"object": {}}}
+
+    assert _post_event(client, event).json() == {"status": "success"}
+    response = _post_event(client, event)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "duplicate"}
+
+
+def test_handle_webhooks_invalid_event(mocker, client):
+    mocker.patch("api.webhooks.verify_signature")
+
+    response = _post_event(client, {"type": "invoice.paid"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid event payload"}
+
 
 def test_handle_webhooks_not_header_error(client):
     response = client.post("/webhooks/", content=b"{}")
@@ -29,21 +66,14 @@ def test_handle_webhooks_not_header_error(client):
 
 
 def test_handle_webhooks_db_error(mocker, client):
-    # Mock del evento
-    mock_event = {"id": "evt_test", "type": "payment_intent.succeeded"}
-    mocker.patch("api.webhooks.parse_webhook_event", return_value=mock_event)
-
-    # Mockea el handler para no ejecutar lógica real
+    mocker.patch("api.webhooks.verify_signature")
     mocker.patch(
-        "api.webhooks.WebhooksHandlerService",
+        "api.webhooks.AsyncWebhookEventRepository.add",
         side_effect=HTTPException(status_code=400, detail="Simulated Error"),
     )
 
-    # Signature de stripe con formato válido
-    stripe_signature = "t=123456789,v1=abc123"
-
-    response = client.post(
-        "/webhooks/", content=b"{}", headers={"stripe-signature": stripe_signature}
+    response = _post_event(
+        client, {"id": "evt_test", "type": "invoice.paid", "data": {"object": {}}}
     )
 
     assert response.status_code == 400
@@ -51,21 +81,14 @@ def test_handle_webhooks_db_error(mocker, client):
 
 
 def test_handle_webhooks_unexpected_error(mocker, client):
-    # Mock del evento
-    mock_event = {"id": "evt_test", "type": "payment_intent.succeeded"}
-    mocker.patch("api.webhooks.parse_webhook_event", return_value=mock_event)
-
-    # Mockea el handler para no ejecutar lógica real
+    mocker.patch("api.webhooks.verify_signature")
     mocker.patch(
-        "api.webhooks.WebhooksHandlerService",
+        "api.webhooks.AsyncWebhookEventRepository.add",
         side_effect=Exception("Simulated Error"),
     )
 
-    # Signature de stripe con formato válido
-    stripe_signature = "t=123456789,v1=abc123"
-
-    response = client.post(
-        "/webhooks/", content=b"{}", headers={"stripe-signature": stripe_signature}
+    response = _post_event(
+        client, {"id": "evt_test", "type": "invoice.paid", "data": {"object": {}}}
     )
 
     assert response.status_code == 500
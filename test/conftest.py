@@ -2,13 +2,57 @@ import os
 import errno
 import pytest
 from main import app
-from db.session import get_session
-from sqlmodel import SQLModel, create_engine, Session
+from db.session import (
+    get_session,
+    get_async_session,
+    get_read_session,
+    get_async_read_session,
+    get_read_session_factory,
+)
+from sqlmodel import SQLModel, create_engine, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
-from models import user, auth, plan, subscription
+from models import user, auth, plan, subscription, webhook_event
 from models.user import Users
+from core.rate_limit import rate_limiter
+from core.tier_cache import tier_cache
+from core.token_cache import token_cache
+from core.webhook_dedup import event_dedup
 
 engine = create_engine("sqlite:///./test/test.db")
+# NullPool: test.db is recreated per module, pooled connections would point at
+# the deleted file.
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test/test.db", poolclass=NullPool
+)
+
+
+@pytest.fixture(autouse=True)
+def disable_rate_limit(monkeypatch):
+    # No Redis in tests; limiter behaviour is covered in test/core
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def disable_tier_cache(monkeypatch):
+    # Read through to the DB and keep invalidation off Redis
+    monkeypatch.setattr(tier_cache, "enabled", False)
+    tier_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def disable_webhook_dedup(monkeypatch):
+    monkeypatch.setattr(event_dedup, "enabled", False)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    # Verified tokens are cached per process; don't leak them between tests
+    token_cache.clear()
+    yield
+    token_cache.clear()
 
 
 @pytest.fixture(scope="module")
@@ -33,15 +77,33 @@ def test_session(test_db):
         session.close()
 
 
+async def override_async_session():
+    session = AsyncSession(async_engine, expire_on_commit=False)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
 @pytest.fixture()
 def client(test_session):
     app.dependency_overrides[get_session] = lambda: test_session
+    app.dependency_overrides[get_read_session] = lambda: test_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[get_async_read_session] = override_async_session
+    app.dependency_overrides[get_read_session_factory] = lambda: (
+        lambda: Session(engine)
+    )
     yield TestClient(app)
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
 def test_user(test_session):
+    # test.db lives for the whole module and email is unique
+    stmt = select(Users).where(Users.email == "test@gmail.com")
+    if test_session.exec(stmt).first():
+        return
     new_user = Users(email="test@gmail.com", stripe_customer_id=None)
     test_session.add(new_user)
     test_session.commit()
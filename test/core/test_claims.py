@@ -0,0 +1,39 @@
+import pytest
+from redis.exceptions import RedisError
+
+from core import claims
+
+
+async def test_get_claim_version(mocker):
+    redis_mock = mocker.Mock()
+    redis_mock.get = mocker.AsyncMock(side_effect=[b"2", None, RedisError("down")])
+    mocker.patch("core.claims.get_async_redis", return_value=redis_mock)
+
+    assert await claims.get_claim_version(1) == 2
+    assert await claims.get_claim_version(1) == 0
+    assert await claims.get_claim_version(1) is None
+
+    redis_mock.get.assert_called_with("claims:v:1")
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_bump_claim_version(mocker, enabled):
+    mocker.patch("core.claims.STATELESS_TOKENS", enabled)
+    redis_mock = mocker.Mock()
+    mocker.patch("core.claims.get_redis", return_value=redis_mock)
+
+    claims.bump_claim_version(5)
+
+    if enabled:
+        redis_mock.incr.assert_called_once_with("claims:v:5")
+    else:
+        redis_mock.incr.assert_not_called()
+
+
+def test_bump_claim_version_redis_down(mocker):
+    mocker.patch("core.claims.STATELESS_TOKENS", True)
+    redis_mock = mocker.Mock()
+    redis_mock.incr.side_effect = RedisError("down")
+    mocker.patch("core.claims.get_redis", return_value=redis_mock)
+
+    claims.bump_claim_version(5)
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from core.loop_monitor import LoopMonitor, current_route
+from test.conftest import client
+
+
+async def test_blocking_call_is_measured_and_reported(mocker):
+    warning = mocker.patch("core.loop_monitor.logger.warning")
+    monitor = LoopMonitor(interval=0.01, threshold=0.05, debug=True)
+
+    current_route.set("POST /auth/login")
+    monitor.start()
+    await asyncio.sleep(0.03)
+
+    time.sleep(0.2)  # blocks the loop
+
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["running"] is False
+    assert snapshot["blocked"] >= 1
+    assert snapshot["max_lag_ms"] >= 100
+
+    warning.assert_called()
+    kwargs = warning.call_args.kwargs
+    assert kwargs["route"] == "POST /auth/login"
+    assert "test_blocking_call_is_measured_and_reported" in kwargs["stack"]
+
+
+async def test_idle_loop_has_no_blocked_samples():
+    monitor = LoopMonitor(interval=0.01, threshold=0.5, debug=False)
+
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] >= 1
+    assert snapshot["blocked"] == 0
+
+
+def test_loop_health(client):
+    response = client.get("/health/loop")
+
+    assert response.status_code == 200
+    assert {"running", "blocked", "last_lag_ms", "max_lag_ms"} <= set(response.json())
@@ -0,0 +1,73 @@
+import pytest
+from redis.exceptions import RedisError
+
+from core.rate_limit import RateLimit, RateLimiter, rate_limiter
+from schemas.exceptions import RateLimitExceeded
+from test.conftest import client
+
+
+def _limiter(mocker, *results):
+    client = mocker.Mock()
+    script = mocker.AsyncMock(side_effect=list(results))
+    client.register_script.return_value = script
+    return RateLimiter(client=client), script
+
+
+def test_parse_limit():
+    limit = RateLimit.parse("10/minute")
+
+    assert limit.capacity == 10
+    assert limit.rate == pytest.approx(10 / 60)
+    assert limit.lease == 1
+    assert RateLimit.parse("100/seconds").lease == 10
+
+
+async def test_allowed_request_spends_a_token(mocker):
+    limiter, script = _limiter(mocker, [1, b"0"])
+
+    await limiter.hit("login:ip:1.2.3.4", RateLimit.parse("10/minute"))
+
+    kwargs = script.call_args.kwargs
+    assert kwargs["keys"] == ["ratelimit:login:ip:1.2.3.4"]
+    assert kwargs["args"][0] == 10
+    assert kwargs["args"][3] == 1
+
+
+async def test_denied_key_is_rejected_locally(mocker):
+    limiter, script = _limiter(mocker, [0, b"30.5"])
+    limit = RateLimit.parse("10/minute")
+
+    with pytest.raises(RateLimitExceeded) as exc:
+        await limiter.hit("login:ip:1.2.3.4", limit)
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "31"
+
+    # Second attempt never reaches Redis
+    with pytest.raises(RateLimitExceeded):
+        await limiter.hit("login:ip:1.2.3.4", limit)
+    assert script.await_count == 1
+
+
+async def test_lease_is_spent_locally(mocker):
+    limiter, script = _limiter(mocker, [3, b"0"], [1, b"0"])
+    limit = RateLimit.parse("100/second")
+
+    for _ in range(4):
+        await limiter.hit("webhooks:ip:1.2.3.4", limit)
+
+    assert script.await_count == 2
+
+
+async def test_redis_down_fails_open(mocker):
+    limiter, _ = _limiter(mocker, RedisError("down"))
+
+    await limiter.hit("login:ip:1.2.3.4", RateLimit.parse("10/minute"))
+
+
+def test_login_returns_429_with_retry_after(client, mocker):
+    mocker.patch.object(rate_limiter, "hit", side_effect=RateLimitExceeded(12.2))
+
+    response = client.post("/login", json={"email": "test@gmail.com"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "13"
@@ -0,0 +1,112 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+import stripe
+from fastapi import HTTPException
+
+from core.stripe_webhook import decode_event, verify_signature
+
+SECRET = "whsec_test"
+
+
+def _sign(payload: bytes, timestamp: int, secret: str = SECRET) -> str:
+    sig = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={sig}"
+
+
+def _event(event_id="evt_1"):
+    return json.dumps(
+        {
+            "id": event_id,
+            "object": "event",
+            "type": "invoice.paid",
+            "data": {"object": {"id": "in_1", "customer": "cus_1"}},
+        }
+    ).encode()
+
+
+def test_verify_signature_accepts_what_stripe_accepts():
+    payload = _event()
+    header = _sign(payload, int(time.time()))
+
+    # Same header passes the stripe library's own check
+    stripe.WebhookSignature.verify_header(
+        payload.decode(), header, SECRET, tolerance=300
+    )
+    verify_signature(payload, header, secret=SECRET)
+
+
+def test_verify_signature_any_v1_matches():
+    payload = _event()
+    now = int(time.time())
+    header = f"v1=deadbeef,{_sign(payload, now)},v0=ignored"
+
+    verify_signature(payload, header, secret=SECRET)
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "garbage",
+        "t=abc,v1=deadbeef",
+        "t=123",
+    ],
+)
+def test_verify_signature_malformed_header(header):
+    with pytest.raises(HTTPException) as exc:
+        verify_signature(_event(), header, secret=SECRET)
+    assert exc.value.status_code == 400
+
+
+def test_verify_signature_wrong_secret():
+    payload = _event()
+    header = _sign(payload, int(time.time()), secret="whsec_other")
+
+    with pytest.raises(HTTPException) as exc:
+        verify_signature(payload, header, secret=SECRET)
+    assert exc.value.detail == "Invalid signature: no matching signature"
+
+
+def test_verify_signature_tampered_body():
+    header = _sign(_event(), int(time.time()))
+
+    with pytest.raises(HTTPException):
+        verify_signature(_event("evt_2"), header, secret=SECRET)
+
+
+def test_verify_signature_too_old():
+    payload = _event()
+    header = _sign(payload, int(time.time()) - 600)
+
+    with pytest.raises(HTTPException) as exc:
+        verify_signature(payload, header, secret=SECRET, tolerance=300)
+    assert exc.value.detail == "Invalid signature: timestamp too old"
+
+
+def test_verify_signature_without_secret():
+    with pytest.raises(HTTPException) as exc:
+        verify_signature(_event(), "t=1,v1=x", secret=None)
+    assert exc.value.status_code == 500
+
+
+def test_decode_event():
+    assert decode_event(_event()) == (
+        "evt_1",
+        "invoice.paid",
+        {"id": "in_1", "customer": "cus_1"},
+    )
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"not json", b"[]", b'{"id": "evt_1", "type": "invoice.paid"}'],
+)
+def test_decode_event_invalid(payload):
+    with pytest.raises(HTTPException) as exc:
+        decode_event(payload)
+    assert exc.value.status_code == 400
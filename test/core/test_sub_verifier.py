@@ -0,0 +1,56 @@
+from datetime import datetime as dt, timedelta
+
+import pytest
+
+from core.sub_verifier import require_subscription_tier
+from models.user import ReadUser
+from schemas.enums import SubscriptionTier
+from schemas.exceptions import InsufficientSubscriptionError
+
+
+async def test_tier_comes_with_the_user():
+    user = ReadUser(id=1, email="a@b.c", effective_tier=SubscriptionTier.pro)
+
+    dependency = require_subscription_tier(SubscriptionTier.pro)
+
+    assert await dependency(user=user) is user
+
+    dependency = require_subscription_tier(SubscriptionTier.enterprise)
+
+    with pytest.raises(InsufficientSubscriptionError):
+        await dependency(user=user)
+
+
+async def test_no_active_subscription():
+    user = ReadUser(id=1, email="a@b.c")
+
+    dependency = require_subscription_tier(SubscriptionTier.free)
+
+    with pytest.raises(InsufficientSubscriptionError):
+        await dependency(user=user)
+
+
+async def test_lapsed_entitlement_is_denied():
+    user = ReadUser(
+        id=1,
+        email="a@b.c",
+        effective_tier=SubscriptionTier.pro,
+        entitlement_expires_at=dt.now() - timedelta(days=1),
+    )
+
+    for min_tier in (SubscriptionTier.free, SubscriptionTier.pro):
+        with pytest.raises(InsufficientSubscriptionError):
+            await require_subscription_tier(min_tier)(user=user)
+
+
+async def test_entitlement_within_period():
+    user = ReadUser(
+        id=1,
+        email="a@b.c",
+        effective_tier=SubscriptionTier.pro,
+        entitlement_expires_at=dt.now() + timedelta(days=1),
+    )
+
+    dependency = require_subscription_tier(SubscriptionTier.pro)
+
+    assert await dependency(user=user) is user
@@ -0,0 +1,97 @@
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError
+
+from core.tier_cache import TierCache
+
+PERIOD_END = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def redis_mocks(mocker):
+    async_client = mocker.AsyncMock()
+    async_client.get.return_value = None
+    sync_client = mocker.Mock()
+    mocker.patch("core.tier_cache.get_async_redis", return_value=async_client)
+    mocker.patch("core.tier_cache.get_redis", return_value=sync_client)
+    return async_client, sync_client
+
+
+async def test_miss_loads_and_stores(mocker, redis_mocks):
+    async_client, _ = redis_mocks
+    cache = TierCache(ttl=300, local_ttl=5, stale_ttl=3600)
+    load = mocker.AsyncMock(return_value=("PRO", PERIOD_END))
+
+    assert await cache.get(1, load) == ("PRO", PERIOD_END)
+    assert await cache.get(1, load) == ("PRO", PERIOD_END)
+
+    load.assert_awaited_once()
+    key, raw = async_client.set.call_args.args
+    assert key == "tier:1"
+    assert json.loads(raw)["tier"] == "PRO"
+    assert json.loads(raw)["expires_at"] == PERIOD_END.isoformat()
+    assert async_client.set.call_args.kwargs["ex"] == 3600
+
+
+async def test_shared_entry_skips_db(mocker, redis_mocks):
+    async_client, _ = redis_mocks
+    async_client.get.return_value = json.dumps(
+        {"at": time.time(), "tier": "PRO", "expires_at": PERIOD_END.isoformat()}
+    )
+    load = mocker.AsyncMock()
+
+    assert await TierCache().get(1, load) == ("PRO", PERIOD_END)
+    load.assert_not_awaited()
+
+
+async def test_shared_entry_without_subscription(mocker, redis_mocks):
+    async_client, _ = redis_mocks
+    async_client.get.return_value = json.dumps(
+        {"at": time.time(), "tier": None, "expires_at": None}
+    )
+
+    assert await TierCache().get(1, mocker.AsyncMock()) == (None, None)
+
+
+async def test_stale_entry_served_when_db_down(mocker, redis_mocks):
+    async_client, _ = redis_mocks
+    async_client.get.return_value = json.dumps(
+        {"at": time.time() - 600, "tier": "ENTERPRISE", "expires_at": None}
+    )
+    load = mocker.AsyncMock(side_effect=OperationalError("SELECT", {}, Exception()))
+
+    cache = TierCache(ttl=300, stale_ttl=3600)
+
+    assert await cache.get(1, load) == ("ENTERPRISE", None)
+
+    # Too old to be trusted
+    cache = TierCache(ttl=300, stale_ttl=60)
+    with pytest.raises(OperationalError):
+        await cache.get(1, load)
+
+
+async def test_redis_down_reads_through(mocker, redis_mocks):
+    async_client, _ = redis_mocks
+    async_client.get.side_effect = RedisError("down")
+    async_client.set.side_effect = RedisError("down")
+
+    load = mocker.AsyncMock(return_value=("PRO", None))
+
+    assert await TierCache().get(1, load) == ("PRO", None)
+
+
+async def test_invalidate(mocker, redis_mocks):
+    _, sync_client = redis_mocks
+    cache = TierCache()
+    load = mocker.AsyncMock(return_value=("PRO", None))
+    await cache.get(1, load)
+
+    cache.invalidate(1)
+
+    sync_client.delete.assert_called_once_with("tier:1")
+    await cache.get(1, load)
+    assert load.await_count == 2
@@ -0,0 +1,53 @@
+import time
+
+from core.token_cache import TokenCache, token_key
+
+
+def test_get_returns_cached_user():
+    cache = TokenCache(max_entries=10, max_ttl=60)
+
+    cache.put("token", "a@b.c", {"id": 1}, exp=time.time() + 300)
+
+    assert cache.get("token") == {"id": 1}
+    assert cache.get("other") is None
+
+
+def test_entry_expires_at_token_exp():
+    cache = TokenCache(max_entries=10, max_ttl=60)
+
+    cache.put("expired", "a@b.c", {"id": 1}, exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache.put("token", "a@b.c", {"id": 1}, exp=time.time() + 300)
+    cache._entries[token_key("token")] = (time.time() - 1, "a@b.c", {"id": 1})
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = TokenCache(max_entries=2, max_ttl=60)
+    exp = time.time() + 300
+
+    cache.put("t1", "a@b.c", 1, exp)
+    cache.put("t2", "a@b.c", 2, exp)
+    cache.get("t1")
+    cache.put("t3", "a@b.c", 3, exp)
+
+    assert cache.get("t1") == 1
+    assert cache.get("t2") is None
+    assert cache.get("t3") == 3
+
+
+def test_invalidate_user():
+    cache = TokenCache(max_entries=10, max_ttl=60)
+    exp = time.time() + 300
+
+    cache.put("t1", "a@b.c", 1, exp)
+    cache.put("t2", "a@b.c", 2, exp)
+    cache.put("t3", "x@y.z", 3, exp)
+
+    cache.invalidate_user("a@b.c")
+
+    assert cache.get("t1") is None
+    assert cache.get("t2") is None
+    assert cache.get("t3") == 3
@@ -0,0 +1,61 @@
+import pytest
+
+from redis.exceptions import RedisError
+
+from core.webhook_dedup import EventDeduplicator
+
+
+def test_claim_and_duplicate(mocker):
+    client = mocker.Mock()
+    client.set.side_effect = [True, None]
+    mocker.patch("core.webhook_dedup.get_redis", return_value=client)
+
+    dedup = EventDeduplicator(ttl=60)
+
+    assert dedup.claim("evt_1") is True
+    assert dedup.claim("evt_1") is False
+
+    client.set.assert_called_with("webhook:event:evt_1", 1, nx=True, ex=60)
+    assert dedup.metrics.snapshot() == {
+        "claimed": 1,
+        "duplicates": 1,
+        "released": 0,
+        "errors": 0,
+    }
+
+
+def test_redis_down_lets_event_through(mocker):
+    client = mocker.Mock()
+    client.set.side_effect = RedisError("down")
+    mocker.patch("core.webhook_dedup.get_redis", return_value=client)
+
+    dedup = EventDeduplicator()
+
+    assert dedup.claim("evt_1") is True
+    assert dedup.metrics.errors == 1
+
+
+def test_counters_are_shared_through_redis(mocker):
+    client = mocker.Mock()
+    client.set.side_effect = [True, None]
+    mocker.patch("core.webhook_dedup.get_redis", return_value=client)
+
+    dedup = EventDeduplicator()
+    dedup.claim("evt_1")
+    dedup.claim("evt_1")
+
+    client.hincrby.assert_any_call("webhook:dedup:metrics", "claimed", 1)
+    client.hincrby.assert_any_call("webhook:dedup:metrics", "duplicates", 1)
+
+
+@pytest.mark.asyncio
+async def test_shared_counters(mocker):
+    client = mocker.AsyncMock()
+    client.hgetall.return_value = {b"claimed": b"7", b"duplicates": b"2"}
+    mocker.patch("core.webhook_dedup.get_async_redis", return_value=client)
+
+    assert await EventDeduplicator().metrics.shared() == {
+        "claimed": 7,
+        "duplicates": 2,
+        "released": 0,
+    }
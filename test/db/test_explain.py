@@ -0,0 +1,29 @@
+from db.explain import hot_queries, seq_scans
+
+
+def test_hot_queries_capture_repository_statements():
+    queries = hot_queries()
+
+    assert "UserRepository.get_user_by_customer_id" in queries
+    assert "SubscriptionRepository.get_all_subscription_by_user" in queries
+
+    sql = str(queries["PlanRepository.get_plan_by_tier"])
+    assert "plans.name" in sql
+
+
+def test_seq_scans_walks_nested_plans():
+    plan = {
+        "Node Type": "Nested Loop",
+        "Plans": [
+            {"Node Type": "Index Scan", "Relation Name": "users"},
+            {"Node Type": "Seq Scan", "Relation Name": "subscriptions"},
+        ],
+    }
+
+    assert seq_scans(plan) == ["subscriptions"]
+
+
+def test_seq_scans_index_only():
+    plan = {"Node Type": "Index Only Scan", "Relation Name": "plans"}
+
+    assert seq_scans(plan) == []
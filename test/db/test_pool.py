@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from db.pool import InstrumentedQueuePool, pool_settings, pool_status
+
+
+@pytest.fixture
+def pool_engine():
+    engine = create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "5")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "300")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+    assert pool_settings() == {
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_timeout": 2.5,
+        "pool_recycle": 300,
+        "pool_pre_ping": False,
+    }
+
+
+def test_pool_status_tracks_checkouts(pool_engine):
+    with pool_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+        status = pool_status(pool_engine)
+        assert status["checked_out"] == 1
+        assert status["waiters"] == 0
+
+    status = pool_status(pool_engine)
+    assert status["pool_class"] == "InstrumentedQueuePool"
+    assert status["checked_out"] == 0
+    assert status["checkouts"] == 1
+    assert status["avg_checkout_wait_ms"] >= 0
+
+
+def test_pool_status_counts_timeouts(pool_engine):
+    with pool_engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            pool_engine.connect()
+
+    status = pool_status(pool_engine)
+    assert status["timeouts"] == 1
+    assert status["waiters"] == 0
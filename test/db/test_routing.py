@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import create_engine
+from starlette.requests import Request
+
+import db.session as db_session
+from db.routing import ReadYourWrites, client_key, read_your_writes
+
+
+def _request(method="GET", headers=None, client=("10.0.0.1", 1234)):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": "/",
+            "headers": raw_headers,
+            "client": client,
+        }
+    )
+
+
+@pytest.fixture
+def replica(mocker):
+    replica_engine = create_engine("sqlite://")
+    mocker.patch.object(db_session, "read_engine", replica_engine)
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def test_read_your_writes_window(mocker):
+    tracker = ReadYourWrites(window=5, max_keys=10)
+    clock = mocker.patch("db.routing.time.monotonic", return_value=100.0)
+
+    assert tracker.recently_wrote("client") is False
+
+    tracker.mark_write("client")
+    assert tracker.recently_wrote("client") is True
+
+    clock.return_value = 106.0
+    assert tracker.recently_wrote("client") is False
+
+
+def test_read_your_writes_is_bounded():
+    tracker = ReadYourWrites(window=60, max_keys=2)
+
+    tracker.mark_write("a")
+    tracker.mark_write("b")
+    tracker.mark_write("c")
+
+    assert tracker.recently_wrote("a") is False
+    assert tracker.recently_wrote("c") is True
+
+
+def test_client_key_prefers_token():
+    with_token = _request(headers={"Authorization": "Bearer abc"})
+    without_token = _request()
+
+    other_token = _request(headers={"Authorization": "Bearer xyz"})
+
+    assert client_key(with_token) != client_key(other_token)
+    assert client_key(without_token) == "ip:10.0.0.1"
+
+
+def test_read_session_uses_replica(replica):
+    gen = db_session.get_read_session(_request(headers={"Authorization": "Bearer r"}))
+    session = next(gen)
+
+    assert session.get_bind() is replica
+
+    gen.close()
+
+
+def test_read_session_uses_primary_after_write(replica):
+    request = _request(headers={"Authorization": "Bearer w"})
+    read_your_writes.mark_write(client_key(request))
+
+    gen = db_session.get_read_session(request)
+    session = next(gen)
+
+    assert session.get_bind() is db_session.engine
+
+    gen.close()
+
+
+def test_middleware_marks_successful_writes():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from db.routing import register_read_your_writes
+
+    app = FastAPI()
+    register_read_your_writes(app)
+
+    @app.post("/ok")
+    def ok():
+        return {}
+
+    @app.get("/read")
+    def read():
+        return {}
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer middleware"}
+    key = client_key(_request(headers=headers))
+
+    client.get("/read", headers=headers)
+    assert read_your_writes.recently_wrote(key) is False
+
+    client.post("/ok", headers=headers)
+    assert read_your_writes.recently_wrote(key) is True
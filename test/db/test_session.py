@@ -0,0 +1,21 @@
+from db.session import _with_statement_cache
+
+
+def test_statement_cache_added_for_asyncpg(monkeypatch):
+    monkeypatch.setenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "0")
+
+    url = _with_statement_cache("postgresql+asyncpg://u:p@localhost/db")
+
+    assert url.query["prepared_statement_cache_size"] == "0"
+
+
+def test_statement_cache_keeps_explicit_value():
+    url = "postgresql+asyncpg://u:p@localhost/db?prepared_statement_cache_size=10"
+
+    assert _with_statement_cache(url) == url
+
+
+def test_statement_cache_ignores_other_drivers():
+    url = "sqlite+aiosqlite:///./test.db"
+
+    assert _with_statement_cache(url) == url
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from db.types import UTCDateTime
+from models.auth import Sessions
+from repositories.auth_repositories import _expired_sessions_stmt
+from repositories.statements import (
+    INSERT_WEBHOOK_EVENT,
+    ROTATE_SESSION,
+    UNLAPSED_ENTITLEMENT_BY_USER,
+)
+
+
+def asyncpg_params(stmt, **params):
+    """Parameters as handed to asyncpg, after the type bind processors."""
+    compiled = stmt.compile(dialect=asyncpg_dialect())
+    processors = compiled._bind_processors
+    return {
+        key: processors[key](value) if key in processors else value
+        for key, value in compiled.construct_params(params).items()
+    }
+
+
+def assert_naive(params):
+    stamps = [value for value in params.values() if isinstance(value, datetime)]
+    assert stamps
+    assert all(value.tzinfo is None for value in stamps)
+
+
+def test_bind_converts_to_naive_utc():
+    value = datetime(2030, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+
+    assert UTCDateTime().process_bind_param(value, None) == datetime(2030, 1, 1, 10)
+
+
+def test_result_is_aware_utc():
+    value = UTCDateTime().process_result_value(datetime(2030, 1, 1), None)
+
+    assert value == datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def test_session_insert_binds_naive():
+    session = Sessions(
+        jti="jti", sub="a@b.com", expires_at=datetime.now(timezone.utc)
+    )
+    stmt = insert(Sessions).values(
+        jti=session.jti,
+        sub=session.sub,
+        created_at=session.created_at,
+        expires_at=session.expires_at,
+    )
+
+    assert_naive(asyncpg_params(stmt))
+
+
+def test_expired_sessions_binds_naive():
+    assert_naive(asyncpg_params(_expired_sessions_stmt(10, None)))
+
+
+def test_rotate_session_binds_naive():
+    now = datetime.now(timezone.utc)
+
+    params = asyncpg_params(
+        ROTATE_SESSION,
+        old_jti="old",
+        sub="a@b.com",
+        new_jti="new",
+        created_at=now,
+        expires_at=now + timedelta(days=7),
+    )
+
+    assert params["created_at"].tzinfo is None
+    assert params["expires_at"].tzinfo is None
+
+
+def test_webhook_event_insert_binds_naive():
+    params = asyncpg_params(
+        INSERT_WEBHOOK_EVENT,
+        event_id="evt_1",
+        type="invoice.paid",
+        payload={},
+        created_at=datetime.now(timezone.utc),
+    )
+
+    assert params["created_at"].tzinfo is None
+
+
+def test_unlapsed_entitlement_binds_naive():
+    params = asyncpg_params(
+        UNLAPSED_ENTITLEMENT_BY_USER, user_id=1, now=datetime.now(timezone.utc)
+    )
+
+    assert_naive(params)
@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from db.unit_of_work import (
+    UnitOfWork,
+    after_commit,
+    commit,
+    in_unit_of_work,
+    rollback,
+)
+from models.user import Users
+from repositories.subscription_repositories import SubscriptionRepository
+from repositories.user_repositories import UserRepository
+from schemas.exceptions import DatabaseError, SubscriptionNotFound
+
+
+def test_commit_outside_unit_of_work(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+
+    commit(session)
+
+    session.commit.assert_called_once()
+    session.flush.assert_not_called()
+
+
+def test_unit_of_work_commits_once(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+
+    with UnitOfWork(session):
+        assert in_unit_of_work(session)
+        commit(session)
+        commit(session)
+
+    assert session.flush.call_count == 2
+    session.commit.assert_called_once()
+    assert not in_unit_of_work(session)
+
+
+def test_unit_of_work_rolls_back_on_error(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(session):
+            commit(session)
+            raise ValueError("boom")
+
+    session.rollback.assert_called_once()
+    session.commit.assert_not_called()
+
+
+def test_unit_of_work_commit_error(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+    session.commit.side_effect = SQLAlchemyError("commit failed")
+
+    with pytest.raises(DatabaseError):
+        with UnitOfWork(session):
+            pass
+
+    session.rollback.assert_called_once()
+
+
+async def test_async_unit_of_work_commits_once(mocker):
+    session = mocker.AsyncMock()
+    session.info = {}
+
+    async with UnitOfWork(session):
+        assert in_unit_of_work(session)
+
+    session.commit.assert_awaited_once()
+
+
+def test_unit_of_work_is_atomic(test_db):
+    with pytest.raises(ValueError):
+        with Session(test_db) as session, UnitOfWork(session):
+            user = UserRepository(session).create("uow@gmail.com", "cus_uow")
+            # flushed: the id is already assigned inside the transaction
+            assert user.id is not None
+            raise ValueError("crash before the second write")
+
+    with Session(test_db) as session:
+        stmt = select(Users).where(Users.email == "uow@gmail.com")
+        assert session.exec(stmt).first() is None
+
+        with UnitOfWork(session):
+            UserRepository(session).create("uow@gmail.com", "cus_uow")
+
+    with Session(test_db) as session:
+        stmt = select(Users).where(Users.email == "uow@gmail.com")
+        assert session.exec(stmt).first().stripe_customer_id == "cus_uow"
+
+
+def test_rollback_left_to_unit_of_work(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+
+    rollback(session)
+    session.rollback.assert_called_once()
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(session):
+            rollback(session)
+            # Nothing undone yet: the unit of work decides on exit
+            session.rollback.assert_called_once()
+            raise ValueError("write failed")
+
+    assert session.rollback.call_count == 2
+
+
+def test_repository_error_keeps_earlier_steps(test_db):
+    with Session(test_db) as session, UnitOfWork(session):
+        UserRepository(session).create("uow_steps@gmail.com", "cus_uow_steps")
+
+        with pytest.raises(SubscriptionNotFound):
+            SubscriptionRepository(session).update_for_user(
+                sub_id="sub_missing",
+                customer_id="cus_uow_steps",
+                status="paid",
+                current_period_end=None,
+                is_active=True,
+            )
+
+        # The user flushed before the failed step is still in the transaction
+        stmt = select(Users).where(Users.email == "uow_steps@gmail.com")
+        assert session.exec(stmt).first() is not None
+
+
+def test_after_commit_deferred_until_commit(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+    callback = mocker.Mock()
+
+    with UnitOfWork(session):
+        after_commit(session, callback)
+        callback.assert_not_called()
+
+    callback.assert_called_once()
+
+
+def test_after_commit_dropped_on_rollback(mocker):
+    session = mocker.MagicMock()
+    session.info = {}
+    callback = mocker.Mock()
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(session):
+            after_commit(session, callback)
+            raise ValueError("boom")
+
+    callback.assert_not_called()
+
+    after_commit(session, callback)
+    callback.assert_called_once()
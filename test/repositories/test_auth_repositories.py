@@ -1,9 +1,12 @@
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta, timezone
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 from models.auth import Sessions
 from models.user import Users
-from repositories.auth_repositories import AuthRepository
+from repositories.auth_repositories import AuthRepository, AsyncAuthRepository
+from repositories.statements import PURGE_SESSIONS_BATCH, ROTATE_SESSION
 import pytest
+from sqlmodel import select
 
 from schemas.exceptions import DatabaseError
 
@@ -106,3 +109,213 @@ def test_get_expired_sessions(mocker):
 
     for r in response:
         assert r == mock_session_to_get
+
+
+async def test_async_get_user_whit_email(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+    mock_user = Users(id=1, email="test@gmail.com", stripe_customer_id=None)
+
+    mock_session.exec.return_value.first.return_value = mock_user
+
+    repo = AsyncAuthRepository(mock_session)
+
+    response = await repo.get_user_whit_email("test@gmail.com")
+
+    assert response == mock_user
+
+
+async def test_async_new_session_success(mocker):
+    mock_session = mocker.Mock()
+    mock_session.commit = mocker.AsyncMock()
+    mock_session.refresh = mocker.AsyncMock()
+
+    repo = AsyncAuthRepository(mock_session)
+
+    response = await repo.new_session(
+        jti="jti_mocked", sub="test@gmail.com", expires_at=dt.now()
+    )
+
+    assert response.jti == "jti_mocked"
+    mock_session.add.assert_called_once_with(response)
+    mock_session.commit.assert_awaited_once()
+
+
+async def test_async_new_session_db_error(mocker):
+    mock_session = mocker.Mock()
+    mock_session.commit = mocker.AsyncMock(
+        side_effect=SQLAlchemyError("Simuled DB Error")
+    )
+    mock_session.rollback = mocker.AsyncMock()
+
+    repo = AsyncAuthRepository(mock_session)
+
+    with pytest.raises(DatabaseError):
+        await repo.new_session(
+            jti="jti_mocked", sub="test@gmail.com", expires_at=dt.now()
+        )
+
+    mock_session.rollback.assert_awaited_once()
+
+
+async def test_async_delete_session_db_error(mocker):
+    mock_session = mocker.Mock()
+    mock_session.delete = mocker.AsyncMock()
+    mock_session.commit = mocker.AsyncMock(
+        side_effect=SQLAlchemyError("Simuled DB Error")
+    )
+    mock_session.rollback = mocker.AsyncMock()
+
+    mock_session_to_delete = Sessions(
+        jti="jti_mocked", sub="test@gmail.com", is_active=True, expires_at=dt.now()
+    )
+
+    repo = AsyncAuthRepository(mock_session)
+
+    with pytest.raises(DatabaseError):
+        await repo.delete_session(mock_session_to_delete)
+
+
+async def test_async_get_active_sessions(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+
+    mock_session_to_get = Sessions(
+        jti="jti_mocked", sub="test@gmail.com", is_active=True, expires_at=dt.now()
+    )
+
+    mock_session.exec.return_value.all.return_value = [mock_session_to_get]
+
+    repo = AsyncAuthRepository(mock_session)
+
+    response = await repo.get_active_sessions("test@gmail.com")
+
+    assert response == [mock_session_to_get]
+
+
+async def test_async_rotate_session(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+    mock_session.commit = mocker.AsyncMock()
+    expires_at = dt.now(timezone.utc)
+
+    row = mocker.Mock(
+        jti="new", sub="a@b.c", created_at=expires_at, expires_at=expires_at
+    )
+    mock_session.exec.return_value.first.side_effect = [row, None]
+
+    repo = AsyncAuthRepository(mock_session)
+
+    rotated = await repo.rotate_session("old", "a@b.c", "new", expires_at)
+    assert rotated.jti == "new"
+
+    stmt = mock_session.exec.call_args.args[0]
+    assert stmt is ROTATE_SESSION
+    assert mock_session.exec.call_args.kwargs["params"]["old_jti"] == "old"
+
+    assert await repo.rotate_session("old", "a@b.c", "new", expires_at) is None
+
+
+def test_rotate_session_is_single_statement():
+    sql = str(ROTATE_SESSION.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("WITH rotated_session AS")
+    assert "DELETE FROM sessions" in sql
+    assert "INSERT INTO sessions" in sql
+    assert "JOIN users ON users.email = rotated_session.sub" in sql
+
+
+def test_purge_expired_sessions(test_session):
+    now = dt.now(timezone.utc)
+    test_session.add_all(
+        [
+            Sessions(
+                jti="purge_expired",
+                sub="purge@gmail.com",
+                expires_at=now - timedelta(days=1),
+            ),
+            Sessions(
+                jti="purge_inactive",
+                sub="purge@gmail.com",
+                is_active=False,
+                expires_at=now + timedelta(days=1),
+            ),
+            Sessions(
+                jti="purge_live",
+                sub="purge@gmail.com",
+                expires_at=now + timedelta(days=1),
+            ),
+        ]
+    )
+    test_session.commit()
+
+    repo = AuthRepository(test_session)
+
+    while repo.purge_expired_sessions(batch_size=1):
+        pass
+
+    remaining = [s.jti for s in test_session.exec(select(Sessions)).all()]
+    assert "purge_live" in remaining
+    assert "purge_expired" not in remaining
+    assert "purge_inactive" not in remaining
+
+    test_session.delete(test_session.get(Sessions, "purge_live"))
+    test_session.commit()
+
+
+def test_purge_batch_skips_locked_rows():
+    sql = str(PURGE_SESSIONS_BATCH.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("DELETE FROM sessions WHERE sessions.jti IN")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+async def test_async_delete_sessions_for_sub(mocker):
+    mock_session = mocker.AsyncMock()
+    mock_session.info = {}
+    future = dt.now(timezone.utc) + timedelta(days=1)
+    past = dt.now(timezone.utc) - timedelta(days=1)
+    mock_session.exec.return_value = mocker.Mock()
+    mock_session.exec.return_value.all.return_value = [
+        (True, future),
+        (True, future),
+        (False, future),
+        (True, past),
+    ]
+
+    repo = AsyncAuthRepository(mock_session)
+
+    # Revoked and expired sessions are deleted but not counted
+    assert await repo.delete_sessions_for_sub("sub_mocked") == 2
+    assert mock_session.exec.call_args.kwargs["params"] == {"sub": "sub_mocked"}
+    mock_session.commit.assert_awaited_once()
+
+
+
+async def test_async_delete_sessions_for_sub_counts_live_only(test_session):
+    from test.conftest import async_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    now = dt.now(timezone.utc)
+    test_session.add_all(
+        [
+            Sessions(
+                jti="jti_logout_revoked",
+                sub="logout@gmail.com",
+                expires_at=now + timedelta(days=1),
+                is_active=False,
+            ),
+            Sessions(
+                jti="jti_logout_expired",
+                sub="logout@gmail.com",
+                expires_at=now - timedelta(days=1),
+            ),
+        ]
+    )
+    test_session.commit()
+
+    async with AsyncSession(async_engine) as session:
+        repo = AsyncAuthRepository(session)
+        assert await repo.delete_sessions_for_sub("logout@gmail.com") == 0
+        # Dead rows went with the DELETE
+        assert await repo.get_session_with_jti("jti_logout_revoked") is None
@@ -1,7 +1,8 @@
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
 from models.plan import Plans
-from repositories.plan_repositories import PlanRepository
+from repositories.plan_repositories import PlanRepository, AsyncPlanRepository
+from schemas.enums import SubscriptionTier
 from schemas.exceptions import DatabaseError, PlanNotFound
 
 
@@ -136,3 +137,22 @@ def test_delete_db_error(mocker):
 
     with pytest.raises(DatabaseError):
         repo.delete(price_id="pr_5165468")
+
+
+async def test_async_get_plan_by_tier_success(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+    plan_mocked = Plans(
+        id=1,
+        stripe_price_id="pr_86464",
+        name="free",
+        description=None,
+        price_cents=0,
+        interval="month",
+    )
+    mock_session.exec.return_value.first.return_value = plan_mocked
+
+    repo = AsyncPlanRepository(mock_session)
+    response = await repo.get_plan_by_tier(SubscriptionTier.free)
+
+    assert response == plan_mocked
@@ -0,0 +1,142 @@
+import json
+from datetime import datetime as dt, timedelta, timezone
+
+import pytest
+from redis.exceptions import RedisError
+
+from models.auth import Sessions
+from repositories.session_store import PostgresSessionStore, RedisSessionStore
+from schemas.exceptions import DatabaseError
+
+
+def _redis_mock(mocker):
+    client = mocker.Mock()
+    pipe = mocker.MagicMock()
+    pipe.execute = mocker.AsyncMock()
+    client.pipeline.return_value = pipe
+    pipe.__aenter__.return_value = pipe
+    return client, pipe
+
+
+def _raw(sub="a@b.c"):
+    now = dt.now(timezone.utc)
+    return json.dumps(
+        {
+            "sub": sub,
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(days=7)).isoformat(),
+        }
+    )
+
+
+async def test_postgres_store_delegates_to_repo(mocker):
+    repo = mocker.AsyncMock()
+    store = PostgresSessionStore(repo)
+    expires_at = dt.now(timezone.utc)
+
+    await store.new_session("jti", "a@b.c", expires_at)
+    await store.get_session_with_jti("jti")
+
+    repo.new_session.assert_awaited_once_with(
+        jti="jti", sub="a@b.c", expires_at=expires_at
+    )
+    repo.get_session_with_jti.assert_awaited_once_with("jti")
+
+
+async def test_redis_new_session_sets_ttl_and_index(mocker):
+    client, pipe = _redis_mock(mocker)
+    expires_at = dt.now(timezone.utc) + timedelta(days=7)
+
+    session = await RedisSessionStore(client).new_session("jti", "a@b.c", expires_at)
+
+    assert session.jti == "jti"
+    key, value = pipe.set.call_args.args
+    assert key == "session:jti"
+    assert json.loads(value)["sub"] == "a@b.c"
+    assert pipe.set.call_args.kwargs["exat"] == int(expires_at.timestamp())
+    pipe.sadd.assert_called_once_with("sessions:a@b.c", "jti")
+    pipe.execute.assert_awaited_once()
+
+
+async def test_redis_get_session_with_jti(mocker):
+    client, _ = _redis_mock(mocker)
+    client.get = mocker.AsyncMock(side_effect=[_raw(), None])
+
+    store = RedisSessionStore(client)
+
+    session = await store.get_session_with_jti("jti")
+    assert session.jti == "jti"
+    assert session.sub == "a@b.c"
+
+    assert await store.get_session_with_jti("missing") is None
+
+
+async def test_redis_active_sessions_drop_expired(mocker):
+    client, _ = _redis_mock(mocker)
+    client.smembers = mocker.AsyncMock(return_value={b"live", b"gone"})
+    client.mget = mocker.AsyncMock(
+        side_effect=lambda keys: [_raw() if k == "session:live" else None for k in keys]
+    )
+    client.srem = mocker.AsyncMock()
+
+    sessions = await RedisSessionStore(client).get_active_sessions("a@b.c")
+
+    assert [s.jti for s in sessions] == ["live"]
+    client.srem.assert_awaited_once_with("sessions:a@b.c", "gone")
+
+
+async def test_redis_delete_session(mocker):
+    client, pipe = _redis_mock(mocker)
+
+    await RedisSessionStore(client).delete_session(
+        Sessions(jti="jti", sub="a@b.c", expires_at=dt.now(timezone.utc))
+    )
+
+    pipe.delete.assert_called_once_with("session:jti")
+    pipe.srem.assert_called_once_with("sessions:a@b.c", "jti")
+
+
+async def test_redis_error_raises_database_error(mocker):
+    client, _ = _redis_mock(mocker)
+    client.get = mocker.AsyncMock(side_effect=RedisError("down"))
+
+    with pytest.raises(DatabaseError):
+        await RedisSessionStore(client).get_session_with_jti("jti")
+
+
+async def test_redis_rotate_session(mocker):
+    client, _ = _redis_mock(mocker)
+    rotate = mocker.AsyncMock(side_effect=[1, 0])
+    client.register_script.return_value = rotate
+    expires_at = dt.now(timezone.utc) + timedelta(days=7)
+
+    store = RedisSessionStore(client)
+
+    session = await store.rotate_session("old", "a@b.c", "new", expires_at)
+
+    assert session.jti == "new"
+    assert rotate.call_args.kwargs["keys"] == [
+        "session:old",
+        "session:new",
+        "sessions:a@b.c",
+    ]
+    assert rotate.call_args.kwargs["args"][:3] == ["a@b.c", "old", "new"]
+
+    # Replay of the same token loses
+    assert await store.rotate_session("old", "a@b.c", "new2", expires_at) is None
+
+
+async def test_redis_delete_all_sessions(mocker):
+    client, _ = _redis_mock(mocker)
+    client.smembers = mocker.AsyncMock(return_value={b"one", b"two"})
+    client.delete = mocker.AsyncMock(return_value=3)
+
+    assert await RedisSessionStore(client).delete_all_sessions("a@b.c") == 2
+
+    keys = client.delete.call_args.args
+    assert set(keys[:-1]) == {"session:one", "session:two"}
+    assert keys[-1] == "sessions:a@b.c"
+
+    client.smembers = mocker.AsyncMock(return_value=set())
+    assert await RedisSessionStore(client).delete_all_sessions("a@b.c") == 0
+
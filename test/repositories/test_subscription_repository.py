@@ -3,7 +3,11 @@ from datetime import datetime as dt
 import pytest
 from sqlalchemy.exc import SQLAlchemyError
 from models.subscription import Subscriptions
-from repositories.subscription_repositories import SubscriptionRepository
+from models.user import Users
+from repositories.subscription_repositories import (
+    SubscriptionRepository,
+    AsyncSubscriptionRepository,
+)
 from schemas.enums import SubscriptionTier
 from schemas.exceptions import DatabaseError, SubscriptionNotFound
 
@@ -132,13 +136,11 @@ def test_update_db_error(mocker):
 
 def test_update_for_user_success(mocker):
     mock_session = mocker.Mock()
-    sub_mocked = mocker.Mock(spec=Subscriptions)
-
-    mock_session.exec.return_value.first.return_value = sub_mocked
+    mock_session.exec.return_value.all.return_value = [(1, 1)]
 
     repo = SubscriptionRepository(mock_session)
 
-    repo.update_for_user(
+    response = repo.update_for_user(
         sub_id="sub_46846848",
         customer_id="cus_5468468",
         status="incomplete",
@@ -146,10 +148,15 @@ def test_update_for_user_success(mocker):
         current_period_end=dt.now(),
     )
 
+    assert response == (1, 1)
+    mock_session.exec.assert_called_once()
+    mock_session.commit.assert_called_once()
+
 
 def test_update_for_user_not_found_error(mocker):
     mock_session = mocker.Mock()
 
+    mock_session.exec.return_value.all.return_value = []
     mock_session.exec.return_value.first.return_value = None
 
     repo = SubscriptionRepository(mock_session)
@@ -163,6 +170,8 @@ def test_update_for_user_not_found_error(mocker):
             current_period_end=dt.now(),
         )
 
+    mock_session.commit.assert_not_called()
+
 
 def test_update_for_user_db_error(mocker):
     mock_session = mocker.Mock()
@@ -183,24 +192,26 @@ def test_update_for_user_db_error(mocker):
 
 def test_cancel_success(mocker):
     mock_session = mocker.Mock()
-    sub_mocked = mocker.Mock(spec=Subscriptions)
-
-    mock_session.exec.return_value.first.return_value = sub_mocked
+    mock_session.exec.return_value.all.return_value = [(1, 1)]
 
     repo = SubscriptionRepository(mock_session)
 
-    repo.cancel(
+    response = repo.cancel(
         sub_id="sub_46846848",
         customer_id="cus_5468468",
         status="incomplete",
         current_period_end=dt.now(),
     )
 
+    assert response == (1, 1)
+    mock_session.exec.assert_called_once()
+    mock_session.commit.assert_called_once()
+
 
 def test_cancel_not_found_error(mocker):
     mock_session = mocker.Mock()
 
-    mock_session.exec.return_value.first.return_value = None
+    mock_session.exec.return_value.all.return_value = []
 
     repo = SubscriptionRepository(mock_session)
 
@@ -212,6 +223,8 @@ def test_cancel_not_found_error(mocker):
             current_period_end=dt.now(),
         )
 
+    mock_session.commit.assert_not_called()
+
 
 def test_cancel_db_error(mocker):
     mock_session = mocker.Mock()
@@ -227,3 +240,109 @@ def test_cancel_db_error(mocker):
             status="incomplete",
             current_period_end=dt.now(),
         )
+
+
+async def test_async_get_all_subscriptions_by_user(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+
+    mock_subscription = Subscriptions(
+        id=1,
+        user_id=1,
+        plan_id=1,
+        stripe_subscription_id="sub_mocked",
+        status="incomplete",
+        current_period_end=dt.now(),
+    )
+
+    mock_session.exec.return_value.all.return_value = [mock_subscription]
+
+    repo = AsyncSubscriptionRepository(mock_session)
+
+    response = await repo.get_all_subscription_by_user(1)
+
+    assert response == [mock_subscription]
+
+
+def test_update_for_user_single_statement(test_session):
+    user = Users(email="update_returning@gmail.com", stripe_customer_id="cus_returning")
+    test_session.add(user)
+    test_session.commit()
+    test_session.refresh(user)
+
+    sub = Subscriptions(
+        user_id=user.id,
+        plan_id=1,
+        stripe_subscription_id="sub_returning",
+        status="incomplete",
+        current_period_end=dt(2025, 1, 1),
+    )
+    test_session.add(sub)
+    test_session.commit()
+    test_session.refresh(sub)
+
+    repo = SubscriptionRepository(test_session)
+
+    response = repo.update_for_user(
+        sub_id="sub_returning",
+        customer_id="cus_returning",
+        status="paid",
+        current_period_end=None,
+        is_active=True,
+    )
+
+    assert tuple(response) == (sub.id, user.id)
+
+    test_session.expire_all()
+    updated = test_session.get(Subscriptions, sub.id)
+    assert updated.status == "paid"
+    assert updated.is_active is True
+
+    with pytest.raises(SubscriptionNotFound):
+        repo.cancel(
+            sub_id="sub_returning",
+            customer_id="cus_other",
+            status="canceled",
+            current_period_end=dt.now(),
+        )
+
+
+def test_update_for_user_after_cancel_is_ignored(test_session):
+    user = Users(email="cancel_first@gmail.com", stripe_customer_id="cus_cancel_first")
+    test_session.add(user)
+    test_session.commit()
+    test_session.refresh(user)
+
+    sub = Subscriptions(
+        user_id=user.id,
+        plan_id=1,
+        stripe_subscription_id="sub_cancel_first",
+        status="paid",
+        current_period_end=dt(2030, 1, 1),
+        is_active=True,
+    )
+    test_session.add(sub)
+    test_session.commit()
+
+    repo = SubscriptionRepository(test_session)
+    repo.cancel(
+        sub_id="sub_cancel_first",
+        customer_id="cus_cancel_first",
+        status="canceled",
+        current_period_end=dt(2030, 1, 1),
+    )
+
+    # customer.subscription.updated queued before the deletion, run after it
+    response = repo.update_for_user(
+        sub_id="sub_cancel_first",
+        customer_id="cus_cancel_first",
+        status="active",
+        current_period_end=dt(2030, 2, 1),
+        is_active=True,
+    )
+
+    assert response is None
+    test_session.expire_all()
+    cancelled = test_session.get(Subscriptions, sub.id)
+    assert cancelled.is_active is False
+    assert cancelled.canceled_at is not None
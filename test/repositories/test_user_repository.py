@@ -1,8 +1,15 @@
 from sqlalchemy.exc import SQLAlchemyError
 from schemas.exceptions import DatabaseError
+from datetime import datetime as dt, timezone
+from sqlalchemy.dialects import postgresql
+from models.plan import Plans
+from models.subscription import Subscriptions
 from models.user import Users
-from repositories.user_repositories import UserRepository
+from schemas.enums import SubscriptionStatus, SubscriptionTier
+from repositories.statements import REFRESH_ENTITLEMENT, USER_BY_CUSTOMER_ID
+from repositories.user_repositories import UserRepository, AsyncUserRepository
 import pytest
+from sqlmodel import select
 
 
 def test_get_user_by_email(mocker):
@@ -140,3 +147,139 @@ def test_delete_error(mocker):
     mock_session.delete.assert_called_once()
 
     mock_session.commit.assert_called_once()
+
+
+async def test_async_get_user_by_customer_id(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec = mocker.AsyncMock(return_value=mocker.Mock())
+
+    user_mocked = Users(id=1, email="falso@gmail.com", stripe_customer_id="cus_546546")
+
+    mock_session.exec.return_value.first.return_value = user_mocked
+
+    mock_repo = AsyncUserRepository(mock_session)
+
+    response = await mock_repo.get_user_by_customer_id("cus_546546")
+
+    assert response == user_mocked
+
+
+def test_get_users_keyset_page(mocker):
+    mock_session = mocker.Mock()
+    mock_session.exec.return_value.all.return_value = []
+
+    mock_repo = UserRepository(mock_session)
+
+    mock_repo.get_users(limit=10, cursor=25)
+
+    stmt = mock_session.exec.call_args.args[0]
+    sql = str(stmt.compile(compile_kwargs={"literal_binds": True}))
+
+    assert "users.id > 25" in sql
+    assert "ORDER BY users.id" in sql
+    assert "LIMIT 11" in sql
+
+
+def test_lookups_reuse_prebuilt_statements(mocker):
+    mock_session = mocker.Mock()
+
+    repo = UserRepository(mock_session)
+
+    repo.get_user_by_customer_id("cus_1")
+    repo.get_user_by_customer_id("cus_2")
+
+    first, second = mock_session.exec.call_args_list
+    assert first.args[0] is USER_BY_CUSTOMER_ID
+    assert second.args[0] is USER_BY_CUSTOMER_ID
+    assert second.kwargs["params"] == {"customer_id": "cus_2"}
+
+
+def test_refresh_entitlement(test_session):
+    user = Users(email="entitled@gmail.com", stripe_customer_id="cus_entitled")
+    plan = Plans(
+        stripe_price_id="price_entitled",
+        name="Entitled",
+        price_cents=100,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+
+    subs = [
+        (SubscriptionTier.free, True, dt(2030, 1, 1)),
+        (SubscriptionTier.pro, True, dt(2029, 6, 1)),
+        (SubscriptionTier.enterprise, False, dt(2031, 1, 1)),
+    ]
+    for i, (tier, is_active, period_end) in enumerate(subs):
+        test_session.add(
+            Subscriptions(
+                user_id=user.id,
+                plan_id=plan.id,
+                stripe_subscription_id=f"sub_entitled_{i}",
+                tier=tier,
+                status=SubscriptionStatus.paid,
+                current_period_end=period_end,
+                is_active=is_active,
+            )
+        )
+    test_session.commit()
+
+    repo = UserRepository(test_session)
+    repo.refresh_entitlement(user.id)
+    test_session.refresh(user)
+
+    # Highest active tier wins, not the latest period end
+    assert user.effective_tier == SubscriptionTier.pro
+    # Stored as naive UTC, read back aware
+    assert user.entitlement_expires_at == dt(2029, 6, 1, tzinfo=timezone.utc)
+
+    for sub in test_session.exec(
+        select(Subscriptions).where(Subscriptions.user_id == user.id)
+    ):
+        sub.is_active = False
+    test_session.commit()
+
+    repo.refresh_entitlement(user.id)
+    test_session.refresh(user)
+
+    assert user.effective_tier is None
+    assert user.entitlement_expires_at is None
+
+
+def test_refresh_entitlement_free_trial_never_expires(test_session):
+    user = Users(email="trial@gmail.com", stripe_customer_id="cus_trial")
+    plan = Plans(
+        stripe_price_id="price_trial",
+        name="Trial",
+        price_cents=0,
+        interval="month",
+    )
+    test_session.add_all([user, plan])
+    test_session.commit()
+    test_session.add(
+        Subscriptions(
+            user_id=user.id,
+            plan_id=plan.id,
+            stripe_subscription_id="sub_free",
+            tier=SubscriptionTier.free,
+            status=SubscriptionStatus.trialing,
+            # Trials are created with the grant time as period end
+            current_period_end=dt(2020, 1, 1),
+            is_active=True,
+        )
+    )
+    test_session.commit()
+
+    UserRepository(test_session).refresh_entitlement(user.id)
+    test_session.refresh(user)
+
+    assert user.effective_tier == SubscriptionTier.free
+    assert user.entitlement_expires_at is None
+
+
+def test_refresh_entitlement_is_one_update():
+    sql = str(REFRESH_ENTITLEMENT.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE users SET effective_tier=(SELECT")
+    assert sql.count("LIMIT") == 2
+
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from models.webhook_event import WebhookEvents
+from repositories.webhook_event_repositories import (
+    AsyncWebhookEventRepository,
+    WebhookEventRepository,
+)
+from schemas.exceptions import DatabaseError
+
+
+def test_claim_mark_sent_and_failed(test_session):
+    for i in range(3):
+        test_session.add(
+            WebhookEvents(id=f"evt_claim_{i}", type="invoice.paid", payload={})
+        )
+    test_session.commit()
+
+    repo = WebhookEventRepository(test_session)
+    claimed = repo.claim_pending(batch_size=2, max_attempts=1)
+    assert [e.id for e in claimed] == ["evt_claim_0", "evt_claim_1"]
+
+    repo.mark_sent(claimed[:1])
+    repo.mark_failed(claimed[1], "boom")
+
+    # Sent and exhausted events are no longer pending
+    pending = repo.claim_pending(batch_size=10, max_attempts=1)
+    assert [e.id for e in pending] == ["evt_claim_2"]
+    assert claimed[1].attempts == 1
+    assert claimed[1].last_error == "boom"
+
+
+def test_mark_sent_db_error(mocker):
+    mock_session = mocker.Mock()
+    mock_session.flush.side_effect = SQLAlchemyError("db error")
+    mock_session.commit.side_effect = SQLAlchemyError("db error")
+
+    repo = WebhookEventRepository(mock_session)
+
+    with pytest.raises(DatabaseError):
+        repo.mark_sent([WebhookEvents(id="evt", type="t", payload={})])
+    mock_session.rollback.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_add_db_error(mocker):
+    mock_session = mocker.AsyncMock()
+    mock_session.info = {}
+    mock_session.exec.side_effect = SQLAlchemyError("db error")
+
+    repo = AsyncWebhookEventRepository(mock_session)
+
+    with pytest.raises(DatabaseError):
+        await repo.add("evt", "invoice.paid", {})
+    mock_session.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_backlog(test_session):
+    from test.conftest import async_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async def backlog():
+        async with AsyncSession(async_engine) as session:
+            return await AsyncWebhookEventRepository(session).backlog(max_attempts=5)
+
+    before = await backlog()
+    test_session.add(WebhookEvents(id="evt_backlog_0", type="t", payload={}))
+    test_session.add(
+        WebhookEvents(id="evt_backlog_1", type="t", payload={}, attempts=5)
+    )
+    test_session.add(
+        WebhookEvents(
+            id="evt_backlog_2",
+            type="t",
+            payload={},
+            sent_at=datetime.now(timezone.utc),
+        )
+    )
+    test_session.commit()
+
+    after = await backlog()
+    assert after["pending"] - before["pending"] == 1
+    assert after["dead_letter"] - before["dead_letter"] == 1
@@ -0,0 +1,221 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from datetime import datetime, timezone
+
+from models.webhook_event import WebhookEvents
+from script.replay_webhooks import (
+    EVENT_PARSERS,
+    customer_id,
+    drop_sent,
+    main,
+    partition,
+    read_events,
+    replay,
+    replay_partition,
+)
+from services.webhook_handler_service import EVENT_TASKS
+
+
+def _event(event_id, type, obj, created):
+    return {"id": event_id, "type": type, "created": created, "data": {"object": obj}}
+
+
+EVENTS = [
+    _event(
+        "evt_3",
+        "invoice.paid",
+        {"id": "in_1", "customer": "cus_a", "billing_reason": "manual"},
+        30,
+    ),
+    _event("evt_1", "customer.created", {"id": "cus_a", "email": "a@x.com"}, 10),
+    _event("evt_2", "customer.created", {"id": "cus_b", "email": "b@x.com"}, 20),
+    _event(
+        "evt_4",
+        "customer.subscription.updated",
+        {
+            "id": "sub_1",
+            "customer": "cus_b",
+            "status": "active",
+            "items": {"data": [{"current_period_end": 1900000000}]},
+        },
+        40,
+    ),
+    _event("evt_5", "charge.refunded", {"id": "ch_1", "customer": "cus_a"}, 50),
+]
+
+
+@pytest.fixture
+def tasks(mocker):
+    tasks = {
+        "customer.created": Mock(),
+        "invoice.paid": Mock(),
+        "customer.subscription.updated": Mock(),
+    }
+    mocker.patch.dict("script.replay_webhooks.EVENT_TASKS", tasks, clear=True)
+    return tasks
+
+
+def test_customer_id():
+    assert [customer_id(event) for event in EVENTS] == [
+        "cus_a",
+        "cus_a",
+        "cus_b",
+        "cus_b",
+        "cus_a",
+    ]
+
+
+def test_customer_id_expanded_customer():
+    event = _event("evt", "invoice.paid", {"customer": {"id": "cus_x"}}, 1)
+
+    assert customer_id(event) == "cus_x"
+
+
+def test_every_event_task_has_a_parser():
+    assert set(EVENT_PARSERS) == set(EVENT_TASKS)
+
+
+def test_read_events_orders_and_skips_invalid():
+    lines = [json.dumps(event) for event in EVENTS] + ["", "not json", '{"id": 1}']
+
+    events = read_events(lines)
+
+    assert [event["id"] for event in events] == [
+        "evt_1",
+        "evt_2",
+        "evt_3",
+        "evt_4",
+        "evt_5",
+    ]
+
+
+def test_partition_keeps_customer_order():
+    events = read_events(json.dumps(event) for event in EVENTS)
+
+    partitions = partition(events, workers=8)
+
+    for part in partitions:
+        for customer in {customer_id(event) for event in part}:
+            created = [e["created"] for e in part if customer_id(e) == customer]
+            assert created == sorted(created)
+    by_customer = {
+        customer_id(event): index
+        for index, part in enumerate(partitions)
+        for event in part
+    }
+    assert len(by_customer) == 2
+    assert sum(len(part) for part in partitions) == len(EVENTS)
+
+
+def test_replay_partition_runs_tasks(tasks):
+    events = read_events(json.dumps(event) for event in EVENTS)
+    tasks["invoice.paid"].side_effect = Exception("db down")
+
+    report = replay_partition(events)
+
+    tasks["customer.created"].assert_any_call(
+        {"id": "cus_a", "email": "a@x.com"}, correlation_id="replay-evt_1"
+    )
+    assert report.processed == 3
+    assert report.skipped == 1
+    assert report.failed == ["evt_3 (invoice.paid): db down"]
+
+
+def test_replay_dry_run_runs_nothing(tasks):
+    report = replay(EVENTS, workers=1, dry_run=True)
+
+    assert report.processed == 4
+    assert report.by_type["customer.created"] == 2
+    for task in tasks.values():
+        task.assert_not_called()
+
+
+def test_replay_dry_run_reports_invalid_payloads(tasks):
+    broken = [
+        _event("evt_6", "customer.created", {"id": "cus_c"}, 60),
+        _event(
+            "evt_7",
+            "customer.subscription.updated",
+            {"id": "sub_2", "customer": "cus_c", "items": {"data": []}},
+            70,
+        ),
+    ]
+
+    report = replay(EVENTS + broken, workers=1, dry_run=True)
+
+    assert report.processed == 4
+    assert [entry.split(" ")[0] for entry in report.invalid] == ["evt_6", "evt_7"]
+
+
+def test_replay_does_not_run_invalid_events(tasks):
+    broken = _event("evt_6", "customer.created", {"id": "cus_c"}, 60)
+
+    report = replay_partition([broken])
+
+    tasks["customer.created"].assert_not_called()
+    assert len(report.invalid) == 1
+
+
+def test_drop_sent(mocker, test_session):
+    mocker.patch("script.replay_webhooks.engine", test_session.get_bind())
+    test_session.add_all(
+        [
+            WebhookEvents(
+                id="evt_1",
+                type="customer.created",
+                payload={},
+                sent_at=datetime.now(timezone.utc),
+            ),
+            # Stored but still pending: the replay may run it
+            WebhookEvents(id="evt_2", type="customer.created", payload={}),
+        ]
+    )
+    test_session.commit()
+
+    events = drop_sent(EVENTS)
+
+    assert [event["id"] for event in events] == ["evt_3", "evt_2", "evt_4", "evt_5"]
+
+
+def test_main_dry_run(mocker, tasks, tmp_path, capsys):
+    # No database needed: the outbox isn't consulted
+    drop = mocker.patch("script.replay_webhooks.drop_sent")
+    path = tmp_path / "events.jsonl"
+    path.write_text("\n".join(json.dumps(event) for event in EVENTS))
+
+    assert main([str(path), "--workers", "1", "--dry-run"]) == 0
+
+    drop.assert_not_called()
+
+    out = capsys.readouterr().out
+    assert "events:    5  (dry run)" in out
+    assert "processed: 4" in out
+
+
+def test_main_counts_every_sent_event(mocker, tasks, tmp_path, capsys, test_session):
+    mocker.patch("script.replay_webhooks.engine", test_session.get_bind())
+    test_session.add(
+        WebhookEvents(
+            id="evt_sent_twice",
+            type="customer.created",
+            payload={},
+            sent_at=datetime.now(timezone.utc),
+        )
+    )
+    test_session.commit()
+    sent = _event(
+        "evt_sent_twice", "customer.created", {"id": "cus_c", "email": "c@x.com"}, 5
+    )
+    path = tmp_path / "events.jsonl"
+    # Exports can repeat an event
+    path.write_text("\n".join(json.dumps(event) for event in [sent, sent, EVENTS[0]]))
+
+    assert main([str(path), "--workers", "1"]) == 0
+
+    out = capsys.readouterr().out
+    assert "events:    3" in out
+    assert "sent:      2" in out
+    assert "processed: 1" in out
@@ -1,22 +1,28 @@
-from jose import JWTError
+from jose import JWTError, jwt
 import pytest
-from models.auth import Sessions
+from models.auth import ReadExpiredSession, Sessions
 from models.user import Users
 from schemas.auth_request import RefreshTokenRequest, Token
 from schemas.exceptions import (
     DatabaseError,
+    InsufficientSubscriptionError,
     InvalidToken,
     SessionNotFound,
     UserNotFoundError,
     UserNotFoundInLogin,
 )
+from core.sub_verifier import require_subscription_tier
+from core.tier_cache import TierCache
+from core.token_cache import token_cache
+from schemas.enums import SubscriptionTier
 from services.auth_services import AuthService
 from datetime import datetime as dt, timedelta, timezone
-from sqlalchemy.exc import SQLAlchemyError
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 
-def test_get_expired_sessions_found(mocker):
-    mock_auth_repo = mocker.Mock()
+async def test_get_expired_sessions_found(mocker):
+    mock_auth_repo = mocker.AsyncMock()
 
     # Mockea las respuestas
     mock_expires_at = dt(2024, 10, 10, 0, 0)
@@ -32,27 +38,36 @@ def test_get_expired_sessions_found(mocker):
 
     serv = AuthService(mock_auth_repo)
 
-    serv.get_expired_sessions()
+    response = await serv.get_expired_sessions()
 
-    mock_auth_repo.get_expired_sessions.assert_called_once_with()
+    assert response.items == [
+        ReadExpiredSession(
+            sub="sub_mock", is_active=False, expires_at=mock_expires_at
+        )
+    ]
+    assert "jti" not in response.items[0].model_dump()
+    assert response.next_cursor is None
 
+    mock_auth_repo.get_expired_sessions.assert_called_once_with(limit=50, cursor=None)
 
-def test_get_expired_sessions_not_found(mocker):
-    mock_auth_repo = mocker.Mock()
 
-    mock_auth_repo.get_expired_sessions.return_value = None
+async def test_get_expired_sessions_not_found(mocker):
+    mock_auth_repo = mocker.AsyncMock()
+
+    mock_auth_repo.get_expired_sessions.return_value = []
 
     serv = AuthService(mock_auth_repo)
 
-    response = serv.get_expired_sessions()
+    response = await serv.get_expired_sessions()
 
-    assert response == {"detail": "No expired sessions"}
+    assert response.items == []
+    assert response.next_cursor is None
 
-    mock_auth_repo.get_expired_sessions.assert_called_once_with()
+    mock_auth_repo.get_expired_sessions.assert_called_once_with(limit=50, cursor=None)
 
 
-def test_get_expired_sessions_exception(mocker):
-    mock_auth_repo = mocker.Mock()
+async def test_get_expired_sessions_exception(mocker):
+    mock_auth_repo = mocker.AsyncMock()
 
     mock_auth_repo.get_expired_sessions.side_effect = Exception(
         "Simuled Exception Error"
@@ -61,38 +76,38 @@ def test_get_expired_sessions_exception(mocker):
     serv = AuthService(mock_auth_repo)
 
     with pytest.raises(Exception):
-        serv.get_expired_sessions()
+        await serv.get_expired_sessions()
 
-    mock_auth_repo.get_expired_sessions.assert_called_once_with()
+    mock_auth_repo.get_expired_sessions.assert_called_once_with(limit=50, cursor=None)
 
 
-def test_auth_user_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     serv = AuthService(mock_repo)
 
     mocker.patch("services.auth_services.jwt.decode", side_effect=InvalidToken)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_JWTError(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_JWTError(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     serv = AuthService(mock_repo)
 
     mocker.patch("services.auth_services.jwt.decode", side_effect=JWTError)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_scope_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_scope_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     serv = AuthService(mock_repo)
 
@@ -101,12 +116,12 @@ def test_auth_user_scope_error(mocker):
     mocker.patch("services.auth_services.jwt.decode", return_value=mock_payload)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_sub_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_sub_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     serv = AuthService(mock_repo)
 
@@ -116,12 +131,12 @@ def test_auth_user_sub_error(mocker):
     mocker.patch("services.auth_services.jwt.decode", return_value=mock_payload)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_not_found_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_not_found_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     mock_payload = {"sub": "test@gmail.com", "scope": "api_access"}
 
@@ -132,12 +147,12 @@ def test_auth_user_not_found_error(mocker):
     serv = AuthService(mock_repo)
 
     with pytest.raises(UserNotFoundError):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_exp_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_exp_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     serv = AuthService(mock_repo)
 
@@ -147,12 +162,12 @@ def test_auth_user_exp_error(mocker):
 
     mock_repo.get_user_by_id.return_value = None
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_token_expired_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_token_expired_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     expiration_time = dt.now(timezone.utc) - timedelta(hours=1)
     mock_payload = {
@@ -168,12 +183,12 @@ def test_auth_user_token_expired_error(mocker):
     serv = AuthService(mock_repo)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
-def test_auth_user_jwt_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_auth_user_jwt_error(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_token = "mock_token"
 
     mocker.patch("services.auth_services.jwt.decode", side_effect=InvalidToken())
 
@@ -182,11 +197,11 @@ def test_auth_user_jwt_error(mocker):
     serv = AuthService(mock_repo)
 
     with pytest.raises(InvalidToken):
-        serv.auth_user(mock_token)
+        await serv.auth_user(mock_token)
 
 
 async def test_login_user_not_found(mocker):
-    mocker_repo = mocker.Mock()
+    mocker_repo = mocker.AsyncMock()
 
     mocker_repo.get_user_whit_email.return_value = None
 
@@ -197,7 +212,7 @@ async def test_login_user_not_found(mocker):
 
 
 async def test_login_db_error(mocker):
-    mocker_repo = mocker.Mock()
+    mocker_repo = mocker.AsyncMock()
 
     expiration_time = dt.now(timezone.utc) - timedelta(hours=1)
     mock_user = Users(id=1, email="test@gmail.com", stripe_customer_id="cus_mock_id")
@@ -222,385 +237,396 @@ async def test_login_db_error(mocker):
         await serv.login("test@gmail.com")
 
 
-def test_logout_sessions_not_found(mocker):
-    mock_repo = mocker.Mock()
+async def test_logout_sessions_not_found(mocker):
+    mock_repo = mocker.AsyncMock()
 
     serv = AuthService(mock_repo)
 
-    mock_repo.get_active_sessions.return_value = None
+    mock_repo.delete_sessions_for_sub.return_value = 0
 
     with pytest.raises(SessionNotFound):
-        serv.logout("sub_mock")
+        await serv.logout("sub_mock")
 
-    mock_repo.get_active_sessions.side_effect = DatabaseError(
+    mock_repo.delete_sessions_for_sub.side_effect = DatabaseError(
         SQLAlchemyError("db error"), "logout"
     )
 
     with pytest.raises(DatabaseError):
-        serv.logout("sub_mock")
+        await serv.logout("sub_mock")
 
 
-def test_logout_sessions_success(mocker):
-    mock_repo = mocker.Mock()
+async def test_logout_sessions_success(mocker):
+    mock_repo = mocker.AsyncMock()
 
-    mock_expires_at = dt(2024, 10, 10, 0, 0)
+    mock_repo.delete_sessions_for_sub.return_value = 2
 
-    mock_session = Sessions(
-        jti="jti_mock",
-        sub="sub_mock",
-        is_active=False,
-        use_count=0,
-        expires_at=mock_expires_at,
-    )
+    serv = AuthService(mock_repo)
 
-    mock_repo.get_active_sessions.return_value = [mock_session]
+    response = await serv.logout("sub_mock")
 
-    mock_repo.delete_session.return_value = None
+    assert response == {"detail": "Closed all sessions"}
 
-    serv = AuthService(mock_repo)
+    mock_repo.delete_sessions_for_sub.assert_called_once_with("sub_mock")
+    mock_repo.get_active_sessions.assert_not_called()
+    mock_repo.get_user_whit_email.assert_not_called()
 
-    response = serv.logout("sub_mock")
 
-    assert response == {"detail": "Closed all sessions"}
+def _refresh_payload(**overrides):
+    payload = {
+        "jti": "jti_mocked",
+        "scope": "token_refresh",
+        "sub": "test@gmail.com",
+        "exp": (dt.now(timezone.utc) + timedelta(hours=1)).timestamp(),
+    }
+    payload.update(overrides)
+    return {k: v for k, v in payload.items() if v is not None}
+
 
-    mock_repo.delete_session.assert_called_once_with(mock_session)
+REFRESH_REQUEST = RefreshTokenRequest(refresh="refresh_token_mocked")
 
 
-def test_refresh_not_session(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_refresh_not_session(mocker):
+    mock_repo = mocker.AsyncMock()
 
-    # Mockea jtw.get_unverified_claims
     mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value={"jti": "jti_mocked"},
+        "services.auth_services.jwt.decode", return_value=_refresh_payload()
     )
 
-    mock_repo.get_session_with_jti.return_value = None
+    # Already rotated (or replayed): nothing to delete, nothing inserted
+    mock_repo.rotate_session.return_value = None
 
     serv = AuthService(mock_repo)
 
     with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
-
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-
+        await serv.refresh(REFRESH_REQUEST)
 
-def test_refresh_not_scope(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+    assert mock_repo.rotate_session.call_args.kwargs["old_jti"] == "jti_mocked"
 
-    mock_payload = {"jti": "jti_mocked"}
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
-    )
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"scope": None},
+        {"scope": "api_access"},
+        {"sub": None},
+        {"jti": None},
+        {"exp": None},
+        {"exp": (dt.now(timezone.utc) - timedelta(hours=1)).timestamp()},
+    ],
+)
+async def test_refresh_invalid_claims(mocker, overrides):
+    mock_repo = mocker.AsyncMock()
 
-    # Mockea jwt.decode
     mocker.patch(
         "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+        return_value=_refresh_payload(**overrides),
     )
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
-
     serv = AuthService(mock_repo)
 
     with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
+        await serv.refresh(REFRESH_REQUEST)
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
+    # Rejected before touching the session store
+    mock_repo.rotate_session.assert_not_called()
 
 
-def test_refresh_scope_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
+async def test_refresh_user_not_found(mocker):
+    mocker.patch("services.auth_services.STATELESS_TOKENS", True)
+    mock_repo = mocker.AsyncMock()
 
-    mock_payload = {"jti": "jti_mocked", "scope": "api_token"}
-
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
-    )
-
-    # Mockea jwt.decode
     mocker.patch(
-        "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+        "services.auth_services.jwt.decode", return_value=_refresh_payload()
     )
-
-    mock_repo.get_session_with_jti.return_value = mock_payload
+    mock_repo.get_user_whit_email.return_value = None
 
     serv = AuthService(mock_repo)
 
-    with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
-
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-
+    with pytest.raises(UserNotFoundError):
+        await serv.refresh(REFRESH_REQUEST)
 
-def test_refresh_not_sub(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
 
-    mock_payload = {"jti": "jti_mocked", "scope": "token_refresh"}
+async def test_refresh_db_error(mocker):
+    mock_repo = mocker.AsyncMock()
 
     mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
+        "services.auth_services.jwt.decode", return_value=_refresh_payload()
     )
-
-    # Mockea jwt.decode
-    mocker.patch(
-        "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+    mock_repo.rotate_session.side_effect = DatabaseError(
+        SQLAlchemyError("db error"), "rotate_session"
     )
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
+    serv = AuthService(mock_repo)
+
+    with pytest.raises(DatabaseError):
+        await serv.refresh(REFRESH_REQUEST)
+
+
+async def test_refresh_jwt_error(mocker):
+    mock_repo = mocker.AsyncMock()
+
+    mocker.patch("services.auth_services.jwt.decode", side_effect=JWTError("bad"))
 
     serv = AuthService(mock_repo)
 
     with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
+        await serv.refresh(REFRESH_REQUEST)
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
+    mock_repo.rotate_session.assert_not_called()
 
 
-def test_refresh_user_not_found(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
-
-    mock_payload = {
-        "jti": "jti_mocked",
-        "scope": "token_refresh",
-        "sub": "test@gmail.com",
-    }
+async def test_refresh_success(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_email = "test@gmail.com"
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
+    decode = mocker.patch(
+        "services.auth_services.jwt.decode", return_value=_refresh_payload()
     )
-
-    # Mockea jwt.decode
     mocker.patch(
-        "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+        "services.auth_services.jwt.encode",
+        side_effect=["mock_access_token", "mock_new_refresh_token"],
     )
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
-
-    mock_repo.get_user_whit_email.return_value = None
+    mock_repo.rotate_session.return_value = Sessions(
+        jti="new_jti",
+        sub=mock_email,
+        expires_at=dt.now(timezone.utc) + timedelta(days=1),
+    )
 
     serv = AuthService(mock_repo)
+    result = await serv.refresh(REFRESH_REQUEST)
 
-    with pytest.raises(UserNotFoundError):
-        serv.refresh(mock_token)
+    assert decode.call_args.args[0] == "refresh_token_mocked"
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-    mock_repo.get_user_whit_email.assert_called_once_with("test@gmail.com")
+    kwargs = mock_repo.rotate_session.call_args.kwargs
+    assert kwargs["old_jti"] == "jti_mocked"
+    assert kwargs["sub"] == mock_email
+    assert kwargs["new_jti"] != "jti_mocked"
 
+    # One statement: no separate lookup, delete or insert
+    mock_repo.get_session_with_jti.assert_not_called()
+    mock_repo.delete_session.assert_not_called()
+    mock_repo.new_session.assert_not_called()
+    mock_repo.get_user_whit_email.assert_not_called()
 
-def test_refresh_not_exp(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
-    mock_user = mocker.Mock()
+    assert isinstance(result, Token)
+    assert result.access_token == "mock_access_token"
+    assert result.refresh_token == "mock_new_refresh_token"
+    assert result.token_type == "bearer"
 
-    mock_payload = {
-        "jti": "jti_mocked",
-        "scope": "token_refresh",
-        "sub": "test@gmail.com",
-    }
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
+async def test_auth_user_cached(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_repo.get_user_whit_email.return_value = Users(
+        id=1, email="cached@gmail.com", stripe_customer_id="cus_1"
     )
 
-    # Mockea jwt.decode
-    mocker.patch(
+    decode = mocker.patch(
         "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+        return_value={
+            "sub": "cached@gmail.com",
+            "scope": "api_access",
+            "exp": int(dt.now(timezone.utc).timestamp()) + 300,
+        },
     )
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
-
-    mock_repo.get_user_whit_email.return_value = mock_user
-
     serv = AuthService(mock_repo)
 
-    with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
-
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-    mock_repo.get_user_whit_email.assert_called_once_with("test@gmail.com")
-
+    first = await serv.auth_user("cached_token")
+    second = await serv.auth_user("cached_token")
 
-def test_refresh_token_expired(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = mocker.Mock()
-    mock_user = mocker.Mock()
+    assert second.id == first.id == 1
+    decode.assert_called_once()
+    mock_repo.get_user_whit_email.assert_awaited_once()
 
-    mock_expires_at = dt.now()
+    token_cache.invalidate_user("cached@gmail.com")
+    await serv.auth_user("cached_token")
 
-    mock_payload = {
-        "jti": "jti_mocked",
-        "scope": "token_refresh",
-        "sub": "test@gmail.com",
-        "exp": int(mock_expires_at.timestamp()),
-    }
+    assert decode.call_count == 2
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
-    )
 
-    # Mockea jwt.decode
+def _tier_token(mocker, email):
     mocker.patch(
         "services.auth_services.jwt.decode",
-        return_value=mock_payload,
+        return_value={
+            "sub": email,
+            "scope": "api_access",
+            "exp": int(dt.now(timezone.utc).timestamp()) + 300,
+        },
     )
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
 
-    mock_repo.get_user_whit_email.return_value = mock_user
+async def test_auth_user_with_tier(mocker):
+    mock_repo = mocker.AsyncMock()
+    period_end = dt(2030, 1, 1, tzinfo=timezone.utc)
+    mock_repo.get_user_whit_email.return_value = Users(
+        id=1,
+        email="tier@gmail.com",
+        stripe_customer_id="cus_1",
+        effective_tier=SubscriptionTier.pro,
+        entitlement_expires_at=period_end,
+    )
+    _tier_token(mocker, "tier@gmail.com")
 
-    serv = AuthService(mock_repo)
+    user = await AuthService(mock_repo).auth_user("tier_token", with_tier=True)
 
-    with pytest.raises(InvalidToken):
-        serv.refresh(mock_token)
+    # Read off the user row: no subscription query
+    assert user.effective_tier == SubscriptionTier.pro
+    assert user.entitlement_expires_at == period_end
+    mock_repo.get_user_whit_email.assert_awaited_once_with("tier@gmail.com")
+    mock_repo.get_unlapsed_entitlement.assert_not_called()
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-    mock_repo.get_user_whit_email.assert_called_once_with("test@gmail.com")
 
+async def test_auth_user_with_lapsed_tier(mocker):
+    mock_repo = mocker.AsyncMock()
+    mock_repo.get_user_whit_email.return_value = Users(
+        id=1,
+        email="lapsed@gmail.com",
+        stripe_customer_id="cus_1",
+        effective_tier=SubscriptionTier.pro,
+        entitlement_expires_at=dt.now(timezone.utc) - timedelta(minutes=1),
+    )
+    mock_repo.get_unlapsed_entitlement.return_value = (SubscriptionTier.free, None)
+    _tier_token(mocker, "lapsed@gmail.com")
+
+    user = await AuthService(mock_repo).auth_user("lapsed_token", with_tier=True)
+
+    assert user.effective_tier == SubscriptionTier.free
+    assert user.entitlement_expires_at is None
+    mock_repo.get_unlapsed_entitlement.assert_awaited_once_with(1)
+
+
+@pytest.fixture
+def local_tier_cache(mocker):
+    # In-process tier cache, Redis unreachable
+    client = mocker.AsyncMock()
+    client.get.side_effect = RedisError("down")
+    client.set.side_effect = RedisError("down")
+    mocker.patch("core.tier_cache.get_async_redis", return_value=client)
+    cache = TierCache(ttl=300, local_ttl=60, stale_ttl=3600)
+    mocker.patch("services.auth_services.tier_cache", cache)
+    return cache
+
+
+async def test_auth_user_with_tier_cached(mocker, local_tier_cache):
+    mock_repo = mocker.AsyncMock()
+    mock_repo.get_user_whit_email.return_value = Users(
+        id=1,
+        email="hot@gmail.com",
+        stripe_customer_id="cus_1",
+        effective_tier=SubscriptionTier.free,
+    )
+    mock_repo.get_entitlement.return_value = (SubscriptionTier.pro, None)
+    _tier_token(mocker, "hot@gmail.com")
 
-def test_refresh_db_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = "mock_jwt_token"
+    serv = AuthService(mock_repo)
+    await serv.auth_user("hot_token", with_tier=True)
 
-    mock_user = Users(id=1, email="test@gmail.com", stripe_customer_id="cus_mock_id")
+    # Token cache hit: the cached user's tier isn't trusted, the tier cache is
+    first = await serv.auth_user("hot_token", with_tier=True)
+    second = await serv.auth_user("hot_token", with_tier=True)
 
-    mock_expires_at = dt.now() + timedelta(hours=1)
+    assert first.effective_tier == second.effective_tier == "PRO"
+    mock_repo.get_user_whit_email.assert_awaited_once()
+    mock_repo.get_entitlement.assert_awaited_once_with(1)
 
-    mock_payload = {
-        "jti": "jti_mocked",
-        "scope": "token_refresh",
-        "sub": "test@gmail.com",
-        "exp": int(mock_expires_at.timestamp()),
-    }
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
+async def test_auth_user_with_tier_serves_stale_when_db_down(
+    mocker, local_tier_cache
+):
+    mock_repo = mocker.AsyncMock()
+    mock_repo.get_user_whit_email.return_value = Users(
+        id=1, email="stale@gmail.com", stripe_customer_id="cus_1"
     )
+    mock_repo.get_entitlement.return_value = (SubscriptionTier.pro, None)
+    _tier_token(mocker, "stale@gmail.com")
 
-    mocker.patch(
-        "services.auth_services.jwt.decode",
-        return_value=mock_payload,
-    )
-
-    mock_repo.get_session_with_jti.return_value = mock_payload
-
-    mock_repo.get_user_whit_email.return_value = mock_user
+    serv = AuthService(mock_repo)
+    await serv.auth_user("stale_token", with_tier=True)
+    await serv.auth_user("stale_token", with_tier=True)
 
-    mock_repo.delete_session.side_effect = DatabaseError(
-        error=Exception("Simuled db error"), func="AuthRepository.delete_session"
+    # Past its freshness, and the database is gone
+    local_tier_cache.local_ttl = local_tier_cache.ttl = 0
+    mock_repo.get_entitlement.side_effect = OperationalError(
+        "SELECT", {}, Exception()
     )
 
-    serv = AuthService(mock_repo)
+    user = await serv.auth_user("stale_token", with_tier=True)
 
-    with pytest.raises(DatabaseError):
-        serv.refresh(refresh=RefreshTokenRequest(refresh=mock_token))
+    assert user.effective_tier == "PRO"
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
-    mock_repo.get_user_whit_email.assert_called_once_with("test@gmail.com")
-    mock_repo.delete_session.assert_called_once_with(mock_payload)
 
+async def test_stateless_token_round_trip(mocker):
+    mocker.patch("services.auth_services.STATELESS_TOKENS", True)
+    mocker.patch(
+        "services.auth_services.get_claim_version", mocker.AsyncMock(return_value=3)
+    )
+    mocker.patch("services.auth_services.SECRET", "secret")
+    mocker.patch("services.auth_services.ALGORITHM", "HS256")
 
-def test_refresh_jwt_error(mocker):
-    mock_repo = mocker.Mock()
-    mock_token = "mock_jwt_token"
+    mock_repo = mocker.AsyncMock()
 
-    mock_payload = {"jti": "jti_mocked", "sub": "test@gmail.com"}
+    serv = AuthService(mock_repo)
 
-    mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_payload,
+    token = await serv._access_token(
+        Users(
+            id=7,
+            email="claims@gmail.com",
+            stripe_customer_id="cus_7",
+            effective_tier=SubscriptionTier.pro,
+        )
     )
 
-    mocker.patch("services.auth_services.jwt.decode", side_effect=JWTError())
+    user = await serv.auth_user(token)
 
-    mock_repo.get_session_with_jti.return_value = mock_payload
-
-    serv = AuthService(mock_repo)
+    assert user.id == 7
+    assert user.stripe_customer_id == "cus_7"
+    assert user.effective_tier == SubscriptionTier.pro
+    mock_repo.get_user_whit_email.assert_not_called()
 
-    with pytest.raises(InvalidToken):
-        serv.refresh(refresh=RefreshTokenRequest(refresh=mock_token))
 
-    mock_repo.get_session_with_jti.assert_called_once_with("jti_mocked")
+async def test_stateless_token_without_subscription(mocker):
+    mocker.patch("services.auth_services.STATELESS_TOKENS", True)
+    mocker.patch(
+        "services.auth_services.get_claim_version", mocker.AsyncMock(return_value=1)
+    )
+    mocker.patch("services.auth_services.SECRET", "secret")
+    mocker.patch("services.auth_services.ALGORITHM", "HS256")
 
+    serv = AuthService(mocker.AsyncMock())
 
-def test_refresh_success(mocker):
-    # Configurar mocks y datos de prueba
-    mock_repo = mocker.Mock()
-    mock_refresh_token = "mock_jwt_token"
-    mock_email = "test@gmail.com"
-    mock_jti = "mock_jti"
-    mock_access_token = "mock_access_token"
-    mock_new_refresh_token = "mock_new_refresh_token"
+    token = await serv._access_token(
+        Users(id=8, email="nosub@gmail.com", stripe_customer_id=None)
+    )
 
-    # Configurar payloads
-    mock_unverified_payload = {
-        "jti": mock_jti,
-        "scope": "token_refresh",
-        "sub": mock_email,
-        "exp": (dt.now(timezone.utc) + timedelta(hours=1)).timestamp(),
-    }
+    assert jwt.get_unverified_claims(token)["tier"] is None
 
-    mock_decoded_payload = mock_unverified_payload.copy()
+    user = await serv.auth_user(token, with_tier=True)
 
-    # COnfigurar usuario simulado
-    mock_user = Users(id=1, email=mock_email, stripe_customer_id="cus_mock")
+    # Denied like on the DB path, not treated as FREE
+    assert user.effective_tier is None
+    with pytest.raises(InsufficientSubscriptionError):
+        await require_subscription_tier(SubscriptionTier.free)(user=user)
 
-    # Configurar nueva sesion simulada
-    mock_new_session = mocker.Mock()
-    mock_new_session.jti = "new_jit"
-    mock_new_session.sub = mock_email
-    mock_new_session.expires_at = dt.now(timezone.utc) + timedelta(days=1)
 
-    # COnfigurar los mocks
+async def test_stateless_token_outdated_claims(mocker):
+    mocker.patch("services.auth_services.STATELESS_TOKENS", True)
     mocker.patch(
-        "services.auth_services.jwt.get_unverified_claims",
-        return_value=mock_unverified_payload,
+        "services.auth_services.get_claim_version", mocker.AsyncMock(return_value=4)
     )
-
     mocker.patch(
         "services.auth_services.jwt.decode",
-        return_value=mock_decoded_payload,
+        return_value={
+            "sub": "claims@gmail.com",
+            "scope": "api_access",
+            "exp": int(dt.now(timezone.utc).timestamp()) + 300,
+            "uid": 7,
+            "tier": "PRO",
+            "tv": 3,
+        },
     )
 
-    mocker.patch(
-        "services.auth_services.jwt.encode",
-        side_effect=[mock_access_token, mock_new_refresh_token],
-    )
+    serv = AuthService(mocker.AsyncMock())
 
-    # COnfigurar respuestas del repositorio
-    mock_repo.get_session_with_jti.return_value = mock_unverified_payload
-    mock_repo.get_user_whit_email.return_value = mock_user
-    # mock_repo.delete_session.return_value = None
-    mock_repo.new_session.return_value = mock_new_session
-
-    # Ejecutar el servicio
-    serv = AuthService(mock_repo)
-    result = serv.refresh(refresh=mock_refresh_token)
-
-    # Verificaciones
-    mock_repo.get_session_with_jti.assert_called_once_with(mock_jti)
-    mock_repo.get_user_whit_email.assert_called_once_with(mock_email)
-    # mock_repo.delete_session.assert_called_once_with()
-    # mock_repo.new_session.assert_called_once_with()
-
-    assert isinstance(result, Token)
-    assert result.access_token == mock_access_token
-    assert result.refresh_token == mock_new_refresh_token
-    assert result.token_type == "bearer"
+    with pytest.raises(InvalidToken):
+        await serv.auth_user("stale_token")
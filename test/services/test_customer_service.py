@@ -45,8 +45,10 @@ class TestHandleCustomerCreated:
         service.handle_customer_created(info)
 
         user_repo.get_user_by_customer_id.assert_called_once_with("cus_test")
-        user_repo.create.assert_called_once_with(email="test@example.com")
-        user_repo.update.assert_called_once_with(id=1, stripe_id="cus_test")
+        user_repo.create.assert_called_once_with(
+            email="test@example.com", stripe_customer_id="cus_test"
+        )
+        user_repo.update.assert_not_called()
 
     def test_existing_user(self, mock_service):
         """Test handling when user already exists."""
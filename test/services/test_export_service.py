@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from datetime import datetime as dt
+from schemas.enums import ExportFormat, SubscriptionStatus
+from services import export_service
+from services.export_service import ExportService
+
+
+ROWS = [
+    {"id": 1, "status": SubscriptionStatus.paid, "current_period_end": dt(2025, 1, 1)},
+    {"id": 2, "status": SubscriptionStatus.unpaid, "current_period_end": None},
+]
+
+
+def test_export_subscriptions_ndjson(mocker):
+    session = mocker.Mock()
+    stream_mock = mocker.patch(
+        "services.export_service.stream_subscriptions", return_value=iter(ROWS)
+    )
+
+    serv = ExportService(lambda: session)
+
+    body = "".join(
+        serv.export_subscriptions(ExportFormat.ndjson, status=SubscriptionStatus.paid)
+    )
+
+    lines = [json.loads(line) for line in body.splitlines()]
+    assert lines == [
+        {"id": 1, "status": "paid", "current_period_end": "2025-01-01T00:00:00"},
+        {"id": 2, "status": "unpaid", "current_period_end": None},
+    ]
+
+    stream_mock.assert_called_once_with(
+        session,
+        status=SubscriptionStatus.paid,
+        tier=None,
+        period_end_from=None,
+        period_end_to=None,
+    )
+    session.close.assert_called_once()
+
+
+def test_export_users_csv_chunks(mocker):
+    session = mocker.Mock()
+    mocker.patch.object(export_service, "CHUNK_ROWS", 1)
+    mocker.patch(
+        "services.export_service.stream_users",
+        return_value=iter([{"id": 1, "email": "a@x.com"}, {"id": 2, "email": "b@x.com"}]),
+    )
+
+    chunks = list(ExportService(lambda: session).export_users(ExportFormat.csv))
+
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert rows == [{"id": "1", "email": "a@x.com"}, {"id": "2", "email": "b@x.com"}]
+    session.close.assert_called_once()
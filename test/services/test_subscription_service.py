@@ -70,9 +70,12 @@ def test_get_all_subscriptions_success(mocker):
         repo=sub_repo_mock, user_repo=user_repo_mock, plan_repo=plan_repo_mock
     )
 
-    serv.get_all_subscription()
+    response = serv.get_all_subscription(limit=1)
 
-    sub_repo_mock.get_all_subscription.assert_called_once_with()
+    assert [sub.id for sub in response.items] == [1]
+    assert response.next_cursor is not None
+
+    sub_repo_mock.get_all_subscription.assert_called_once_with(limit=1, cursor=None)
 
 
 def test_get_all_subscriptions_by_user_success(mocker):
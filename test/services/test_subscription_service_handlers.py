@@ -5,6 +5,7 @@ from datetime import datetime
 from models.user import Users
 from models.plan import Plans
 from schemas.enums import SubscriptionStatus, SubscriptionTier
+from schemas.exceptions import SubscriptionNotFound
 from services.subscription_service import (
     SubscriptionService,
     InvoicePaidInfo,
@@ -21,6 +22,7 @@ def mock_service(mocker):
     sub_repo = mocker.Mock()
     user_repo = mocker.Mock()
     plan_repo = mocker.Mock()
+    sub_repo.has_free_trial.return_value = False
 
     service = SubscriptionService(
         repo=sub_repo, user_repo=user_repo, plan_repo=plan_repo
@@ -42,9 +44,6 @@ class TestHandleInvoicePaid:
         service = mock_service["service"]
         sub_repo = mock_service["sub_repo"]
 
-        # Mock subscription found
-        sub_repo.get_subscription_for_user.return_value = {"id": 1}
-
         info = InvoicePaidInfo(
             subscription_id="sub_test",
             customer_id="cus_test",
@@ -66,7 +65,7 @@ class TestHandleInvoicePaid:
         sub_repo = mock_service["sub_repo"]
 
         # Mock subscription NOT found
-        sub_repo.get_subscription_for_user.return_value = None
+        sub_repo.update_for_user.side_effect = SubscriptionNotFound("sub_not_found")
 
         info = InvoicePaidInfo(
             subscription_id="sub_not_found",
@@ -75,9 +74,11 @@ class TestHandleInvoicePaid:
             status="paid",
         )
 
-        with pytest.raises(Exception, match="Subscription sub_not_found not found"):
+        with pytest.raises(SubscriptionNotFound):
             service.handle_invoice_paid(info)
 
+        sub_repo.get_subscription_for_user.assert_not_called()
+
 
 class TestHandleInvoicePaymentFailed:
     """Tests for handle_invoice_payment_failed method."""
@@ -87,8 +88,6 @@ class TestHandleInvoicePaymentFailed:
         service = mock_service["service"]
         sub_repo = mock_service["sub_repo"]
 
-        sub_repo.get_subscription_for_user.return_value = {"id": 1}
-
         info = InvoicePaidInfo(
             subscription_id="sub_test",
             customer_id="cus_test",
@@ -167,6 +166,26 @@ class TestHandleCustomerSubscriptionUpdated:
         call_kwargs = sub_repo.update_for_user.call_args.kwargs
         assert call_kwargs["is_active"] is False
 
+    def test_after_deleted_is_ignored(self, mock_service):
+        """An updated event processed after deleted changes nothing."""
+        service = mock_service["service"]
+        sub_repo = mock_service["sub_repo"]
+        user_repo = mock_service["user_repo"]
+        # The repository leaves cancelled subscriptions alone
+        sub_repo.update_for_user.return_value = None
+
+        info = SubscriptionUpdatedInfo(
+            subscription_id="sub_test",
+            customer_id="cus_test",
+            current_period_end=datetime.now(),
+            status="active",
+            is_active=True,
+        )
+
+        service.handle_customer_subscription_updated(info)
+
+        user_repo.refresh_entitlement.assert_not_called()
+
 
 class TestHandleCustomerSubscriptionDeleted:
     """Tests for handle_customer_subscription_deleted method."""
@@ -190,6 +209,26 @@ class TestHandleCustomerSubscriptionDeleted:
         assert call_kwargs["sub_id"] == "sub_test"
         assert call_kwargs["customer_id"] == "cus_test"
 
+    def test_recomputes_entitlement(self, mock_service, mocker):
+        """The user's tier is recomputed and its cached copy dropped."""
+        service = mock_service["service"]
+        sub_repo = mock_service["sub_repo"]
+        invalidate = mocker.patch("services.subscription_service.invalidate_tier")
+
+        sub_repo.cancel.return_value = mocker.Mock(user_id=7)
+
+        service.handle_customer_subscription_deleted(
+            SubscriptionDeletedInfo(
+                subscription_id="sub_test",
+                customer_id="cus_test",
+                current_period_end=datetime.now(),
+                status="canceled",
+            )
+        )
+
+        mock_service["user_repo"].refresh_entitlement.assert_called_once_with(7)
+        invalidate.assert_called_once_with(7)
+
 
 class TestHandleCustomerSubscriptionPaused:
     """Tests for handle_customer_subscription_paused method."""
@@ -244,7 +283,41 @@ class TestHandleCustomerSubBasic:
         user_repo.get_user_by_customer_id.assert_called_once_with("cus_test")
         plan_repo.get_plan_by_tier.assert_called_once_with(tier=SubscriptionTier.free)
         sub_repo.create.assert_called_once()
-        sub_repo.update_for_user.assert_called_once()
+        assert sub_repo.create.call_args.kwargs["is_active"] is True
+        sub_repo.update_for_user.assert_not_called()
+
+    def test_already_has_trial(self, mock_service):
+        """Test a replayed customer.created doesn't grant a second trial."""
+        service = mock_service["service"]
+        sub_repo = mock_service["sub_repo"]
+        sub_repo.has_free_trial.return_value = True
+        user = Users(id=3, email="test@example.com", stripe_customer_id="cus_test")
+
+        service.handle_customer_sub_basic("cus_test", user=user)
+
+        sub_repo.has_free_trial.assert_called_once_with(3)
+        sub_repo.create.assert_not_called()
+        mock_service["plan_repo"].get_plan_by_tier.assert_not_called()
+
+    def test_with_user(self, mock_service):
+        """Test the user lookup is skipped when the user is given."""
+        service = mock_service["service"]
+        user_repo = mock_service["user_repo"]
+        sub_repo = mock_service["sub_repo"]
+        mock_service["plan_repo"].get_plan_by_tier.return_value = Plans(
+            id=1,
+            stripe_price_id="price_free",
+            name="free",
+            description="Free tier",
+            price_cents=0,
+            interval="month",
+        )
+        user = Users(id=3, email="test@example.com", stripe_customer_id="cus_test")
+
+        service.handle_customer_sub_basic("cus_test", user=user)
+
+        user_repo.get_user_by_customer_id.assert_not_called()
+        assert sub_repo.create.call_args.kwargs["user_id"] == 3
 
     def test_user_not_found(self, mock_service):
         """Test handling when user not found."""
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import Mock
+
+from models.webhook_event import WebhookEvents
+from services.webhook_outbox_service import WebhookOutboxService
+
+
+def _event(event_id):
+    return WebhookEvents(
+        id=event_id,
+        type="invoice.paid",
+        payload={"id": event_id, "type": "invoice.paid", "data": {"object": {}}},
+    )
+
+
+@pytest.fixture
+def repo():
+    return Mock()
+
+
+@pytest.fixture
+def handler():
+    return Mock()
+
+
+def test_dispatch_batch_marks_published_events_sent(repo, handler):
+    events = [_event("evt_1"), _event("evt_2")]
+    repo.claim_pending.return_value = events
+    # evt_2 was already published by an earlier delivery
+    handler.handle.side_effect = [True, False]
+
+    service = WebhookOutboxService(repo, handler, max_attempts=3)
+
+    assert service.dispatch_batch(50) == 2
+    repo.claim_pending.assert_called_once_with(50, 3)
+    handler.handle.assert_any_call(events[0].payload)
+    repo.mark_sent.assert_called_once_with(events)
+    repo.mark_failed.assert_not_called()
+
+
+def test_dispatch_batch_stops_at_failed_event(repo, handler):
+    events = [_event("evt_1"), _event("evt_2"), _event("evt_3")]
+    repo.claim_pending.return_value = events
+    handler.handle.side_effect = [True, Exception("broker down"), True]
+
+    service = WebhookOutboxService(repo, handler)
+
+    assert service.dispatch_batch() == 1
+    repo.mark_failed.assert_called_once_with(events[1], "broker down")
+    repo.mark_sent.assert_called_once_with(events[:1])
+    assert handler.handle.call_count == 2
+
+
+def test_dispatch_batch_empty(repo, handler):
+    repo.claim_pending.return_value = []
+
+    assert WebhookOutboxService(repo, handler).dispatch_batch() == 0
+    repo.mark_sent.assert_not_called()
+
+
+def test_dispatch_batch_logs_dead_letter(mocker, repo, handler):
+    event = _event("evt_1")
+    event.attempts = 2
+    repo.claim_pending.return_value = [event]
+    repo.mark_failed.side_effect = lambda event, error: setattr(
+        event, "attempts", event.attempts + 1
+    )
+    handler.handle.side_effect = Exception("broker down")
+    error = mocker.patch("services.webhook_outbox_service.logger.error")
+
+    assert WebhookOutboxService(repo, handler, max_attempts=3).dispatch_batch() == 0
+    error.assert_called_with(
+        "[WebhookOutboxService.dispatch_batch] Event evt_1 dead-lettered after 3 attempts"
+    )
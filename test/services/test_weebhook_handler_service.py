@@ -2,15 +2,15 @@ from fastapi import HTTPException
 from services.webhook_handler_service import WebhooksHandlerService
 import pytest
 from tasks.customer import (
-    customer_created,
+    customer_created_pipeline,
     customer_deleted,
 )
 from tasks.invoice import invoice_paid
 from tasks.subscriptions import (
     customer_subscription_created,
     customer_subscription_deleted,
+    customer_subscription_paused,
     customer_subscription_updated,
-    customer_sub_basic,
 )
 
 
@@ -34,8 +34,7 @@ def test_webhook_handler_invoice(mocker):
 
 
 def test_webhook_handler_customer_success(mocker):
-    mocker.patch("tasks.customer.customer_created.delay")
-    mocker.patch("tasks.subscriptions.customer_sub_basic.delay")
+    mocker.patch("tasks.customer.customer_created_pipeline.delay")
     mocker.patch("tasks.customer.customer_deleted.delay")
 
     web_serv = WebhooksHandlerService()
@@ -48,8 +47,7 @@ def test_webhook_handler_customer_success(mocker):
         event={"type": "customer.deleted", "data": {"object": {"test": "webhook"}}}
     )
 
-    customer_created.delay.assert_called_once_with({"test": "webhook"})
-    customer_sub_basic.delay.assert_called_once_with({"test": "webhook"})
+    customer_created_pipeline.delay.assert_called_once_with({"test": "webhook"})
     customer_deleted.delay.assert_called_once_with({"test": "webhook"})
 
 
@@ -57,6 +55,7 @@ def test_webhook_handler_subscriptions_success(mocker):
     mocker.patch("tasks.subscriptions.customer_subscription_created.delay")
     mocker.patch("tasks.subscriptions.customer_subscription_updated.delay")
     mocker.patch("tasks.subscriptions.customer_subscription_deleted.delay")
+    mocker.patch("tasks.subscriptions.customer_subscription_paused.delay")
 
     web_serv = WebhooksHandlerService()
 
@@ -84,3 +83,48 @@ def test_webhook_handler_subscriptions_success(mocker):
     customer_subscription_created.delay.assert_called_once_with({"test": "webhook"})
     customer_subscription_updated.delay.assert_called_once_with({"test": "webhook"})
     customer_subscription_deleted.delay.assert_called_once_with({"test": "webhook"})
+
+    web_serv.handle(
+        event={
+            "type": "customer.subscription.paused",
+            "data": {"object": {"test": "webhook"}},
+        }
+    )
+
+    # Paused has its own task, not the generic update
+    customer_subscription_paused.delay.assert_called_once_with({"test": "webhook"})
+    customer_subscription_updated.delay.assert_called_once_with({"test": "webhook"})
+
+
+def test_webhook_handler_duplicate_event(mocker):
+    mocker.patch("tasks.invoice.invoice_paid.delay")
+    dedup = mocker.Mock()
+    dedup.claim.side_effect = [True, False]
+
+    web_serv = WebhooksHandlerService(dedup=dedup)
+    event = {
+        "id": "evt_dup",
+        "type": "invoice.paid",
+        "data": {"object": {"test": "webhook"}},
+    }
+
+    assert web_serv.handle(event) is True
+    assert web_serv.handle(event) is False
+
+    invoice_paid.delay.assert_called_once_with({"test": "webhook"})
+    dedup.claim.assert_called_with("evt_dup")
+
+
+def test_webhook_handler_releases_claim_on_failure(mocker):
+    mocker.patch("tasks.invoice.invoice_paid.delay", side_effect=Exception("down"))
+    dedup = mocker.Mock()
+    dedup.claim.return_value = True
+
+    web_serv = WebhooksHandlerService(dedup=dedup)
+
+    with pytest.raises(Exception):
+        web_serv.handle(
+            event={"id": "evt_1", "type": "invoice.paid", "data": {"object": {}}}
+        )
+
+    dedup.release.assert_called_once_with("evt_1")
@@ -2,18 +2,19 @@ import pytest
 
 from models.user import Users
 from schemas.exceptions import DatabaseError
-from tasks.customer import customer_created, customer_deleted
+from models.plan import Plans
+from tasks.customer import customer_created, customer_created_pipeline, customer_deleted
 
 
 @pytest.fixture
 def mock_repos(mocker):
     """Mock repositories for task tests."""
-    from unittest.mock import Mock
+    from unittest.mock import MagicMock, Mock
 
-    mock_session = Mock()
+    mock_session = MagicMock()
     mock_repo = Mock()
 
-    mocker.patch("db.session.get_session", return_value=iter([mock_session]))
+    mocker.patch("helpers.context.Session", return_value=mock_session)
     mocker.patch(
         "helpers.context.UserRepository",
         return_value=mock_repo,
@@ -36,8 +37,10 @@ def test_customer_created_success(mock_repos):
     customer_created(payload)
 
     mock_repo.get_user_by_customer_id.assert_called_once_with("cus_id")
-    mock_repo.create.assert_called_once_with(email="test@gmail.com")
-    mock_repo.update.assert_called_once_with(id=1, stripe_id="cus_id")
+    mock_repo.create.assert_called_once_with(
+        email="test@gmail.com", stripe_customer_id="cus_id"
+    )
+    mock_repo.update.assert_not_called()
 
 
 def test_customer_created_existing_user(mock_repos):
@@ -84,6 +87,101 @@ def test_customer_created_unexpected_error(mock_repos):
         customer_created(payload)
 
 
+@pytest.fixture
+def mock_pipeline(mocker, mock_repos):
+    """Mock the extra repositories used by the customer.created pipeline."""
+    from unittest.mock import Mock
+
+    sub_repo = Mock()
+    sub_repo.has_free_trial.return_value = False
+    plan_repo = Mock()
+    mocker.patch("helpers.context.SubscriptionRepository", return_value=sub_repo)
+    mocker.patch("helpers.context.PlanRepository", return_value=plan_repo)
+    mocker.patch("services.subscription_service.after_commit")
+    plan_repo.get_plan_by_tier.return_value = Plans(
+        id=7,
+        stripe_price_id="price_free",
+        name="free",
+        description=None,
+        price_cents=0,
+        interval="month",
+    )
+    return {"user_repo": mock_repos, "sub_repo": sub_repo, "plan_repo": plan_repo}
+
+
+def test_customer_created_pipeline_success(mock_pipeline):
+    """User and free trial are created in one go, without a second lookup."""
+    user_repo = mock_pipeline["user_repo"]
+    sub_repo = mock_pipeline["sub_repo"]
+
+    user_repo.get_user_by_customer_id.return_value = None
+    user_repo.create.return_value = Users(
+        id=1, email="test@gmail.com", stripe_customer_id="cus_id"
+    )
+
+    customer_created_pipeline({"id": "cus_id", "email": "test@gmail.com"})
+
+    user_repo.get_user_by_customer_id.assert_called_once_with("cus_id")
+    mock_pipeline["plan_repo"].get_plan_by_tier.assert_called_once()
+    sub_repo.create.assert_called_once()
+    assert sub_repo.create.call_args.kwargs["user_id"] == 1
+    assert sub_repo.create.call_args.kwargs["plan_id"] == 7
+
+
+def test_customer_created_pipeline_trial_error(mock_pipeline):
+    """A failing trial fails the whole task so it is retried."""
+    user_repo = mock_pipeline["user_repo"]
+
+    user_repo.get_user_by_customer_id.return_value = None
+    user_repo.create.return_value = Users(
+        id=1, email="test@gmail.com", stripe_customer_id="cus_id"
+    )
+    mock_pipeline["sub_repo"].create.side_effect = DatabaseError(
+        error=Exception(), func="SubscriptionRepository.create"
+    )
+
+    with pytest.raises(DatabaseError):
+        customer_created_pipeline({"id": "cus_id", "email": "test@gmail.com"})
+
+
+def test_customer_created_pipeline_invalid_payload(mock_pipeline):
+    customer_created_pipeline({"email": "test@gmail.com"})
+
+    mock_pipeline["user_repo"].create.assert_not_called()
+    mock_pipeline["sub_repo"].create.assert_not_called()
+
+
+def test_customer_created_pipeline_twice_grants_one_trial(mocker, test_session):
+    """Replaying customer.created leaves one user with one trial."""
+    from sqlmodel import select
+    from models.subscription import Subscriptions
+
+    mocker.patch("helpers.context.engine", test_session.get_bind())
+    mocker.patch("services.subscription_service.bump_claim_version")
+    test_session.add(
+        Plans(
+            stripe_price_id="price_free_pipeline",
+            name="free",
+            description=None,
+            price_cents=0,
+            interval="month",
+        )
+    )
+    test_session.commit()
+    payload = {"id": "cus_twice", "email": "twice@gmail.com"}
+
+    customer_created_pipeline(payload)
+    customer_created_pipeline(payload)
+
+    user = test_session.exec(
+        select(Users).where(Users.stripe_customer_id == "cus_twice")
+    ).one()
+    trials = test_session.exec(
+        select(Subscriptions).where(Subscriptions.user_id == user.id)
+    ).all()
+    assert len(trials) == 1
+
+
 def test_customer_deleted_success(mock_repos):
     """Test successful customer.deleted."""
     mock_repo = mock_repos
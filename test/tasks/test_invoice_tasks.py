@@ -3,16 +3,17 @@ from datetime import datetime
 import pytest
 
 from schemas.enums import SubscriptionStatus
+from schemas.exceptions import SubscriptionNotFound
 from tasks.invoice import invoice_paid, invoice_payment_failed
 
 
 @pytest.fixture
 def mock_repos(mocker):
     """Mock repositories for task tests."""
-    mock_session = mocker.Mock()
+    mock_session = mocker.MagicMock()
     mock_repo = mocker.Mock()
 
-    mocker.patch("db.session.get_session", return_value=iter([mock_session]))
+    mocker.patch("helpers.context.Session", return_value=mock_session)
     mocker.patch(
         "helpers.context.SubscriptionRepository",
         return_value=mock_repo,
@@ -26,7 +27,6 @@ def mock_repos(mocker):
 def test_invoice_paid_success(mock_repos):
     """Test successful invoice.paid."""
     mock_repo = mock_repos
-    mock_repo.get_subscription_for_user.return_value = {"id": "user_test"}
 
     payload = {
         "billing_reason": "subscription_create",
@@ -46,9 +46,7 @@ def test_invoice_paid_success(mock_repos):
 
     invoice_paid(payload)
 
-    mock_repo.get_subscription_for_user.assert_called_once_with(
-        sub_id="sub_test", customer_id="cus_test"
-    )
+    mock_repo.get_subscription_for_user.assert_not_called()
     mock_repo.update_for_user.assert_called_once_with(
         sub_id="sub_test",
         customer_id="cus_test",
@@ -110,7 +108,7 @@ def test_not_sub_id(mock_repos):
 def test_not_sub_error(mock_repos):
     """Test invoice.paid when subscription not found."""
     mock_repo = mock_repos
-    mock_repo.get_subscription_for_user.return_value = None
+    mock_repo.update_for_user.side_effect = SubscriptionNotFound("sub_test")
 
     payload = {
         "billing_reason": "subscription_create",
@@ -131,18 +129,12 @@ def test_not_sub_error(mock_repos):
     with pytest.raises(Exception):
         invoice_paid(payload)
 
-    mock_repo.get_subscription_for_user.assert_called_once_with(
-        sub_id="sub_test", customer_id="cus_test"
-    )
+    mock_repo.get_subscription_for_user.assert_not_called()
 
 
 def test_invoice_payment_failed_success(mock_repos):
     """Test successful invoice.payment_failed."""
     mock_repo = mock_repos
-    mock_repo.get_subscription_for_user.return_value = {
-        "id": "user_test",
-        "stripe_subscription_id": "sub_test",
-    }
 
     payload = {
         "lines": {
@@ -161,10 +153,7 @@ def test_invoice_payment_failed_success(mock_repos):
 
     invoice_payment_failed(payload)
 
-    mock_repo.get_subscription_for_user.assert_called_once_with(
-        sub_id="sub_test",
-        customer_id="cus_test",
-    )
+    mock_repo.get_subscription_for_user.assert_not_called()
     mock_repo.update_for_user.assert_called_once_with(
         sub_id="sub_test",
         customer_id="cus_test",
@@ -199,7 +188,7 @@ def test_invoice_payment_failed_not_details(mock_repos):
 def test_invoice_payment_failed_not_suscription(mock_repos):
     """Test invoice.payment_failed when subscription not found."""
     mock_repo = mock_repos
-    mock_repo.get_subscription_for_user.return_value = None
+    mock_repo.update_for_user.side_effect = SubscriptionNotFound("sub_test")
 
     payload = {
         "lines": {
@@ -219,7 +208,4 @@ def test_invoice_payment_failed_not_suscription(mock_repos):
     with pytest.raises(Exception):
         invoice_payment_failed(payload)
 
-    mock_repo.get_subscription_for_user.assert_called_once_with(
-        sub_id="sub_test",
-        customer_id="cus_test",
-    )
\ No newline at end of file
+    mock_repo.get_subscription_for_user.assert_not_called()
\ No newline at end of file
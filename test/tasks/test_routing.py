@@ -0,0 +1,94 @@
+import pytest
+
+from tasks.app import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    QUEUE_CRITICAL,
+    QUEUE_DEFAULT,
+    QUEUE_LOW,
+    QUEUE_MAINTENANCE,
+    celery_app,
+)
+from services.webhook_handler_service import EVENT_TASKS
+from tasks.worker import worker_argv
+
+# Where each Stripe event type's task must land
+EVENT_QUEUES = {
+    "invoice.paid": QUEUE_CRITICAL,
+    "invoice.payment_failed": QUEUE_CRITICAL,
+    "customer.subscription.created": QUEUE_CRITICAL,
+    "customer.subscription.deleted": QUEUE_CRITICAL,
+    "customer.created": QUEUE_DEFAULT,
+    "customer.deleted": QUEUE_DEFAULT,
+    "customer.subscription.updated": QUEUE_LOW,
+    "customer.subscription.paused": QUEUE_LOW,
+}
+
+
+def test_every_event_type_has_an_expected_queue():
+    assert EVENT_QUEUES.keys() == EVENT_TASKS.keys()
+
+
+@pytest.mark.parametrize("event_type", sorted(EVENT_TASKS))
+def test_event_task_routes(event_type):
+    route = celery_app.amqp.router.route({}, EVENT_TASKS[event_type].name)
+
+    assert route["queue"].name == EVENT_QUEUES[event_type]
+
+
+def test_maintenance_task_routes():
+    route = celery_app.amqp.router.route({}, "tasks.sessions.purge_expired_sessions")
+
+    assert route["queue"].name == QUEUE_MAINTENANCE
+
+
+def test_task_priorities():
+    router = celery_app.amqp.router
+
+    assert router.route({}, "tasks.invoice.invoice_paid")["priority"] == PRIORITY_HIGH
+    assert (
+        router.route({}, "tasks.subscriptions.customer_subscription_updated")[
+            "priority"
+        ]
+        == PRIORITY_LOW
+    )
+    # Queued ahead of other default work: the trial gates every route
+    assert (
+        router.route({}, "tasks.customer.customer_created_pipeline")["priority"]
+        == PRIORITY_HIGH
+    )
+
+
+def test_worker_argv(monkeypatch):
+    monkeypatch.setenv("CELERY_CONCURRENCY_CRITICAL", "8")
+
+    assert worker_argv("critical") == [
+        "worker",
+        "--loglevel=info",
+        "--queues=critical",
+        "--hostname=critical@%h",
+        "--concurrency=8",
+    ]
+
+
+def test_worker_argv_low_includes_maintenance(monkeypatch):
+    monkeypatch.delenv("CELERY_CONCURRENCY_LOW", raising=False)
+
+    argv = worker_argv("low", ["--pool=solo"])
+
+    assert "--queues=low,maintenance" in argv
+    assert argv[-1] == "--pool=solo"
+    assert not any(arg.startswith("--concurrency") for arg in argv)
+
+
+def test_worker_argv_unknown_pool():
+    with pytest.raises(ValueError):
+        worker_argv("urgent")
+
+
+def test_session_tasks_are_registered():
+    assert "tasks.sessions" in celery_app.conf.include
+
+    celery_app.loader.import_default_modules()
+
+    assert "tasks.sessions.purge_expired_sessions" in celery_app.tasks
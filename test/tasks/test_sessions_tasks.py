@@ -0,0 +1,38 @@
+import pytest
+
+from schemas.exceptions import DatabaseError
+from tasks.sessions import purge_expired_sessions
+
+
+@pytest.fixture
+def mock_repo(mocker):
+    """Mock AuthRepository for the purge task."""
+    from unittest.mock import MagicMock, Mock
+
+    mocker.patch("helpers.context.Session", return_value=MagicMock())
+    repo = Mock()
+    mocker.patch("tasks.sessions.AuthRepository", return_value=repo)
+    return repo
+
+
+def test_purge_stops_on_partial_batch(mock_repo):
+    mock_repo.purge_expired_sessions.side_effect = [10, 10, 4]
+
+    assert purge_expired_sessions(batch_size=10, max_batches=5) == 24
+    assert mock_repo.purge_expired_sessions.call_count == 3
+
+
+def test_purge_is_bounded(mock_repo):
+    mock_repo.purge_expired_sessions.return_value = 10
+
+    assert purge_expired_sessions(batch_size=10, max_batches=2) == 20
+    assert mock_repo.purge_expired_sessions.call_count == 2
+
+
+def test_purge_db_error(mock_repo):
+    mock_repo.purge_expired_sessions.side_effect = DatabaseError(
+        Exception("db error"), "AuthRepository.purge_expired_sessions"
+    )
+
+    with pytest.raises(DatabaseError):
+        purge_expired_sessions()
@@ -19,12 +19,13 @@ from tasks.subscriptions import (
 @pytest.fixture
 def mock_repos(mocker):
     """Mock repositories for task tests."""
-    mock_session = mocker.Mock()
+    mock_session = mocker.MagicMock()
     mock_sub_repo = mocker.Mock()
+    mock_sub_repo.has_free_trial.return_value = False
     mock_plan_repo = mocker.Mock()
     mock_user_repo = mocker.Mock()
 
-    mocker.patch("db.session.get_session", return_value=iter([mock_session]))
+    mocker.patch("helpers.context.Session", return_value=mock_session)
     mocker.patch(
         "helpers.context.SubscriptionRepository",
         return_value=mock_sub_repo,
@@ -70,7 +71,7 @@ def test_customer_sub_basic_success(mock_repos):
 
     user_repo.get_user_by_customer_id.assert_called_once_with("cus_mock_test")
     sub_repo.create.assert_called_once()
-    sub_repo.update_for_user.assert_called_once()
+    sub_repo.update_for_user.assert_not_called()
 
 
 def test_customer_sub_basic_user_error(mock_repos):